@@ -0,0 +1,89 @@
+"""
+Helpers shared by the PyangBind benchmarks.
+
+Each benchmark is a standalone script that is run from the root of the
+repository, e.g.:
+
+    python -m benchmarks.yangdynclass
+
+The bindings that a benchmark uses are generated at runtime from the YANG
+modules in benchmarks/models using the pyang plugin in this tree, in the same
+way as the tests do.
+"""
+
+import os.path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import types
+
+BENCH_PATH = os.path.dirname(os.path.abspath(__file__))
+BASE_PATH = os.path.dirname(BENCH_PATH)
+MODEL_PATH = os.path.join(BENCH_PATH, "models")
+
+
+def pyang_command(yang_files, flags=None):
+    pyang_path = shutil.which("pyang")
+    if not pyang_path:
+        raise RuntimeError("Could not locate `pyang` executable.")
+    return (
+        [
+            pyang_path,
+            "--plugindir",
+            os.path.join(BASE_PATH, "pyangbind", "plugin"),
+            "-f",
+            "pybind",
+            "-p",
+            MODEL_PATH,
+        ]
+        + list(flags or [])
+        + [os.path.join(MODEL_PATH, f) for f in yang_files]
+    )
+
+
+def generate_bindings(yang_files, flags=None, module_name="bindings"):
+    """
+    Generate bindings for yang_files and return them as a module object.
+    """
+    code = subprocess.check_output(
+        pyang_command(yang_files, flags=flags), stderr=subprocess.STDOUT, env={"PYTHONPATH": BASE_PATH}
+    )
+    module = types.ModuleType(module_name)
+    exec(code, module.__dict__)
+    return module
+
+
+def generate_split_bindings(yang_files, flags=None, module_name="bindings"):
+    """
+    Generate bindings for yang_files using --split-class-dir in a temporary
+    directory, and return the directory and the time taken to generate them.
+    """
+    out_dir = tempfile.mkdtemp(prefix="pyangbind-bench-")
+    target = os.path.join(out_dir, module_name)
+    flags = list(flags or []) + ["--split-class-dir", target]
+    start = time.perf_counter()
+    subprocess.check_call(pyang_command(yang_files, flags=flags), env={"PYTHONPATH": BASE_PATH})
+    return out_dir, time.perf_counter() - start
+
+
+def timed(fn, number=1, repeat=3):
+    """
+    Return the best wall-clock time of fn() over repeat runs of number calls.
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat))
+
+
+def report(title, rows):
+    """
+    Print a simple table of (label, value) rows.
+    """
+    sys.stdout.write("%s\n%s\n" % (title, "-" * len(title)))
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        if isinstance(value, float):
+            value = "%.4f" % value
+        sys.stdout.write("  %s  %s\n" % (label.ljust(width), value))
+    sys.stdout.write("\n")
@@ -0,0 +1,45 @@
+"""
+Time parsing, printing, changing and comparing the values of a bits type that
+is shaped like the TCP flags of a packet.
+
+    python -m benchmarks.bits [values]
+"""
+
+import sys
+
+from pyangbind.lib.yangtypes import YANGBitsType
+
+from benchmarks.base import report, timed
+
+TCP_FLAGS = {"FIN": 0, "SYN": 1, "RST": 2, "PSH": 3, "ACK": 4, "URG": 5, "ECE": 6, "CWR": 7}
+
+
+def values(count):
+    names = sorted(TCP_FLAGS, key=TCP_FLAGS.get)
+    return [" ".join(n for i, n in enumerate(names) if v % 256 & (1 << i)) for v in range(count)]
+
+
+def main(count=1000):
+    texts = values(count)
+    parsed = [YANGBitsType(TCP_FLAGS)(t) for t in texts]
+    other = [YANGBitsType(TCP_FLAGS)(t) for t in texts]
+
+    def toggle():
+        for v in parsed:
+            v.add("ACK")
+            v.discard("ACK")
+
+    report(
+        "bits values (%d values)" % count,
+        [
+            ("parse (ms)", timed(lambda: [YANGBitsType(TCP_FLAGS)(t) for t in texts], number=10) * 100),
+            ("str() (ms)", timed(lambda: [str(v) for v in parsed], number=10) * 100),
+            ("add() and discard() (ms)", timed(toggle, number=10) * 100),
+            ("== (ms)", timed(lambda: [a == b for a, b in zip(parsed, other)], number=10) * 100),
+            ("'SYN' in (ms)", timed(lambda: ["SYN" in v for v in parsed], number=10) * 100),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
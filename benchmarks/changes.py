@@ -0,0 +1,54 @@
+"""
+Time setting leaves in a populated tree, which marks each leaf and its
+ancestors as changed, and a refresh cycle in which the tree is marked as
+unchanged and a small number of its leaves are updated. The leaves are in a
+config false container, and so are set as a telemetry collector would.
+
+    python -m benchmarks.changes [entries] [updated]
+"""
+
+import sys
+
+from benchmarks.base import generate_bindings, report, timed
+
+
+def populate(bindings, entries):
+    root = bindings.bench()
+    for i in range(entries):
+        root.interfaces.interface.add("eth%d" % i)
+    return root
+
+
+def set_counters(root, names):
+    for name in names:
+        state = root.interfaces.interface[name].state
+        state._set_ifindex(1)
+        state._set_in_octets(1000)
+        state._set_out_octets(2000)
+        state._set_admin_status("UP")
+        state._set_description("interface")
+        state._set_mtu(9000)
+
+
+def refresh(root, names):
+    root._mark_clean()
+    for name in names:
+        root.interfaces.interface[name].state._set_in_octets(3000)
+
+
+def main(entries=1000, updated=10):
+    bindings = generate_bindings(["bench.yang"])
+    root = populate(bindings, entries)
+    names = list(root.interfaces.interface.keys())
+
+    report(
+        "Changes to a tree of %d list entries (s)" % entries,
+        [
+            ("set 6 leaves in every entry", timed(lambda: set_counters(root, names))),
+            ("refresh %d entries" % updated, timed(lambda: refresh(root, names[:updated]), number=100) / 100),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
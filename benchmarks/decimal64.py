@@ -0,0 +1,47 @@
+"""
+Time parsing, comparing and formatting decimal64 values - as when decoding
+telemetry - with RestrictedPrecisionDecimalType and with the fixed-point
+YANGDecimal64 type that --fixed-point-decimal64 selects.
+
+    python -m benchmarks.decimal64 [values]
+"""
+
+import sys
+
+from pyangbind.lib.yangtypes import RestrictedClassType, RestrictedPrecisionDecimalType, YANGDecimal64Type
+
+from benchmarks.base import report, timed
+
+# e.g., oc-types:ieeefloat32 optical power, or a temperature, in dBm/C.
+RANGE = {"range": ["-40.00..40.00"]}
+
+
+def main(values=1000):
+    sample = ["%.2f" % ((i * 37 % 8000 - 4000) / 100.0) for i in range(values)]
+    rows = []
+    for name, base_type in [
+        ("RestrictedPrecisionDecimalType", RestrictedPrecisionDecimalType(precision=2)),
+        ("YANGDecimal64", YANGDecimal64Type(fraction_digits=2)),
+    ]:
+        restricted = RestrictedClassType(base_type=base_type, restriction_dict=RANGE)
+        parsed = [base_type(value) for value in sample]
+        rows.extend(
+            [
+                (
+                    "%s: parse (us/value)" % name,
+                    timed(lambda: [base_type(v) for v in sample], number=10) * 1e5 / values,
+                ),
+                (
+                    "%s: parse with range (us/value)" % name,
+                    timed(lambda: [restricted(v) for v in sample], number=10) * 1e5 / values,
+                ),
+                ("%s: compare (us/value)" % name, timed(lambda: sorted(parsed), number=10) * 1e5 / values),
+                ("%s: str (us/value)" % name, timed(lambda: [str(v) for v in parsed], number=10) * 1e5 / values),
+            ]
+        )
+
+    report("Handling %d decimal64 values with fraction-digits 2" % values, rows)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,52 @@
+"""
+Compare building a tree with and without extension methods, using bindings
+that are generated with --use-extmethods.
+
+    python -m benchmarks.extmethods [entries]
+"""
+
+import sys
+
+from benchmarks.base import generate_bindings, report, timed
+
+
+class InterfaceMethods(object):
+    def commit(self, *args, **kwargs):
+        return kwargs["caller"]
+
+    def validate(self, *args, **kwargs):
+        return True
+
+
+EXTMETHODS = {
+    "/interfaces/interface/config/mtu": InterfaceMethods(),
+    "/interfaces/interface/config/description": InterfaceMethods(),
+}
+
+
+def populate(bindings, entries, extmethods=None):
+    root = bindings.bench(extmethods=extmethods) if extmethods else bindings.bench()
+    for i in range(entries):
+        intf = root.interfaces.interface.add("eth%d" % i)
+        intf.config.description = "interface %d" % i
+        intf.config.mtu = 9000
+    return root
+
+
+def main(entries=1000):
+    bindings = generate_bindings(["bench.yang"], flags=["--use-extmethods"])
+    root = populate(bindings, entries, EXTMETHODS)
+    mtu = root.interfaces.interface["eth0"].config.mtu
+
+    report(
+        "Building a tree of %d list entries (s)" % entries,
+        [
+            ("without extmethods", timed(lambda: populate(bindings, entries))),
+            ("with extmethods", timed(lambda: populate(bindings, entries, EXTMETHODS))),
+            ("calling an extmethod (us)", timed(mtu._commit, number=10000) * 100),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,45 @@
+"""
+Compare forking a populated tree with copying it by serialising and loading
+it, and measure the memory that a fork allocates as it is changed.
+
+    python -m benchmarks.fork [entries] [updated]
+"""
+
+import sys
+
+from pyangbind.lib import pybindJSON
+
+from benchmarks.base import generate_bindings, report, timed
+from benchmarks.memory import allocated
+from benchmarks.patch import populate, update
+
+
+def main(entries=1000, updated=10):
+    bindings = generate_bindings(["bench.yang"])
+    root = populate(bindings, entries)
+    names = list(root.interfaces.interface.keys())[:updated]
+
+    def forked_and_updated():
+        fork = root._fork()
+        update(fork, names)
+        return fork
+
+    _, fork_size = allocated(root._fork)
+    _, updated_size = allocated(forked_and_updated)
+    _, copy_size = allocated(lambda: pybindJSON.loads(pybindJSON.dumps(root), bindings, "bench"))
+
+    report(
+        "Copying a tree of %d list entries, and updating %d leaves of the copy" % (entries, updated),
+        [
+            ("_fork() (us)", timed(root._fork, number=1000) * 1000),
+            ("_fork(), update (s)", timed(forked_and_updated, number=10) / 10),
+            ("loads(dumps()) (s)", timed(lambda: pybindJSON.loads(pybindJSON.dumps(root), bindings, "bench"))),
+            ("_fork() (bytes)", fork_size),
+            ("_fork(), update (bytes)", updated_size),
+            ("loads(dumps()) (bytes)", copy_size),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,119 @@
+"""
+Time the generation of bindings, as a single file and with --split-class-dir -
+with the modules written by one process, and by one process per CPU - and
+the time taken to generate split bindings again, from the same modules.
+
+    python -m benchmarks.generate [-p PATH ...] [yang files...]
+
+By default, the model in benchmarks/models and a module with 500 containers
+(written to a temporary directory) are generated. YANG files are otherwise
+relative to benchmarks/models (or absolute) - e.g., to time the generation of
+the OpenConfig models that tests/integration uses, once they have been
+downloaded:
+
+    python -m benchmarks.generate -p tests/integration/openconfig-interfaces/include \\
+        --lax-quote-checks $PWD/tests/integration/openconfig-interfaces/openconfig/*.yang
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.base import BASE_PATH, generate_split_bindings, pyang_command, report
+
+CONTAINER = """
+    container c%d {
+        leaf name { type string; }
+        leaf mtu { type uint16 { range "64..9216"; } }
+        leaf enabled { type boolean; default true; }
+        list entry {
+            key "id";
+            leaf id { type uint32; }
+            leaf value { type string; }
+        }
+    }"""
+
+MODULE = 'module wide {\n    namespace "http://rob.sh/yang/test/wide";\n    prefix "wide";\n%s\n}\n'
+
+
+def wide_module(containers):
+    """
+    Write a module with the specified number of containers, each of which
+    holds a list and some leaves, and return its path.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="pyangbind-bench-"), "wide.yang")
+    with open(path, "w") as fhandle:
+        fhandle.write(MODULE % "".join(CONTAINER % i for i in range(containers)))
+    return path
+
+
+def generate_single(yang_files, flags):
+    start = time.perf_counter()
+    subprocess.check_call(
+        pyang_command(yang_files, flags=flags), stdout=subprocess.DEVNULL, env={"PYTHONPATH": BASE_PATH}
+    )
+    return time.perf_counter() - start
+
+
+def generate_split(yang_files, flags):
+    out_dir, elapsed = generate_split_bindings(yang_files, flags=flags)
+    files = sum(len(f) for _, _, f in os.walk(out_dir))
+    shutil.rmtree(out_dir)
+    return elapsed, files
+
+
+def regenerate_split(yang_files, flags):
+    out_dir, _ = generate_split_bindings(yang_files, flags=flags)
+    flags = flags + ["--split-class-dir", os.path.join(out_dir, "bindings")]
+    elapsed = []
+    for rerun_flags in [[], ["--force"]]:
+        start = time.perf_counter()
+        subprocess.check_call(pyang_command(yang_files, flags=flags + rerun_flags), env={"PYTHONPATH": BASE_PATH})
+        elapsed.append(time.perf_counter() - start)
+    shutil.rmtree(out_dir)
+    return elapsed
+
+
+def main(*args):
+    flags, yang_files = [], []
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == "-p":
+            flags.extend([arg, os.path.abspath(args.pop(0))])
+        elif arg.startswith("-"):
+            flags.append(arg)
+        else:
+            yang_files.append(arg)
+    wide = None
+    if yang_files:
+        runs = [yang_files]
+    else:
+        wide = wide_module(500)
+        runs = [["bench.yang"], [wide]]
+
+    for yang_files in runs:
+        single = min(generate_single(yang_files, flags) for _ in range(3))
+        split = min(generate_split(yang_files, flags) for _ in range(3))
+        parallel = min(generate_split(yang_files, flags + ["--jobs", "0"]) for _ in range(3))
+        unchanged, forced = [min(t) for t in zip(*[regenerate_split(yang_files, flags) for _ in range(3)])]
+        report(
+            "Generating bindings for %s" % ", ".join(os.path.basename(f) for f in yang_files),
+            [
+                ("single file (s)", single),
+                ("--split-class-dir (s)", split[0]),
+                ("--split-class-dir --jobs 0 (s)", parallel[0]),
+                ("--split-class-dir files", split[1]),
+                ("--split-class-dir again, unchanged (s)", unchanged),
+                ("--split-class-dir again, --force (s)", forced),
+            ],
+        )
+    if wide is not None:
+        shutil.rmtree(os.path.dirname(wide))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,37 @@
+"""
+Time loading the entries of a list that does not have a key, each of which is
+given a generated key, and generating the keys themselves.
+
+    python -m benchmarks.keyless [entries]
+"""
+
+import sys
+import uuid
+
+from pyangbind.lib import yangtypes
+
+from benchmarks.base import generate_bindings, report, timed
+
+
+def load(bindings, entries):
+    root = bindings.bench()
+    intf = root.interfaces.interface.add("eth0")
+    intf.state.event.extend_from({"timestamp": i, "message": "event %d" % i} for i in range(entries))
+    return root
+
+
+def main(entries=100000):
+    bindings = generate_bindings(["bench.yang"])
+
+    report(
+        "Keyless list of %d entries" % entries,
+        [
+            ("load (s)", timed(lambda: load(bindings, entries), repeat=1)),
+            ("uuid1 keys (ms)", timed(lambda: [str(uuid.uuid1()) for _ in range(entries)]) * 1000),
+            ("counter keys (ms)", timed(lambda: [next(yangtypes._keyless_list_keys) for _ in range(entries)]) * 1000),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
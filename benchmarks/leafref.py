@@ -0,0 +1,45 @@
+"""
+Time populating the leafrefs of a list that refer to the entries of another
+list, whose targets are looked up in the path helper as each is set.
+
+    python -m benchmarks.leafref [entries]
+"""
+
+import sys
+
+from benchmarks.base import generate_bindings, report, timed
+from pyangbind.lib.xpathhelper import YANGPathHelper
+
+
+def populate(bindings, entries):
+    root = bindings.leafref(path_helper=YANGPathHelper())
+    for i in range(entries):
+        root.interfaces.interface.add("eth%d" % i)
+    for i in range(entries):
+        root.network_instance.interface.add("eth%d" % i).interface = "eth%d" % i
+    return root
+
+
+def set_references(root, entries):
+    references = root.network_instance.interface
+    for i in range(entries):
+        references["eth%d" % i].interface = "eth%d" % (entries - i - 1)
+
+
+def main(entries=1000):
+    bindings = generate_bindings(["leafref.yang"], flags=["--use-xpathhelper"])
+    root = populate(bindings, entries)
+    ref = root.network_instance.interface["eth0"].interface
+
+    report(
+        "Leafrefs to a list of %d entries" % entries,
+        [
+            ("populate (s)", timed(lambda: populate(bindings, entries), repeat=1)),
+            ("set every leafref (s)", timed(lambda: set_references(root, entries))),
+            ("str() of a leafref (us)", timed(lambda: str(ref), number=10000) * 100),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
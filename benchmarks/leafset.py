@@ -0,0 +1,56 @@
+"""
+Compare the throughput of setting leaves, and of creating the containers that
+hold them, in bindings that are generated with and without
+--static-leaf-classes.
+
+    python -m benchmarks.leafset [sets]
+"""
+
+import sys
+
+from benchmarks.base import generate_bindings, report, timed
+
+VALUES = [
+    ("description", lambda i: "interface %d" % i),
+    ("mtu", lambda i: 1500 + i % 7000),
+    ("enabled", lambda i: bool(i % 2)),
+    ("vlan", lambda i: 1 + i % 4094),
+    ("address", lambda i: "192.0.2.%d" % (i % 256)),
+    ("type", lambda i: ["ETHERNET", "LOOPBACK"][i % 2]),
+    ("next_hop", lambda i: ["UP", "DOWN", "TESTING"][i % 3]),
+]
+
+
+def set_leaves(config, values):
+    for name, value in values:
+        setattr(config, name, value)
+
+
+def add_entries(bindings, entries):
+    intfs = bindings.bench().interfaces.interface
+    for i in range(entries):
+        intfs.add("eth%d" % i)
+
+
+def main(sets=1000):
+    values = [(name, fn(i)) for i in range(sets // len(VALUES) + 1) for name, fn in VALUES][:sets]
+
+    rows = []
+    for label, flags in [("YANGDynClass", []), ("--static-leaf-classes", ["--static-leaf-classes"])]:
+        bindings = generate_bindings(["bench.yang"], flags=flags)
+        config = bindings.bench().interfaces.interface.add("eth0").config
+        elapsed = timed(lambda: set_leaves(config, values), number=10) / 10
+        rows.extend(
+            [
+                ("%s: set leaves (sets/s)" % label, sets / elapsed),
+                (
+                    "%s: add %d list entries (s)" % (label, sets // 10),
+                    timed(lambda: add_entries(bindings, sets // 10)),
+                ),
+            ]
+        )
+    report("Setting %d leaves" % sets, rows)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,50 @@
+"""
+Compare adding entries to a list one at a time using add() with adding them
+in a batch using add_many(), with and without a path helper.
+
+    python -m benchmarks.listadd [entries]
+"""
+
+import sys
+
+from pyangbind.lib.xpathhelper import YANGPathHelper
+
+from benchmarks.base import generate_bindings, report, timed
+
+
+def interfaces(bindings, path_helper):
+    if path_helper:
+        return bindings.bench(path_helper=YANGPathHelper()).interfaces.interface
+    return bindings.bench().interfaces.interface
+
+
+def add(bindings, entries, path_helper=False):
+    intfs = interfaces(bindings, path_helper)
+    for i in range(entries):
+        intfs.add("eth%d" % i)
+    return intfs
+
+
+def add_many(bindings, entries, path_helper=False):
+    intfs = interfaces(bindings, path_helper)
+    intfs.add_many("eth%d" % i for i in range(entries))
+    return intfs
+
+
+def main(entries=1000):
+    bindings = generate_bindings(["bench.yang"], flags=["--use-xpathhelper"])
+
+    rows = []
+    for path_helper in [False, True]:
+        suffix = " (path helper)" if path_helper else ""
+        rows.extend(
+            [
+                ("add()%s" % suffix, timed(lambda: add(bindings, entries, path_helper))),
+                ("add_many()%s" % suffix, timed(lambda: add_many(bindings, entries, path_helper))),
+            ]
+        )
+    report("Adding %d list entries (s)" % entries, rows)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
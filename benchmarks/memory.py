@@ -0,0 +1,53 @@
+"""
+Measure the memory that is allocated to build and populate a tree.
+
+    python -m benchmarks.memory [entries]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.base import generate_bindings, report
+from benchmarks.yangdynclass import populate
+
+
+def allocated(fn):
+    """
+    Return the result of fn() and the number of bytes that remain allocated
+    by it once it has returned.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def main(entries=1000):
+    bindings = generate_bindings(["bench.yang"])
+    # build one tree first, such that the classes that are shared between
+    # trees are not counted.
+    populate(bindings, 1)
+
+    root, size = allocated(lambda: populate(bindings, entries))
+    leaf = root.interfaces.interface["eth0"].config.mtu
+    leaf_size = sys.getsizeof(leaf) + sys.getsizeof(getattr(leaf, "__dict__", {}))
+
+    report(
+        "Memory allocated by a populated tree (%d list entries)" % entries,
+        [
+            ("total (bytes)", size),
+            ("per list entry (bytes)", size // entries),
+            ("populated uint16 leaf (bytes)", leaf_size),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,60 @@
+"""
+Compare serialising a populated tree in full with serialising only the
+changes made to it since a checkpoint, as a YANG Patch and as a JSON Patch,
+after a small number of its leaves are updated. The time taken to make the
+updates with and without the journal enabled is also reported.
+
+    python -m benchmarks.patch [entries] [updated]
+"""
+
+import sys
+
+from pyangbind.lib import pybindJSON
+
+from benchmarks.base import generate_bindings, report, timed
+
+
+def populate(bindings, entries):
+    root = bindings.bench()
+    for i in range(entries):
+        intf = root.interfaces.interface.add("eth%d" % i)
+        intf.config.description = "interface %d" % i
+        intf.config.mtu = 1500
+    return root
+
+
+def update(root, names):
+    for name in names:
+        root.interfaces.interface[name].config.mtu = 9000
+
+
+def main(entries=1000, updated=10):
+    bindings = generate_bindings(["bench.yang"])
+    root = populate(bindings, entries)
+    names = list(root.interfaces.interface.keys())[:updated]
+
+    unjournalled = timed(lambda: update(root, names), number=100) / 100
+    journal = root._enable_journal()
+    journalled = timed(lambda: update(root, names), number=100) / 100
+    journal.trim(journal.checkpoint())
+    checkpoint = journal.checkpoint()
+    update(root, names)
+    entries_since = journal.since(checkpoint)
+
+    report(
+        "Serialising %d updated leaves in a tree of %d list entries (s)" % (updated, entries),
+        [
+            ("update, no journal", unjournalled),
+            ("update, journal", journalled),
+            ("dumps(mode='ietf')", timed(lambda: pybindJSON.dumps(root, mode="ietf"))),
+            ("dumps_patch(mode='yang-patch')", timed(lambda: pybindJSON.dumps_patch(entries_since), number=100) / 100),
+            (
+                "dumps_patch(mode='json-patch')",
+                timed(lambda: pybindJSON.dumps_patch(entries_since, mode="json-patch"), number=100) / 100,
+            ),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,33 @@
+"""
+Time retrieving the path of leaves at increasing depths of a populated tree,
+and building the entries of a list whose elements look their path up as they
+are created.
+
+    python -m benchmarks.paths [entries]
+"""
+
+import sys
+
+from benchmarks.base import generate_bindings, report, timed
+from benchmarks.yangdynclass import populate
+
+
+def main(entries=1000):
+    bindings = generate_bindings(["bench.yang"])
+    root = populate(bindings, entries)
+    intf = root.interfaces.interface["eth0"]
+    event = intf.state.event[intf.state.event.add()]
+
+    rows = []
+    for label, leaf in [
+        ("/interfaces/interface/config/mtu", intf.config.mtu),
+        ("/interfaces/interface/state/event/message", event.message),
+    ]:
+        rows.append(("%s _path() (us)" % label, timed(leaf._path, number=10000) * 100))
+    rows.append(("populate (s)", timed(lambda: populate(bindings, entries))))
+
+    report("Paths of leaves in a tree of %d list entries" % entries, rows)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,78 @@
+"""
+Compare sending a populated list to a worker process and back by pickling
+it with sending it as JSON, which the worker loads into the bindings and
+dumps again. The time taken to pickle and unpickle the list, and the size of
+each encoding, are also reported.
+
+    python -m benchmarks.pickling [entries]
+"""
+
+import importlib
+import multiprocessing
+import pickle
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from pyangbind.lib import pybindJSON
+
+from benchmarks.base import generate_split_bindings, report, timed
+from benchmarks.patch import populate
+
+
+def returned(obj):
+    return obj
+
+
+def json_returned(document):
+    bindings = importlib.import_module("bindings")
+    return pybindJSON.dumps(pybindJSON.loads(document, bindings, "bench"))
+
+
+def main(entries=100000):
+    out_dir, _ = generate_split_bindings(["bench.yang"])
+    sys.path.insert(0, out_dir)
+    try:
+        bindings = importlib.import_module("bindings")
+        root = populate(bindings, entries)
+        interfaces = root.interfaces.interface
+        pickled = pickle.dumps(interfaces, protocol=pickle.HIGHEST_PROTOCOL)
+        document = pybindJSON.dumps(root)
+
+        # the workers are forked, such that they can import the bindings.
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+            executor.submit(returned, None).result()
+            # each of these takes seconds for a large list, so is run once.
+            rows = [
+                (
+                    "pickle.dumps() (s)",
+                    timed(lambda: pickle.dumps(interfaces, protocol=pickle.HIGHEST_PROTOCOL), repeat=1),
+                ),
+                ("pickle.loads() (s)", timed(lambda: pickle.loads(pickled), repeat=1)),
+                ("pybindJSON.dumps() (s)", timed(lambda: pybindJSON.dumps(root), repeat=1)),
+                ("pybindJSON.loads() (s)", timed(lambda: pybindJSON.loads(document, bindings, "bench"), repeat=1)),
+                (
+                    "to worker and back, pickle (s)",
+                    timed(lambda: executor.submit(returned, interfaces).result(), repeat=1),
+                ),
+                (
+                    "to worker and back, JSON (s)",
+                    timed(
+                        lambda: pybindJSON.loads(
+                            executor.submit(json_returned, pybindJSON.dumps(root)).result(), bindings, "bench"
+                        ),
+                        repeat=1,
+                    ),
+                ),
+                ("pickle (bytes)", len(pickled)),
+                ("JSON (bytes)", len(document)),
+            ]
+    finally:
+        sys.path.remove(out_dir)
+        shutil.rmtree(out_dir)
+
+    report("Sending a list of %d entries to a worker process" % entries, rows)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
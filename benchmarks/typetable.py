@@ -0,0 +1,51 @@
+"""
+Measure the size of the generated bindings, and the time and memory taken to
+import them - which depend on how many times each type is written out.
+
+    python -m benchmarks.typetable [flags...]
+"""
+
+import subprocess
+import sys
+import tracemalloc
+import types
+
+from benchmarks.base import BASE_PATH, pyang_command, report, timed
+from benchmarks.memory import allocated
+from benchmarks.yangdynclass import populate
+
+
+def import_bindings(code):
+    module = types.ModuleType("bindings")
+    exec(compile(code, "bindings.py", "exec"), module.__dict__)
+    return module
+
+
+def main(*flags):
+    code = subprocess.check_output(
+        pyang_command(["bench.yang"], flags=flags), stderr=subprocess.STDOUT, env={"PYTHONPATH": BASE_PATH}
+    ).decode("utf-8")
+
+    tracemalloc.start()
+    try:
+        bindings = import_bindings(code)
+        imported = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    _, populated = allocated(lambda: populate(bindings, 1000))
+
+    report(
+        "Generated bindings for bench.yang",
+        [
+            ("source (bytes)", len(code.encode("utf-8"))),
+            ("type table entries", code.count("\n_pyangbind_types[")),
+            ("import (ms)", timed(lambda: import_bindings(code), number=10) * 100),
+            ("allocated by import (bytes)", imported),
+            ("allocated by 1000 list entries (bytes)", populated),
+            ("populate 1000 list entries (s)", timed(lambda: populate(bindings, 1000))),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,102 @@
+"""
+Time finding the member type of the unions that are common in OpenConfig
+models, comparing trying each member type in order (as YANGDynClass did) with
+the union's plan.
+
+    python -m benchmarks.union [values]
+"""
+
+import sys
+
+from pyangbind.lib.yangtypes import RestrictedClassType, RestrictedPrecisionDecimalType, YANGDynClass, union_plan
+
+from benchmarks.base import report, timed
+
+IPV4 = (
+    "(([0-9]|[1-9][0-9]|1[0-9][0-9]|2[0-4][0-9]|25[0-5])\\.){3}" "([0-9]|[1-9][0-9]|1[0-9][0-9]|2[0-4][0-9]|25[0-5])"
+)
+IPV6 = "([0-9a-fA-F]{1,4}:){0,7}[0-9a-fA-F]{0,4}(::)?([0-9a-fA-F]{1,4}:){0,7}[0-9a-fA-F]{0,4}"
+
+UNIONS = {
+    # oc-inet:ip-address
+    "ip-address": (
+        [
+            RestrictedClassType(base_type=str, restriction_dict={"pattern": IPV4}),
+            RestrictedClassType(base_type=str, restriction_dict={"pattern": IPV6}),
+        ],
+        ["192.0.2.%d" % (i % 256) for i in range(64)] + ["2001:db8::%x" % i for i in range(64)],
+    ),
+    # oc-inet:ip-prefix
+    "ip-prefix": (
+        [
+            RestrictedClassType(
+                base_type=str, restriction_dict={"pattern": IPV4 + "/(([0-9])|([1-2][0-9])|(3[0-2]))"}
+            ),
+            RestrictedClassType(
+                base_type=str, restriction_dict={"pattern": IPV6 + "/(12[0-8]|1[01][0-9]|[1-9]?[0-9])"}
+            ),
+        ],
+        ["192.0.%d.0/24" % (i % 256) for i in range(64)] + ["2001:db8:%x::/48" % i for i in range(64)],
+    ),
+    # e.g., oc-if:mtu-or-auto, the uint32 and enumeration members of
+    # oc-bgp-types:bgp-set-med-type
+    "uint32-or-enum": (
+        [
+            RestrictedClassType(base_type=int, restriction_dict={"range": ["0..4294967295"]}, int_size=32),
+            RestrictedClassType(base_type=str, restriction_dict={"dict_key": {"IGP": {}, "AUTO": {}}}),
+        ],
+        [i * 1000 for i in range(64)] + ["IGP", "AUTO"] * 32,
+    ),
+    # e.g., oc-types:timeticks64 or oc-pol-types:tag-type
+    "uint32-decimal-or-string": (
+        [
+            RestrictedClassType(base_type=int, restriction_dict={"range": ["0..4294967295"]}, int_size=32),
+            RestrictedPrecisionDecimalType(precision=2),
+            RestrictedClassType(base_type=str, restriction_dict={"pattern": "[a-z][a-z0-9-]*"}),
+        ],
+        [str(i) for i in range(32)] + ["%d.25" % i for i in range(32)] + ["tag-%d" % i for i in range(64)],
+    ),
+}
+
+
+def ordered_trial(member_types, value):
+    for member_type in member_types:
+        try:
+            member_type(value)
+            return member_type
+        except Exception:
+            pass
+    raise TypeError("did not find a valid type using the argument as a hint")
+
+
+def main(values=128):
+    rows = []
+    for name, (member_types, sample) in UNIONS.items():
+        sample = (sample * (values // len(sample) + 1))[:values]
+        plan = union_plan(member_types)
+
+        def trial():
+            for value in sample:
+                ordered_trial(member_types, value)
+
+        def planned():
+            for value in sample:
+                plan.resolve(member_types, value)
+
+        def constructed():
+            for value in sample:
+                YANGDynClass(value, base=member_types, yang_name="leaf", is_leaf=True)
+
+        rows.extend(
+            [
+                ("%s: ordered trial (us/value)" % name, timed(trial, number=100) * 1e4 / values),
+                ("%s: plan (us/value)" % name, timed(planned, number=100) * 1e4 / values),
+                ("%s: YANGDynClass (us/value)" % name, timed(constructed, number=100) * 1e4 / values),
+            ]
+        )
+
+    report("Finding the member type of %d values of each union" % values, rows)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,52 @@
+"""
+Count the classes that YANGDynClass creates whilst a tree is built and then
+populated, and time the construction of the tree.
+
+    python -m benchmarks.yangdynclass [entries]
+"""
+
+import gc
+import sys
+
+from benchmarks.base import generate_bindings, report, timed
+
+
+def count_wrapper_classes():
+    gc.collect()
+    return len([o for o in gc.get_objects() if isinstance(o, type) and o.__name__ == "YANGBaseClass"])
+
+
+def populate(bindings, entries):
+    root = bindings.bench()
+    for i in range(entries):
+        intf = root.interfaces.interface.add("eth%d" % i)
+        intf.config.description = "interface %d" % i
+        intf.config.mtu = 9000
+        intf.config.enabled = False
+        intf.config.vlan = 1 + (i % 4094)
+    return root
+
+
+def main(entries=1000):
+    bindings = generate_bindings(["bench.yang"])
+
+    before = count_wrapper_classes()
+    warm = bindings.bench()
+    warmed = count_wrapper_classes()
+    root = populate(bindings, entries)
+    after = count_wrapper_classes()
+    del warm, root
+
+    report(
+        "YANGDynClass wrapper classes (%d list entries)" % entries,
+        [
+            ("alive before first instance", before),
+            ("alive after first instance", warmed),
+            ("alive after populating", after),
+            ("populate time (s)", timed(lambda: populate(bindings, entries))),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
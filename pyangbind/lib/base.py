@@ -18,6 +18,10 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from pyangbind.lib import fork
+from pyangbind.lib.journal import YANGChangeJournal
+from pyangbind.lib.yangtypes import deepcopy_node, reduce_node
+
 
 class PybindBase(object):
     __slots__ = ()
@@ -28,6 +32,110 @@ class PybindBase(object):
     def __str__(self):
         return str(self.elements())
 
+    def __reduce_ex__(self, protocol):
+        # a container is pickled as its values and its path within the tree
+        # of generated classes that it belongs to, see reduce_node.
+        return reduce_node(self)
+
+    def __deepcopy__(self, memo):
+        # the whole tree is copied, see deepcopy_node.
+        return deepcopy_node(self)
+
+    def _path_tuple(self):
+        # The path of a container that is not an element of another (e.g.,
+        # the root of a tree) is fixed, so is built once for its class.
+        cls = type(self)
+        path = cls.__dict__.get("_pyangbind_path")
+        if path is None:
+            path = tuple(self._path())
+            cls._pyangbind_path = path
+        return path
+
+    def _pyangbind_materialised(self, element_name):
+        # Classes that are generated with --lazy-children override this
+        # method to indicate whether an element has been created yet.
+        return True
+
+    def _pyangbind_materialise(self, element_name):
+        # Called where an element of the container has not been created -
+        # either because it is still shared with the container that this
+        # one was forked from, or because children are created lazily.
+        if getattr(self, "_pyangbind_source", None) is not None:
+            fork.copy_from_source(self)
+            if hasattr(self, fork.element_attribute(self, element_name)):
+                return
+        getattr(self, "_unset_%s" % element_name)()
+
+    def _pyangbind_unshare(self):
+        # Called before an element of the container is changed.
+        fork.unshare(self)
+
+    def _fork(self, path_helper=None):
+        """
+        Return a copy-on-write fork of the tree of objects that this
+        container belongs to - or where the container is within the tree,
+        the container of the fork that corresponds to it. The fork is
+        created without copying the tree, a container is only copied when it
+        is first accessed through the fork, or changed in the tree.
+
+        Where path_helper is specified, the objects of the fork are
+        registered with it - in which case the fork is copied in full.
+        """
+        return fork.fork(self, path_helper=path_helper)
+
+    def _mark_clean(self):
+        """
+        Mark every object within this container as unchanged. Rather than
+        visiting each object, this starts a new change epoch for the tree of
+        objects below each element of the container.
+        """
+        tracker = getattr(self, "_change_tracker", None)
+        if tracker is not None:
+            tracker.epoch += 1
+            return
+        trackers = {}
+        for element_name in self._pyangbind_elements:
+            if not self._pyangbind_materialised(element_name):
+                continue
+            tracker = getattr(getattr(self, element_name), "_change_tracker", None)
+            if tracker is not None:
+                trackers[id(tracker)] = tracker
+        for tracker in trackers.values():
+            tracker.epoch += 1
+
+    def _enable_journal(self, maxlen=10000):
+        """
+        Record the changes made to the tree of objects that this container
+        belongs to, returning the YANGChangeJournal that they are recorded
+        in. Where the journal is already enabled, the existing journal is
+        returned.
+        """
+        tracker = getattr(self, "_change_tracker", None)
+        if tracker is None:
+            raise AttributeError("the bindings must be regenerated to record a journal of changes")
+        if tracker.journal is None:
+            tracker.journal = YANGChangeJournal(maxlen=maxlen)
+        return tracker.journal
+
+    def _disable_journal(self):
+        tracker = getattr(self, "_change_tracker", None)
+        if tracker is not None:
+            tracker.journal = None
+
+    def _journal_unset(self, element_name):
+        # Called before an element is returned to its default, to record it
+        # where there is a journal and the element had a value.
+        tracker = getattr(self, "_change_tracker", None)
+        journal = tracker.journal if tracker is not None else None
+        if journal is None or not self._pyangbind_materialised(element_name):
+            return
+        element = getattr(self, element_name)
+        if getattr(element, "_pybind_generated_by", None) == "YANGListType":
+            if len(element):
+                journal.record("unset", element, absent=journal.absent_ancestor(self, without=element))
+        elif element._mchanged is not False or element._cpresent:
+            journal.record("unset", element, absent=journal.absent_ancestor(self, without=element))
+
     def get(self, filter=False):
         def error():
             return NameError, "element does not exist"
@@ -35,6 +143,10 @@ class PybindBase(object):
         d = {}
         # for each YANG element within this container.
         for element_name in self._pyangbind_elements:
+            if filter is True and not self._pyangbind_materialised(element_name):
+                # an element that has not been created cannot have been
+                # changed, so there is no need to create it.
+                continue
             element = getattr(self, element_name, error)
             if hasattr(element, "yang_name"):
                 # retrieve the YANG name method
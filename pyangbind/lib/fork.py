@@ -0,0 +1,276 @@
+"""
+Copyright 2015, Rob Shakir (rjs@jive.com, rjs@rob.sh)
+
+This project has been supported by:
+          * Jive Communcations, Inc.
+          * BT plc.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+fork:
+  * copy-on-write forks of a tree of pyangbind objects.
+
+A fork of a tree is created without copying it. Each container of the fork
+initially shares its elements with the container of the tree that it was
+forked from (its source), and copies them when they are first accessed -
+such that only the containers of the tree that are read or changed through
+the fork are copied, a level at a time.
+
+The source of a container that is shared is not changed until the
+container has been copied: before a container (or an element that is
+changed in place, such as a leaf-list) is changed, the forks that still
+share it, or one of its ancestors, are given a copy of it.
+"""
+
+import copy
+import weakref
+
+from pyangbind.lib.yangtypes import YANGChangeTracker
+
+# Containers that are being copied from their source. Copying a container
+# does not change its source, so the forks that share the source do not need
+# to be copied whilst this is non-zero.
+_copying = 0
+
+# The layout of each class of container, see _layout().
+_layouts = weakref.WeakKeyDictionary()
+
+
+def _layout(cls):
+    # Return the attributes that store the elements of a container of class
+    # cls, keyed by the element name, and the names of the remaining slots -
+    # which store the state of the container itself.
+    layout = _layouts.get(cls)
+    if layout is not None:
+        return layout
+
+    elements = {}
+    state = []
+    excluded = {"_pyangbind_source", "_pyangbind_forks"}
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        if "_pyangbind_elements" in klass.__dict__ and not elements:
+            for name in klass.__dict__["_pyangbind_elements"]:
+                elements[name] = "_%s__%s" % (klass.__name__.lstrip("_"), name)
+        for slot in slots:
+            # the elements of the container are private attributes.
+            if slot.startswith("__") or slot in excluded or slot in state:
+                continue
+            state.append(slot)
+
+    layout = _layouts[cls] = (elements, tuple(state))
+    return layout
+
+
+def element_attribute(obj, element_name):
+    """
+    Return the name of the attribute of the container obj that stores the
+    element element_name.
+    """
+    return _layout(type(obj))[0][element_name]
+
+
+def fork(obj, path_helper=None):
+    """
+    Return a fork of the tree of objects that obj belongs to, and the object
+    of the fork that corresponds to obj.
+    """
+    # the root of the tree, and the objects between it and obj.
+    path = []
+    root = obj
+    while getattr(root, "_parent", None):
+        path.append(root)
+        root = root._parent
+
+    tracker = getattr(root, "_change_tracker", None)
+    if tracker is None:
+        raise AttributeError("the bindings must be regenerated to fork a tree of objects")
+
+    tracker.forked = True
+    # changes that were made to the tree before it was forked are changes
+    # within the fork, in the same epoch.
+    new = _fork_container(root, None, YANGChangeTracker(epoch=tracker.epoch), path_helper or False)
+
+    if path_helper:
+        # each object must be registered with the path helper to be found
+        # by it, so the fork is copied in full.
+        deferred = getattr(path_helper, "deferred_registration", None)
+        if deferred is not None:
+            with deferred():
+                _copy_all(new)
+        else:
+            _copy_all(new)
+
+    source = root
+    for child in reversed(path):
+        new = _corresponding(new, source, child)
+        source = child
+    return new
+
+
+def _corresponding(new, source, child):
+    # Return the element of new that corresponds to child, an element (or
+    # list entry) of source.
+    for element_name in source._pyangbind_elements:
+        if not source._pyangbind_materialised(element_name):
+            continue
+        element = getattr(source, element_name)
+        if element is child:
+            return getattr(new, element_name)
+        if getattr(element, "_pybind_generated_by", None) == "YANGListType":
+            for k, entry in element.iteritems():
+                if entry is child:
+                    return getattr(new, element_name)[k]
+    raise ValueError("%s is not an element of %s" % (child, source))
+
+
+def _copy_all(obj):
+    # Copy each object of the fork below obj.
+    for element_name in obj._pyangbind_elements:
+        element = getattr(obj, element_name)
+        generated_by = getattr(element, "_pybind_generated_by", None)
+        if generated_by == "YANGListType":
+            for entry in element.itervalues():
+                _copy_all(entry)
+        elif generated_by == "container":
+            _copy_all(element)
+
+
+def _fork_container(source, parent, tracker, path_helper):
+    # Return a container that shares the elements of source, rather than
+    # creating them.
+    cls = type(source)
+    new = cls.__new__(cls)
+    for name in _layout(cls)[1]:
+        try:
+            setattr(new, name, getattr(source, name))
+        except AttributeError:
+            pass
+
+    if parent is not None:
+        new._parent = parent
+    new._change_tracker = tracker
+    new._path_helper = path_helper
+    _copy_metadata(new)
+    if path_helper and getattr(new, "_register_paths", False):
+        path_helper.register(new._register_path(), new)
+
+    # the source refers to the forks that share it weakly, such that a fork
+    # that is no longer used is released.
+    new._pyangbind_source = source
+    forks = getattr(source, "_pyangbind_forks", None)
+    if not forks:
+        source._pyangbind_forks = [weakref.ref(new)]
+    else:
+        if len(forks) >= 8:
+            forks[:] = [ref for ref in forks if ref() is not None]
+        forks.append(weakref.ref(new))
+    return new
+
+
+def _copy_metadata(obj):
+    try:
+        obj._metadatad = dict(obj._metadatad)
+    except AttributeError:
+        pass
+
+
+def copy_from_source(obj):
+    """
+    Copy the elements of the container obj that it shares with its source.
+    """
+    global _copying
+    source = obj._pyangbind_source
+    if source is None:
+        return
+
+    obj._pyangbind_source = None
+    _copying += 1
+    try:
+        for element_name, attribute in _layout(type(obj))[0].items():
+            if hasattr(obj, attribute) or not source._pyangbind_materialised(element_name):
+                # the element has been set since the fork was created, or has
+                # not been created in the source.
+                continue
+            element = getattr(source, "_get_%s" % element_name)()
+            generated_by = getattr(element, "_pybind_generated_by", None)
+            if generated_by == "container":
+                element = _fork_container(element, obj, obj._change_tracker, obj._path_helper)
+            elif generated_by == "YANGListType":
+                element = _fork_list(element, obj, element_name, attribute)
+            else:
+                element = _copy_leaf(element, obj)
+            setattr(obj, attribute, element)
+    finally:
+        _copying -= 1
+
+
+def _fork_list(source, parent, element_name, attribute):
+    # A list refers to its parent, hence an empty list is created by the
+    # parent, and is given the entries of the source. This is not a change
+    # to the fork, so it is not recorded.
+    tracker = parent._change_tracker
+    journal, tracker.journal = tracker.journal, None
+    try:
+        getattr(parent, "_unset_%s" % element_name)()
+    finally:
+        tracker.journal = journal
+    new = getattr(parent, attribute)
+    new._mchanged = source._mchanged
+    try:
+        new._metadatad = dict(source._metadatad)
+    except AttributeError:
+        pass
+    new._members._user_ordered = source._members._user_ordered
+    for k, entry in source.iteritems():
+        new._members[k] = _fork_container(entry, parent, parent._change_tracker, parent._path_helper)
+    return new
+
+
+def _copy_leaf(source, parent):
+    new = copy.copy(source)
+    new._parent = parent
+    new._change_tracker = parent._change_tracker
+    new._path_helper = parent._path_helper
+    _copy_metadata(new)
+    if parent._path_helper and new._register_paths:
+        parent._path_helper.register(new._register_path(), new)
+    return new
+
+
+def unshare(obj):
+    """
+    Called before the container obj is changed, such that the forks that
+    still share it - or one of its ancestors - are given a copy of it.
+    """
+    tracker = getattr(obj, "_change_tracker", None)
+    if tracker is None or not tracker.forked or _copying:
+        return
+
+    ancestors = []
+    while obj:
+        ancestors.append(obj)
+        obj = getattr(obj, "_parent", None)
+
+    # copying a fork of an ancestor creates forks of its elements, which
+    # share the next ancestor - hence they are copied from the root down.
+    for ancestor in reversed(ancestors):
+        forks = getattr(ancestor, "_pyangbind_forks", None)
+        if forks:
+            ancestor._pyangbind_forks = None
+            for ref in forks:
+                dependent = ref()
+                if dependent is not None:
+                    copy_from_source(dependent)
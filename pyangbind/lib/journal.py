@@ -0,0 +1,163 @@
+"""
+Copyright 2015, Rob Shakir (rjs@jive.com, rjs@rob.sh)
+
+This project has been supported by:
+          * Jive Communcations, Inc.
+          * BT plc.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+journal:
+  * a record of the changes that are made to a tree of pyangbind objects,
+    such that only the changes since a checkpoint need to be serialised.
+"""
+
+import collections
+import contextlib
+import itertools
+
+YANGJournalEntry = collections.namedtuple(
+    "YANGJournalEntry", ["sequence", "operation", "obj", "value", "position", "absent"]
+)
+
+
+class YANGJournalOverflowError(Exception):
+    """
+    Raised where the changes since a checkpoint are requested, but some of
+    them are no longer held by the journal.
+    """
+
+    pass
+
+
+class YANGChangeJournal(object):
+    """
+    A bounded record of the changes made to a tree of pyangbind objects. Each
+    entry is a YANGJournalEntry, with an operation of:
+
+      - "set": a leaf, leaf-list or container was set, or a list entry was
+        replaced.
+      - "unset": an element was returned to its default.
+      - "add": an entry was added to a list.
+      - "delete": an entry was removed from a list, position is the index
+        that it was at within the list.
+
+    The value of an entry is the IETF JSON encoding of the object when the
+    change was made, such that later changes do not alter it. Where the
+    parents of the object were absent from the IETF JSON encoding of the tree
+    before it was set or added (e.g., a container without values, or a list
+    without entries) - or are absent once it is unset or deleted - absent is
+    the outermost of them, see absent_ancestor(). Each entry has a
+    sequence number, and a checkpoint is the sequence number of the next entry
+    to be recorded - such that since() returns the changes made after it.
+
+    Where more than maxlen entries are recorded, the oldest are discarded.
+    """
+
+    def __init__(self, maxlen=10000):
+        self._entries = collections.deque(maxlen=maxlen)
+        self._next = 1
+        self._paused = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    @property
+    def maxlen(self):
+        return self._entries.maxlen
+
+    def record(self, operation, obj, position=None, absent=None):
+        if self._paused:
+            return
+        if operation in ["set", "add"]:
+            value = _snapshot(obj)
+        else:
+            value = None
+        self._entries.append(YANGJournalEntry(self._next, operation, obj, value, position, absent))
+        self._next += 1
+
+    def absent_ancestor(self, node, without=None):
+        """
+        Return the outermost of node and its ancestors that is absent from
+        the IETF JSON encoding of the tree, or None where node is present.
+        This is called before a value is added within node, such that a patch
+        creates the parents of the value that do not exist - or once a value
+        is removed from within it (where without is the value that is about
+        to be removed), such that the parents that are left without values
+        are removed too.
+        """
+        if self._paused or not hasattr(node, "_parent"):
+            return None
+        from pyangbind.lib.serialise import pybindIETFPatchEncoder
+
+        return pybindIETFPatchEncoder.absent_ancestor(node, without)
+
+    @contextlib.contextmanager
+    def paused(self):
+        """
+        Do not record changes within the context - used where a change is
+        made up of other changes, such that only it is recorded.
+        """
+        self._paused += 1
+        try:
+            yield self
+        finally:
+            self._paused -= 1
+
+    def checkpoint(self):
+        return self._next
+
+    def _first(self):
+        # the sequence number of the oldest entry that is still held.
+        return self._entries[0].sequence if self._entries else self._next
+
+    def since(self, checkpoint):
+        """
+        Return the entries recorded since checkpoint, in order. Raises
+        YANGJournalOverflowError if some of them have been discarded - in
+        which case the tree must be serialised in full.
+        """
+        first = self._first()
+        if checkpoint < first:
+            raise YANGJournalOverflowError(
+                "changes since checkpoint %d have been discarded, the oldest held is %d" % (checkpoint, first)
+            )
+        return list(itertools.islice(self._entries, checkpoint - first, None))
+
+    def trim(self, checkpoint):
+        """
+        Discard the entries recorded before checkpoint.
+        """
+        while self._entries and self._entries[0].sequence < checkpoint:
+            self._entries.popleft()
+
+
+_serialiser = None
+
+
+def _snapshot(obj):
+    # Return the IETF JSON encoding of obj. The serialisers, which import
+    # lxml, are imported when the first change is recorded rather than with
+    # the bindings.
+    global _serialiser
+    from pyangbind.lib.serialise import IETFYangDataSerialiser, pybindIETFJSONEncoder
+
+    if _serialiser is None:
+        _serialiser = IETFYangDataSerialiser()
+    if getattr(obj, "_pybind_generated_by", None) == "container":
+        tree = pybindIETFJSONEncoder.generate_element(obj, parent_namespace=obj._namespace, flt=True)
+        return _serialiser.preprocess_element(tree)
+    return _serialiser.default(obj)
@@ -24,7 +24,13 @@ import copy
 import json
 from collections import OrderedDict
 
-from pyangbind.lib.serialise import pybindIETFJSONEncoder, pybindJSONDecoder, pybindJSONEncoder, pybindJSONIOError
+from pyangbind.lib.serialise import (
+    pybindIETFJSONEncoder,
+    pybindIETFPatchEncoder,
+    pybindJSONDecoder,
+    pybindJSONEncoder,
+    pybindJSONIOError,
+)
 
 
 def remove_path(tree, path):
@@ -157,6 +163,17 @@ def dumps(obj, indent=4, filter=True, skip_subtrees=[], select=False, mode="defa
     return json.dumps(tree, cls=cls, indent=indent)
 
 
+def dumps_patch(entries, indent=4, mode="yang-patch", patch_id=None):
+    # entries are those of a YANGChangeJournal, e.g., journal.since(checkpoint)
+    if mode == "yang-patch":
+        patch = pybindIETFPatchEncoder.yang_patch(entries, patch_id=patch_id)
+    elif mode == "json-patch":
+        patch = pybindIETFPatchEncoder.json_patch(entries)
+    else:
+        raise ValueError("unknown patch mode %s" % mode)
+    return json.dumps(patch, indent=indent)
+
+
 def dump(obj, fn, indent=4, filter=True, skip_subtrees=[], mode="default"):
     try:
         fh = open(fn, "w")
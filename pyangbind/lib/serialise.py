@@ -26,15 +26,17 @@ serialise:
 
 from __future__ import unicode_literals
 
+import copy
 import json
 from collections import OrderedDict
 from decimal import Decimal
+from urllib.parse import quote
 import base64
 
 from enum import IntEnum
 from lxml import objectify, etree
 
-from pyangbind.lib.yangtypes import YANGBool, safe_name
+from pyangbind.lib.yangtypes import YANGBool, YANGDecimal64, safe_name
 
 
 long = int
@@ -164,7 +166,7 @@ class YangDataSerialiser(object):
             return int(obj)
         elif isinstance(obj, (YANGBool, bool)):
             return bool(obj)
-        elif isinstance(obj, Decimal):
+        elif isinstance(obj, (Decimal, YANGDecimal64)):
             return self.yangt_decimal(obj)
 
         raise AttributeError(
@@ -309,6 +311,305 @@ class pybindIETFJSONEncoder(_pybindJSONEncoderBase):
         return ietf_tree_json_func(obj, parent_namespace=parent_namespace, flt=flt, with_defaults=with_defaults)
 
 
+class pybindIETFPatchEncoder(object):
+    """
+    Encode the entries of a YANGChangeJournal as a patch to the IETF JSON
+    encoding of a tree - either as an RFC 8072 YANG Patch, or an RFC 6902
+    JSON Patch. The names used in the paths and values are those of the
+    IETF JSON encoding, as generated by pybindIETFJSONEncoder.
+
+    The paths are determined when the entries are encoded. JSON Patch refers
+    to list entries by their position, which is that at the time of each
+    change - such that the patch must be applied to the document as it was
+    when the first of the entries was recorded. Where the parents of a change
+    did not exist in that document (see YANGChangeJournal.absent_ancestor),
+    the outermost of them is added with the value nested within it.
+    """
+
+    @staticmethod
+    def _nodes(obj):
+        # Return (name, node) for each node from the root of the tree to obj,
+        # where name is the IETF JSON name of the node.
+        nodes = []
+        while getattr(obj, "_parent", None):
+            nodes.append(obj)
+            obj = obj._parent
+        namespace = None
+        path = []
+        for node in reversed(nodes):
+            path.append((pybindIETFJSONEncoder.yname_ns_func(namespace, node, node._yang_name), node))
+            namespace = node._namespace
+        return path
+
+    @staticmethod
+    def _list_of(node, lists=None):
+        # Return the list that node is an entry of, or None where it is not
+        # a list entry. lists maps (parent, name) to lists that have since
+        # been replaced in the tree.
+        if not getattr(node, "_pybind_generated_by", None) == "container":
+            return None
+        parent = node._parent
+        if lists is not None and (id(parent), node._yang_name) in lists:
+            return lists[(id(parent), node._yang_name)]
+        getter = getattr(parent, "_get_%s" % safe_name(node._yang_name), None)
+        candidate = getter() if getter is not None else None
+        if getattr(candidate, "_pybind_generated_by", None) == "YANGListType":
+            return candidate
+        return None
+
+    @classmethod
+    def absent_ancestor(cls, node, without=None):
+        # Return the outermost of node and its ancestors that is absent from
+        # the IETF JSON encoding of the tree (disregarding the object without,
+        # which is about to be removed), or None. The root of the tree is the
+        # document itself, and a list entry is encoded whether or not it has
+        # values, so neither of them is absent.
+        absent = None
+        while getattr(node, "_parent", None):
+            if getattr(node, "_pybind_generated_by", None) == "YANGListType":
+                if len(node):
+                    break
+            elif cls._list_of(node) is not None or cls._encoded(node, without):
+                break
+            absent = node
+            node = node._parent
+        return absent
+
+    @classmethod
+    def _encoded(cls, obj, without=None):
+        # Return whether obj is within the IETF JSON encoding of its tree, as
+        # generated by pybindIETFJSONEncoder - where empty containers and
+        # lists, and leaves that have not been set, are left out.
+        generated_by = getattr(obj, "_pybind_generated_by", None)
+        if generated_by == "YANGListType":
+            return len(obj) > 0
+        if generated_by == "container":
+            if getattr(obj, "_cpresent", False):
+                return True
+            for element_name in obj._pyangbind_elements:
+                if not obj._pyangbind_materialised(element_name):
+                    continue
+                element = getattr(obj, element_name)
+                if element is not without and cls._encoded(element, without):
+                    return True
+            return False
+        return obj._changed()
+
+    @staticmethod
+    def _value(operation, node, value):
+        # The value of an edit, keyed by the module-qualified name of node.
+        name = "%s:%s" % (node._defining_module, node._yang_name)
+        if operation in ["add", "set"] and pybindIETFPatchEncoder._list_of(node) is not None:
+            return {name: [value]}
+        return {name: value}
+
+    @classmethod
+    def yang_patch(cls, entries, patch_id=None):
+        """
+        Return the ietf-yang-patch:yang-patch for entries. Leaves that are
+        set, and entries added to a list, are merged - leaf-lists, containers
+        and list entries that are set are replaced.
+        """
+        edits = []
+        last = None
+        for entry in entries:
+            target = ""
+            for name, node in cls._nodes(entry.obj):
+                target += "/" + quote(name, safe=":")
+                lst = cls._list_of(node)
+                if lst is not None:
+                    if not lst._keyval:
+                        raise ValueError("an entry of a list without a key cannot be the target of a YANG patch")
+                    target += "=" + ",".join(
+                        quote(cls._key_string(getattr(node, kn)), safe="") for kn in lst._keyval.split(" ")
+                    )
+
+            edit = OrderedDict([("edit-id", str(entry.sequence))])
+            if entry.operation in ["unset", "delete"]:
+                edit["operation"] = "remove"
+                edit["target"] = target
+            else:
+                # a leaf-list or container is replaced, such that the values
+                # that it no longer has are removed.
+                generated_by = getattr(entry.obj, "_pybind_generated_by", None)
+                replace = entry.operation == "set" and generated_by in ["container", "TypedListType"]
+                edit["operation"] = "replace" if replace else "merge"
+                edit["target"] = target
+                edit["value"] = cls._value(entry.operation, entry.obj, entry.value)
+            edits.append(edit)
+            last = entry.sequence
+
+        if patch_id is None:
+            patch_id = "pyangbind-%s" % last
+        return {"ietf-yang-patch:yang-patch": OrderedDict([("patch-id", patch_id), ("edit", edits)])}
+
+    @staticmethod
+    def _key_string(key):
+        value = IETFYangDataSerialiser().default(key)
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+
+    @classmethod
+    def json_patch(cls, entries):
+        """
+        Return the list of RFC 6902 operations for entries.
+        """
+        entries = list(entries)
+
+        # Determine the order of the entries of each list before each change,
+        # working backwards from the order of the list now.
+        lists = {}
+        orders = {}
+        resolved = []
+        for entry in reversed(entries):
+            path = [(name, node, cls._list_of(node, lists)) for name, node in cls._nodes(entry.obj)]
+            for _, _, lst in path:
+                if lst is not None and id(lst) not in orders:
+                    orders[id(lst)] = list(lst.itervalues())
+            resolved.append(path)
+
+            if entry.operation == "unset" and getattr(entry.obj, "_pybind_generated_by", None) == "YANGListType":
+                # changes before the list was unset were made to its entries
+                lists[(id(entry.obj._parent), entry.obj._yang_name)] = entry.obj
+                orders.setdefault(id(entry.obj), list(entry.obj.itervalues()))
+            elif entry.operation in ["add", "delete"]:
+                order = orders[id(path[-1][2])]
+                if entry.operation == "add":
+                    del order[cls._index(order, entry.obj)]
+                else:
+                    order.insert(entry.position, entry.obj)
+        resolved.reverse()
+
+        operations = []
+        # The JSON encoding of the nodes that the patch creates, as they will
+        # be in the document once it is applied, and the elements that it
+        # removes - such that the parents of a target that do not exist in the
+        # document are created by the patch.
+        created = {}
+        removed = set()
+        for entry, path in zip(entries, resolved):
+            steps = []
+            starts = []
+            ends = []
+            for name, node, lst in path:
+                starts.append(len(steps))
+                steps.append(name)
+                if lst is not None:
+                    order = orders[id(lst)]
+                    if node is entry.obj and entry.operation == "add":
+                        steps.append("-")
+                        order.append(node)
+                    else:
+                        index = cls._index(order, node)
+                        steps.append(index)
+                        if node is entry.obj and entry.operation == "delete":
+                            del order[index]
+                ends.append(len(steps))
+
+            remove = entry.operation in ["unset", "delete"]
+            op = "remove" if remove else "add"
+            if entry.operation == "set" and path[-1][2] is not None:
+                # an entry that is set replaces the entry at its position,
+                # rather than being inserted before it.
+                op = "replace"
+
+            # The outermost parent that was absent from the document before
+            # the target was added, or is absent once it is removed.
+            absent = None
+            if entry.absent is not None:
+                for i, (name, node, lst) in enumerate(path):
+                    if node is entry.absent or lst is entry.absent:
+                        absent = starts[i]
+                        break
+
+            # Find the first step of the path that does not exist - either
+            # since it was absent when the change was made, or it has been
+            # removed by the patch.
+            missing = None if remove else absent
+            for i, (name, node, lst) in enumerate(path):
+                if missing is not None and starts[i] >= missing:
+                    break
+                if (id(node._parent), node._yang_name) in removed:
+                    missing = starts[i]
+                    break
+
+            document, first = None, 0
+            for i in range(len(path) - 1):
+                if id(path[i][1]) in created:
+                    document, first = created[id(path[i][1])], ends[i]
+            # The step that the operation is made at, where it is not the last
+            # step of the path - the document is followed to its parent.
+            last = missing if missing is not None else (absent if remove else None)
+            if document is not None and last is not None and last < first:
+                document = None
+            if document is not None:
+                for i in range(first, len(steps) - 1):
+                    if last is not None and i >= last:
+                        break
+                    if not cls._json_contains(document, steps[i]):
+                        missing = i
+                        break
+                    document = document[steps[i]]
+                if missing is None and remove:
+                    if not cls._json_contains(document, steps[-1 if last is None else last]):
+                        continue
+
+            value = entry.value
+            tail = []
+            if missing is not None:
+                if remove:
+                    continue
+                # the target is added within the parents that do not exist.
+                (steps, tail) = (steps[: missing + 1], steps[missing + 1 :])
+                for step in reversed(tail):
+                    value = {step: value} if isinstance(step, str) and not step == "-" else [value]
+                op = "add"
+            elif remove and absent is not None:
+                # the parents that are left without values are removed with
+                # the target, as they are left out of the encoding.
+                steps = steps[: absent + 1]
+
+            pointer = "".join("/" + str(step).replace("~", "~0").replace("/", "~1") for step in steps)
+            if remove:
+                operations.append(OrderedDict([("op", op), ("path", pointer)]))
+            else:
+                operations.append(OrderedDict([("op", op), ("path", pointer), ("value", value)]))
+
+            for name, node, lst in path:
+                if not remove or node is not entry.obj:
+                    removed.discard((id(node._parent), node._yang_name))
+            if entry.operation == "unset":
+                removed.add((id(entry.obj._parent), entry.obj._yang_name))
+
+            node_value = copy.deepcopy(value)
+            if document is not None:
+                if remove:
+                    del document[steps[-1]]
+                elif steps[-1] == "-":
+                    document.append(node_value)
+                else:
+                    document[steps[-1]] = node_value
+            for step in tail:
+                node_value = node_value[0] if not isinstance(step, str) or step == "-" else node_value[step]
+            if not remove and getattr(entry.obj, "_pybind_generated_by", None) == "container":
+                created[id(entry.obj)] = node_value
+        return operations
+
+    @staticmethod
+    def _json_contains(document, step):
+        if isinstance(document, list):
+            return isinstance(step, int) and step < len(document)
+        return step in document
+
+    @staticmethod
+    def _index(order, node):
+        for index, member in enumerate(order):
+            if member is node:
+                return index
+        raise ValueError("the list entry at %s could not be found" % node._yang_path())
+
+
 class pybindIETFXMLEncoder(object):
     """
     IETF XML encoder for pybind object tree serialisation.
@@ -417,6 +718,8 @@ def make_generate_ietf_tree(yname_ns_func):
 
         d = {}
         for element_name in obj._pyangbind_elements:
+            if flt and with_defaults is None and not obj._pyangbind_materialised(element_name):
+                continue
             element = getattr(obj, element_name, None)
             yang_name = getattr(element, "yang_name", None)
             yname = yang_name() if yang_name is not None else element_name
@@ -537,8 +840,12 @@ class pybindIETFXMLDecoder(object):
                 # There are limitations which need to be addressed, e.g. hexadecimal strings.
                 # Already, we have a stringify-fallback: if we fail on the first attempt then
                 # try again as a pure string (if its allowed).
+                value = child.pyval
+                if any(getattr(t, "_pybind_generated_by", None) == "YANGDecimal64" for t in chobj._allowed_type):
+                    # fixed-point decimal64 values are parsed exactly from their text.
+                    value = child.text
                 try:
-                    chobj.append(child.pyval)
+                    chobj.append(value)
                 except ValueError:
                     if str in chobj._allowed_type:
                         chobj.append(str(child.pyval))
@@ -675,15 +982,7 @@ class pybindJSONDecoder(object):
             elif pybind_attr in ["TypedListType"]:
                 if not overwrite:
                     list_obj = getattr(obj, "_get_%s" % safe_name(key))()
-                    for item in d[key]:
-                        if item not in list_obj:
-                            list_obj.append(item)
-                    list_copy = []
-                    for elem in list_obj:
-                        list_copy.append(elem)
-                    for e in list_copy:
-                        if e not in d[key]:
-                            list_obj.remove(e)
+                    list_obj._reconcile(d[key])
                     set_via_stdmethod = False
                 else:
                     # use the set method
@@ -692,6 +991,7 @@ class pybindJSONDecoder(object):
                 "RestrictedClassType",
                 "ReferencePathType",
                 "RestrictedPrecisionDecimal",
+                "YANGDecimal64",
                 "YANGBits",
             ]:
                 # normal but valid types - which use the std set method
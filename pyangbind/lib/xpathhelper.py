@@ -26,14 +26,15 @@ xpathhelper:
 
 from __future__ import unicode_literals
 
-import uuid
+import contextlib
+import itertools
 from collections import OrderedDict
 
 import regex
 from lxml import etree
 
 from .base import PybindBase
-from .yangtypes import safe_name
+from .yangtypes import YANGReferencedTargets, safe_name
 
 
 class YANGPathHelperException(Exception):
@@ -93,6 +94,28 @@ class PybindXpathHelper(object):
         """
         raise PybindImplementationError("The path helper class specified does " + "not implement get()")
 
+    def get_referenced(self, path, caller=False):
+        """
+        Return the objects that the path of a leafref resolves to, as a
+        YANGReferencedTargets. A path helper may cache the result until an
+        object is registered or unregistered at, or above, the path.
+
+        By default, the path is looked up with get() on each call.
+        """
+        return YANGReferencedTargets(self.get(path, caller=caller))
+
+    @contextlib.contextmanager
+    def deferred_registration(self):
+        """
+        A context manager within which the path helper may defer the objects
+        that are registered, such that they can be added to the tree in a
+        single pass when the context exits. A lookup that is made within the
+        context must still return the objects that have been registered.
+
+        By default, objects are registered immediately.
+        """
+        yield
+
 
 # A class which acts as "/" within the hierarchy - it acts as per any other
 # PyangBind element for the purposes of get() calls - allowing "/" to be
@@ -120,6 +143,19 @@ class YANGPathHelper(PybindXpathHelper):
         self._library = {}
         self._library["root"] = FakeRoot()
         self._root.set("obj_ptr", "root")
+        # The identifier of each object in the library is the next integer,
+        # which is only rendered as a string to be stored in the document.
+        self._object_ids = itertools.count(1)
+        # The (path, object) pairs that have been registered whilst within
+        # deferred_registration(), or None when registration is not deferred.
+        self._deferred = None
+        # The targets of leafref paths, keyed by the path and the caller of a
+        # relative path, see get_referenced(). Each key is also indexed by
+        # the schema paths (the names of the elements, without keys) at which
+        # a registration may change its targets - i.e., each path above, and
+        # including, the path that it resolves to, and the caller.
+        self._referenced = {}
+        self._referenced_by_path = {}
 
     def _path_parts(self, path):
         c = 0
@@ -223,6 +259,56 @@ class YANGPathHelper(PybindXpathHelper):
                         )
         return (tagname, attributes)
 
+    def _schema_path(self, parts, base=()):
+        # Return the names of the elements of the path parts - relative to
+        # the schema path base - without keys or namespaces.
+        names = list(base)
+        for part in parts:
+            if part in ("", "."):
+                continue
+            if part == "..":
+                if names:
+                    names.pop()
+                continue
+            name = part.split("[", 1)[0]
+            if ":" in name:
+                name = name.split(":")[1]
+            names.append(name)
+        return tuple(names)
+
+    def _invalidate_referenced(self, object_path):
+        # Discard the targets of the leafref paths that a registration at
+        # object_path may change.
+        if not self._referenced:
+            return
+        keys = self._referenced_by_path.pop(self._schema_path(object_path), None)
+        if keys:
+            for key in keys:
+                self._referenced.pop(key, None)
+
+    def get_referenced(self, path, caller=False):
+        """
+        Return the objects that the path of a leafref resolves to, as a
+        YANGReferencedTargets. The result is cached until an object is
+        registered or unregistered at, or above, the path - or, for a
+        relative path, the caller.
+        """
+        if not isinstance(path, str) or "(" in path or "*" in path:
+            # a path that is evaluated against other values in the tree, such
+            # as by current(), is not cached.
+            return YANGReferencedTargets(self.get(path, caller=caller))
+
+        relative = self._relative_path_re.match(path) and caller
+        key = (path, tuple(caller) if relative else None)
+        targets = self._referenced.get(key)
+        if targets is None:
+            targets = self._referenced[key] = YANGReferencedTargets(self.get(path, caller=caller))
+            base = self._schema_path(caller) if relative else ()
+            for names in (base, self._schema_path(self._path_parts(path), base)):
+                for i in range(1, len(names) + 1):
+                    self._referenced_by_path.setdefault(names[:i], set()).add(key)
+        return targets
+
     def register(self, object_path, object_ptr, caller=False):
         if isinstance(object_path, str):
             raise XPathError("not meant to receive strings as input to register()")
@@ -230,6 +316,67 @@ class YANGPathHelper(PybindXpathHelper):
         if regex.match(r"^\.\.", object_path[0]):
             raise XPathError("unhandled relative path in register()")
 
+        self._invalidate_referenced(object_path)
+
+        if self._deferred is not None:
+            self._deferred.append((object_path, object_ptr))
+            return
+
+        return self._register(object_path, object_ptr)[1] or None
+
+    @contextlib.contextmanager
+    def deferred_registration(self):
+        """
+        Defer the registration of objects until the context exits. Objects
+        that are registered within the context are then added to the tree in
+        a single pass, in which the element for a path whose parent was added
+        in the same pass is created without searching the tree. Any lookup
+        that is made within the context first adds the objects that are
+        pending. If the context exits with an exception, objects that are
+        pending are discarded.
+        """
+        if self._deferred is not None:
+            # an enclosing context registers the objects when it exits.
+            yield
+            return
+
+        self._deferred = []
+        try:
+            yield
+            self._register_deferred()
+        finally:
+            self._deferred = None
+
+    def _register_deferred(self):
+        pending, self._deferred = self._deferred, None
+        try:
+            # the elements that were added in this pass - a path whose parent
+            # is one of these cannot already exist in the tree - and those
+            # that existed before it, which are found only once.
+            created, existing = {}, {}
+            for object_path, object_ptr in pending:
+                path, parent = tuple(object_path), tuple(object_path[:-1])
+                if path in created:
+                    self._library[created[path].get("obj_ptr")] = object_ptr
+                elif parent in created:
+                    created[path] = self._add_element(created[parent], object_path[-1], object_ptr)
+                else:
+                    (element, updated) = self._register(object_path, object_ptr, parent_o=existing.get(parent))
+                    if updated:
+                        existing[path] = element
+                    else:
+                        created[path] = element
+                    if len(parent):
+                        existing[parent] = element.getparent()
+        finally:
+            self._deferred = []
+
+    def _register(self, object_path, object_ptr, parent_o=None):
+        # Register object_ptr at object_path, returning the element of the
+        # tree for the object and whether an existing element was updated.
+        # The element of the parent of the path can be supplied as parent_o
+        # where it is already known.
+
         # This is a hack to register anything that is a top-level object,
         # it allows modules to register themselves against the FakeRoot
         # class which acts as per other PyangBind objects.
@@ -245,20 +392,19 @@ class YANGPathHelper(PybindXpathHelper):
         if this_obj_existing is not None and not this_obj_existing == []:
             this_obj_existing = this_obj_existing[0]
             if self._library[this_obj_existing.get("obj_ptr")] == object_ptr:
-                return True
+                return (this_obj_existing, True)
             else:
                 del self._library[this_obj_existing.get("obj_ptr")]
-                new_uuid = str(uuid.uuid1())
-                self._library[new_uuid] = object_ptr
-                this_obj_existing.set("obj_ptr", new_uuid)
-                return True
+                new_id = str(next(self._object_ids))
+                self._library[new_id] = object_ptr
+                this_obj_existing.set("obj_ptr", new_id)
+                return (this_obj_existing, True)
 
-        this_obj_id = str(uuid.uuid1())
-        self._library[this_obj_id] = object_ptr
         parent = object_path[:-1]
-        (tagname, attributes) = self._tagname_attributes(object_path[-1])
 
-        if parent == []:
+        if parent_o is not None:
+            pass
+        elif parent == []:
             parent_o = self._root
         else:
             parent_o = self._get_etree(parent)
@@ -269,13 +415,23 @@ class YANGPathHelper(PybindXpathHelper):
                     + "/".join(parent)
                 )
             if parent_o == []:
+                (tagname, _) = self._tagname_attributes(object_path[-1])
                 raise XPathError("parent node did not exist for %s @ %s" % (tagname, "/" + "/".join(parent)))
             parent_o = parent_o[0]
 
+        return (self._add_element(parent_o, object_path[-1], object_ptr), False)
+
+    def _add_element(self, parent_o, path_element, object_ptr):
+        # Add a child element to parent_o, which refers to object_ptr.
+        this_obj_id = str(next(self._object_ids))
+        self._library[this_obj_id] = object_ptr
+        (tagname, attributes) = self._tagname_attributes(path_element)
+
         added_item = etree.SubElement(parent_o, tagname, obj_ptr=this_obj_id)
         if attributes is not None:
             for k, v in attributes.items():
                 added_item.set(k, v)
+        return added_item
 
     def unregister(self, object_path, caller=False):
         if isinstance(object_path, str):
@@ -283,6 +439,7 @@ class YANGPathHelper(PybindXpathHelper):
         if regex.match(r"^(\.|\.\.|\/)", object_path[0]):
             raise XPathError("unhandled relative path in unregister()")
 
+        self._invalidate_referenced(object_path)
         existing_objs = self._get_etree(object_path)
         if len(existing_objs) == 0:
             raise XPathError("object did not exist to unregister - %s" % object_path)
@@ -293,6 +450,8 @@ class YANGPathHelper(PybindXpathHelper):
             obj.getparent().remove(obj)
 
     def _get_etree(self, object_path, caller=False):
+        if self._deferred:
+            self._register_deferred()
         fx_q = self._encode_path(object_path, caller=caller)
         if self._relative_path_re.match(fx_q) and caller:
             fx_q = "." + self._encode_path(caller)
@@ -23,10 +23,15 @@ limitations under the License.
 from __future__ import unicode_literals
 
 import base64
+import bisect
 import collections
 from collections import abc
+import contextlib
 import copy
-import uuid
+import itertools
+import operator
+import types
+import weakref
 from decimal import Decimal
 
 import regex
@@ -138,6 +143,18 @@ def RestrictedPrecisionDecimalType(*args, **kwargs):
     """
     precision = kwargs.pop("precision", False)
 
+    cls = _restricted_precision_decimals.get(precision)
+    if cls is None:
+        cls = _restricted_precision_decimals[precision] = build_restricted_precision_decimal(precision)
+    return type(cls(*args, **kwargs))
+
+
+def build_restricted_precision_decimal(precision):
+    """
+    Build the class that is returned by RestrictedPrecisionDecimalType for
+    the specified number of fraction digits.
+    """
+
     class RestrictedPrecisionDecimal(Decimal):
         """
         Class extending decimal.Decimal to restrict the precision that is
@@ -146,6 +163,7 @@ def RestrictedPrecisionDecimalType(*args, **kwargs):
         """
 
         _precision = 10.0 ** (-1.0 * int(precision))
+        _quantum = Decimal(str(_precision))
         _pybind_generated_by = "RestrictedPrecisionDecimal"
 
         def __new__(self, *args, **kwargs):
@@ -155,7 +173,7 @@ def RestrictedPrecisionDecimalType(*args, **kwargs):
             """
             if self._precision is not None:
                 if len(args):
-                    value = Decimal(args[0]).quantize(Decimal(str(self._precision)))
+                    value = Decimal(args[0]).quantize(self._quantum)
                 else:
                     value = Decimal(0)
             elif len(args):
@@ -165,7 +183,346 @@ def RestrictedPrecisionDecimalType(*args, **kwargs):
             obj = Decimal.__new__(self, value, **kwargs)
             return obj
 
-    return type(RestrictedPrecisionDecimal(*args, **kwargs))
+    return RestrictedPrecisionDecimal
+
+
+# There is a single restricted decimal class for each value of
+# fraction-digits, so these are kept for the lifetime of the process.
+_restricted_precision_decimals = {}
+
+# The lexical representation of a decimal64 value (RFC 7950 section 9.3.1),
+# allowing an integer without a fractional part.
+_DECIMAL64_STRING = regex.compile(r"[+-]?[0-9]+(?:\.[0-9]+)?")
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def YANGDecimal64Type(*args, **kwargs):
+    """
+    Function to return a YANGDecimal64 type for the specified number of
+    fraction digits - an alternative to RestrictedPrecisionDecimalType that
+    stores a decimal64 value as a scaled integer.
+    """
+    fraction_digits = int(kwargs.pop("fraction_digits"))
+
+    cls = _decimal64_types.get(fraction_digits)
+    if cls is None:
+        cls = _decimal64_types[fraction_digits] = type(
+            "YANGDecimal64",
+            (YANGDecimal64,),
+            {"__slots__": (), "_fraction_digits": fraction_digits, "_scale": 10**fraction_digits},
+        )
+    return type(cls(*args, **kwargs))
+
+
+class YANGDecimal64(object):
+    """
+    A YANG decimal64 value, stored as the 64-bit integer that it is scaled to
+    by its number of fraction digits (as per RFC 7950) - e.g., 1.5 with two
+    fraction digits is stored as 150. A string is parsed, and the value is
+    formatted, without converting it to another numeric type; values of other
+    types are converted via Decimal and rounded to the fraction digits, as
+    RestrictedPrecisionDecimal does.
+
+    The value compares with, and hashes equally to, the equal int, float and
+    Decimal values. Arithmetic is performed as Decimal, returning a Decimal.
+    """
+
+    __slots__ = ("_scaled", "_text")
+
+    _pybind_generated_by = "YANGDecimal64"
+    _fraction_digits = 0
+    _scale = 1
+
+    def __new__(cls, *args, **kwargs):
+        obj = object.__new__(cls)
+        obj._text = None
+        if not args:
+            obj._scaled = 0
+            return obj
+        value = args[0]
+        if type(value) is str and _DECIMAL64_STRING.fullmatch(value) is not None:
+            # the common case, when decoding data, of a string that has no
+            # more fraction digits than are stored.
+            integer, _, fraction = value.partition(".")
+            if len(fraction) <= cls._fraction_digits:
+                scaled = int(integer + fraction.ljust(cls._fraction_digits, "0"))
+                if _INT64_MIN <= scaled <= _INT64_MAX:
+                    obj._scaled = scaled
+                    return obj
+        obj._scaled = cls._parse(value)
+        return obj
+
+    @classmethod
+    def _parse(cls, value):
+        scaled = None
+        if isinstance(value, str):
+            integer, _, fraction = value.partition(".")
+            if len(fraction) <= cls._fraction_digits and _DECIMAL64_STRING.fullmatch(value) is not None:
+                scaled = int(integer + fraction.ljust(cls._fraction_digits, "0"))
+        elif isinstance(value, int):
+            scaled = value * cls._scale
+        elif isinstance(value, YANGDecimal64) and value._fraction_digits == cls._fraction_digits:
+            return value._scaled
+        if scaled is None:
+            # other values, and those with more fraction digits than are
+            # stored, are rounded as Decimal.quantize() rounds them.
+            if isinstance(value, YANGDecimal64):
+                value = value.to_decimal()
+            try:
+                scaled = int(Decimal(value).scaleb(cls._fraction_digits).to_integral_value())
+            except (ArithmeticError, TypeError, ValueError):
+                raise ValueError("%s is not a valid decimal64 value" % (value,))
+        if not _INT64_MIN <= scaled <= _INT64_MAX:
+            raise ValueError("%s is out of the range of a decimal64 value" % (value,))
+        return scaled
+
+    @classmethod
+    def _unrounded(cls, value):
+        """
+        Return value scaled by the number of fraction digits as a Decimal,
+        where it has more fraction digits than are stored (such that it is
+        rounded when an instance is created from it), or None otherwise. A
+        float is taken to be the shortest decimal string that represents it.
+        """
+        if isinstance(value, float):
+            value = repr(value)
+        elif isinstance(value, YANGDecimal64):
+            value = value.to_decimal()
+        if isinstance(value, str):
+            fraction = value.partition(".")[2]
+            if len(fraction) <= cls._fraction_digits and _DECIMAL64_STRING.fullmatch(value) is not None:
+                return None
+        elif not isinstance(value, Decimal):
+            return None
+        try:
+            scaled = Decimal(value).scaleb(cls._fraction_digits)
+        except (ArithmeticError, TypeError, ValueError):
+            return None
+        if not scaled.is_finite() or scaled == scaled.to_integral_value():
+            return None
+        return scaled
+
+    def __getnewargs__(self):
+        return (str(self),)
+
+    def __reduce_ex__(self, protocol):
+        # the class for each number of fraction digits is created at runtime,
+        # so an instance of it is pickled as the arguments that create it.
+        if type(self) is _decimal64_types.get(self._fraction_digits):
+            return (_decimal64, (self._fraction_digits, str(self)))
+        return super(YANGDecimal64, self).__reduce_ex__(protocol)
+
+    def __str__(self):
+        # the value cannot change, so its text is kept once it is formatted.
+        if self._text is not None:
+            return self._text
+        if not self._fraction_digits:
+            self._text = str(self._scaled)
+        elif self._scaled < 0:
+            integer, fraction = divmod(-self._scaled, self._scale)
+            self._text = "-%d.%0*d" % (integer, self._fraction_digits, fraction)
+        else:
+            integer, fraction = divmod(self._scaled, self._scale)
+            self._text = "%d.%0*d" % (integer, self._fraction_digits, fraction)
+        return self._text
+
+    def __repr__(self):
+        return "YANGDecimal64('%s')" % self
+
+    def __format__(self, spec):
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+    def to_decimal(self):
+        """
+        Return the value as a Decimal.
+        """
+        return Decimal(self._scaled).scaleb(-self._fraction_digits)
+
+    def __float__(self):
+        return self._scaled / self._scale
+
+    def __int__(self):
+        # the fractional part is truncated, as int() truncates a Decimal.
+        integer = abs(self._scaled) // self._scale
+        return integer if self._scaled >= 0 else -integer
+
+    def __bool__(self):
+        return self._scaled != 0
+
+    def __hash__(self):
+        if self._scaled % self._scale == 0:
+            return hash(self._scaled // self._scale)
+        return hash(self.to_decimal())
+
+    def _compare(self, other, op):
+        if isinstance(other, YANGDecimal64):
+            # the values are compared when scaled to the same fraction digits.
+            if other._scale == self._scale:
+                return op(self._scaled, other._scaled)
+            return op(self._scaled * other._scale, other._scaled * self._scale)
+        if isinstance(other, int):
+            return op(self._scaled, other * self._scale)
+        if isinstance(other, (Decimal, float)):
+            return op(self.to_decimal(), other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self._scaled == other._scaled
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other):
+        if type(other) is type(self):
+            return self._scaled != other._scaled
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other):
+        if type(other) is type(self):
+            return self._scaled < other._scaled
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        if type(other) is type(self):
+            return self._scaled <= other._scaled
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        if type(other) is type(self):
+            return self._scaled > other._scaled
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        if type(other) is type(self):
+            return self._scaled >= other._scaled
+        return self._compare(other, operator.ge)
+
+    def __neg__(self):
+        return -self.to_decimal()
+
+    def __pos__(self):
+        return self.to_decimal()
+
+    def __abs__(self):
+        return abs(self.to_decimal())
+
+    def _arithmetic(self, other, op, reflected=False):
+        if isinstance(other, YANGDecimal64):
+            other = other.to_decimal()
+        elif not isinstance(other, (int, Decimal)):
+            return NotImplemented
+        return op(other, self.to_decimal()) if reflected else op(self.to_decimal(), other)
+
+    def __add__(self, other):
+        return self._arithmetic(other, operator.add)
+
+    def __radd__(self, other):
+        return self._arithmetic(other, operator.add, reflected=True)
+
+    def __sub__(self, other):
+        return self._arithmetic(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._arithmetic(other, operator.sub, reflected=True)
+
+    def __mul__(self, other):
+        return self._arithmetic(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._arithmetic(other, operator.mul, reflected=True)
+
+    def __truediv__(self, other):
+        return self._arithmetic(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self._arithmetic(other, operator.truediv, reflected=True)
+
+
+# There is a single decimal64 class for each value of fraction-digits.
+_decimal64_types = {}
+
+
+def _decimal64(fraction_digits, value):
+    return YANGDecimal64Type(fraction_digits=fraction_digits)(value)
+
+
+class YANGEnumeration(dict):
+    """
+    The members of a YANG enumeration, or of the identities that are derived
+    from a base identity, keyed by each name that a member may be referred to
+    by - e.g., an identity with and without the prefix of its module. The
+    value of each member is a dictionary that stores its numeric value (which
+    is assigned where the enumeration does not specify one) along with the
+    module and namespace that define an identity.
+
+    An enumeration is built once, and the restricted classes that are
+    created from it are kept with it - see RestrictedClassType.
+    """
+
+    __slots__ = ("values", "_classes")
+
+    def __init__(self, members):
+        members = copy.deepcopy(members)
+        for k in list(members):
+            if k.startswith("@"):
+                members.pop(k, None)
+        # populate enum values
+        used_values = []
+        for k in members:
+            if "value" in members[k]:
+                used_values.append(int(members[k]["value"]))
+        c = 0
+        for k in members:
+            while c in used_values:
+                c += 1
+            if "value" not in members[k]:
+                members[k]["value"] = c
+            c += 1
+        super(YANGEnumeration, self).__init__(members)
+        self.values = {k: v["value"] for k, v in members.items()}
+        self._classes = {}
+
+    def __deepcopy__(self, memo):
+        # an enumeration is not changed once it is built, so it is shared.
+        return self
+
+    def __copy__(self):
+        return self
+
+
+class YANGEnumerationRegistry(dict):
+    """
+    The enumerations and identities of a set of generated bindings, keyed by
+    the name that the bindings refer to each of them by. The registry is
+    built from:
+
+      * identities - for each identity that others are derived from, a
+        dictionary of the name of each derived identity to its index in
+        modules.
+      * modules - (module, namespace) tuples for the modules that define the
+        identities.
+      * enumerations - for each enumeration, a dictionary of the name of each
+        member to a dictionary that specifies its value where it has one.
+      * aliases - names that refer to the same enumeration as another name.
+    """
+
+    def __init__(self, identities=None, modules=None, enumerations=None, aliases=None):
+        super(YANGEnumerationRegistry, self).__init__()
+        modules = [{"@module": m, "@namespace": ns} for m, ns in modules or []]
+        for name, members in (identities or {}).items():
+            self[name] = YANGEnumeration({k: dict(modules[i]) for k, i in members.items()})
+        for name, members in (enumerations or {}).items():
+            self[name] = YANGEnumeration(members)
+        for alias, name in (aliases or {}).items():
+            self[alias] = self[name]
+
+
+# Restricted classes that have already been built, keyed by their base type
+# and restrictions. The generated bindings call RestrictedClassType each time
+# that a leaf is created or set, so the class (and its compiled restriction
+# tests) is reused rather than rebuilt for each call.
+_restricted_classes = weakref.WeakValueDictionary()
 
 
 def RestrictedClassType(*args, **kwargs):
@@ -181,300 +538,647 @@ def RestrictedClassType(*args, **kwargs):
     restriction_dict = kwargs.pop("restriction_dict", None)
     int_size = kwargs.pop("int_size", None)
 
+    if restriction_dict is None:
+        if restriction_type is not None and restriction_arg is not None:
+            restriction_dict = {restriction_type: restriction_arg}
+        else:
+            raise ValueError("must specify either a restriction dictionary or" + " a type and argument")
+
+    enumeration = restriction_dict.get("dict_key") if len(restriction_dict) == 1 else None
+    if isinstance(enumeration, YANGEnumeration):
+        # the classes of an enumeration are kept with it, rather than being
+        # looked up by the representation of its members.
+        cls = enumeration._classes.get((base_type, int_size))
+        if cls is None:
+            cls = build_restricted_class(base_type, restriction_dict, int_size=int_size)
+            enumeration._classes[(base_type, int_size)] = cls
+        return type(cls(*args, **kwargs))
+
+    cls_key = (base_type, repr(restriction_dict), int_size)
+    cls = _restricted_classes.get(cls_key)
+    if cls is None:
+        cls = build_restricted_class(base_type, restriction_dict, int_size=int_size)
+        _restricted_classes[cls_key] = cls
+    return type(cls(*args, **kwargs))
+
+
+def build_restricted_class(base_type, restriction_dict, int_size=None):
+    """
+    Build the class that is returned by RestrictedClassType. The restriction
+    tests are compiled here, once for the type, such that creating an instance
+    of the class only requires the tests to be run against the value.
+    """
     # this gives deserialisers some hints as to how to encode/decode this value
     # it must be a list since a restricted class can encapsulate a restricted
-    # class
+    # class. The list of the base type is copied rather than extended, such
+    # that creating a new restricted type does not change an existing one.
     current_restricted_class_type = regex.sub("<(type|class) '(?P<class>.*)'>", r"\g<class>", str(base_type))
     if hasattr(base_type, "_restricted_class_base"):
-        restricted_class_hint = getattr(base_type, "_restricted_class_base")
+        restricted_class_hint = list(getattr(base_type, "_restricted_class_base"))
         restricted_class_hint.append(current_restricted_class_type)
     else:
         restricted_class_hint = [current_restricted_class_type]
 
+    range_regex = regex.compile(r"(?P<low>\-?[0-9\.]+|min)([ ]+)?\.\.([ ]+)?" + r"(?P<high>(\-?[0-9\.]+|max))")
+    range_single_value_regex = regex.compile(r"(?P<value>\-?[0-9\.]+)")
+
+    def convert_regexp(pattern):
+        # Some patterns include a $ character in them in some IANA modules, this
+        # is not escaped. Do some logic to escape them, whilst leaving one at the
+        # end of the string if it's there.
+        trimmed = False
+        if pattern[-1] == "$":
+            tmp_pattern = pattern[:-1]
+            trimmed = True
+        else:
+            tmp_pattern = pattern
+        tmp_pattern = tmp_pattern.replace("$", r"\$")
+        pattern = tmp_pattern
+        if trimmed:
+            pattern += "$"
+
+        if not pattern[0] == "^":
+            pattern = "^%s" % pattern
+        if not pattern[len(pattern) - 1] == "$":
+            pattern = "%s$" % pattern
+
+        return pattern
+
+    def build_length_range_tuples(range_spec, length=False, multiplier=1):
+        if range_regex.match(range_spec):
+            low, high = range_regex.sub(r"\g<low>,\g<high>", range_spec).split(",")
+            if not length:
+                high = base_type(high) if not high == "max" else None
+                low = base_type(low) if not low == "min" else None
+            else:
+                high = int(high) * multiplier if not high == "max" else None
+                low = int(low) * multiplier if not low == "min" else None
+            return (low, high)
+        elif range_single_value_regex.match(range_spec):
+            eqval = range_single_value_regex.sub(r"\g<value>", range_spec)
+            if not length:
+                eqval = base_type(eqval) if eqval not in ["max", "min"] else None
+            else:
+                eqval = int(eqval) * multiplier
+            return (eqval,)
+        else:
+            raise ValueError("Invalid range or length argument specified")
+
+    def normalise_intervals(low_high_tuples):
+        # Return the (low, high) intervals that low_high_tuples specify, where
+        # a single value is an interval of its own, sorted and with the
+        # intervals that overlap (or, for integers, that are adjacent) merged.
+        # None is an unbounded low or high value.
+        intervals = []
+        for check_tuple in low_high_tuples:
+            if len(check_tuple) == 2:
+                intervals.append(check_tuple)
+            elif len(check_tuple) == 1:
+                intervals.append((check_tuple[0], check_tuple[0]))
+            else:
+                raise AttributeError("Invalid check tuple length specified")
+        # an interval with an unbounded low value is sorted first.
+        intervals.sort(key=lambda i: (i[0] is not None, i[0] if i[0] is not None else 0))
+        merged = []
+        for low, high in intervals:
+            if merged:
+                last_low, last_high = merged[-1]
+                if (
+                    last_high is None
+                    or low is None
+                    or low <= last_high
+                    or (isinstance(low, int) and isinstance(last_high, int) and low == last_high + 1)
+                ):
+                    if last_high is not None and (high is None or high > last_high):
+                        merged[-1] = (last_low, high)
+                    continue
+            merged.append((low, high))
+        return tuple(merged)
+
+    def intersect_intervals(first, second):
+        # Return the intervals that contain the values that are in both first
+        # and second, which are normalised.
+        intersection = []
+        i = j = 0
+        while i < len(first) and j < len(second):
+            (first_low, first_high), (second_low, second_high) = first[i], second[j]
+            if first_low is None or second_low is None:
+                low = second_low if first_low is None else first_low
+            else:
+                low = max(first_low, second_low)
+            # the interval that ends first cannot intersect any other.
+            if first_high is None:
+                high, i_done, j_done = second_high, False, True
+            elif second_high is None or first_high < second_high:
+                high, i_done, j_done = first_high, True, False
+            else:
+                high, i_done, j_done = second_high, first_high == second_high, True
+            if low is None or high is None or low <= high:
+                intersection.append((low, high))
+            i += i_done
+            j += j_done
+        return tuple(intersection)
+
+    def in_range_check(intervals, length=False):
+        # The intervals are normalised, so the interval that a value can be
+        # in is the last that has a low value that is not greater than it.
+        scaled = any(isinstance(bound, YANGDecimal64) for interval in intervals for bound in interval)
+        if scaled:
+            # fixed-point decimal64 values are compared as their scaled
+            # integers, which are exact.
+            intervals = tuple(tuple(b if b is None else b._scaled for b in interval) for interval in intervals)
+        unbounded = bool(intervals) and intervals[0][0] is None
+        lows = [low for low, _ in intervals[1 if unbounded else 0 :]]
+        highs = [high for _, high in intervals]
+        # a value that is not an integer (e.g., a Decimal created from a
+        # float) also matches a single value that is equal to it as a float.
+        points = frozenset(
+            float(low) for low, high in intervals if low is not None and low == high and not isinstance(low, int)
+        )
+
+        def range_check(value):
+            if length:
+                value = len(value)
+            elif scaled and isinstance(value, YANGDecimal64):
+                value = value._scaled
+            i = bisect.bisect_right(lows, value) - (0 if unbounded else 1)
+            if i >= 0 and (highs[i] is None or value <= highs[i]):
+                return True
+            return bool(points) and float(value) in points
+
+        return range_check
+
+    def match_pattern_check(regexp):
+        compiled = regex.compile(convert_regexp(regexp))
+
+        def mp_check(value):
+            return compiled.match(str(value)) is not None
+
+        return mp_check
+
+    def in_dictionary_check(dictionary):
+        return lambda i: str(i) in dictionary
+
+    # A restricted class that restricts another (e.g., a typedef that is
+    # restricted further where it is used) is validated in one step: the
+    # value is converted by the type that the innermost class restricts, and
+    # checked against the tests of each of the classes - with their ranges
+    # and lengths intersected - rather than each class checking it in turn.
+    if getattr(base_type, "_pybind_generated_by", None) == "RestrictedClassType":
+        root_type = base_type._restricted_root_type
+        other_tests = list(base_type._restriction_other_tests)
+        ranges = base_type._restriction_ranges
+        lengths = base_type._restriction_lengths
+        is_range = base_type._restriction_is_range
+    else:
+        root_type = base_type
+        other_tests = []
+        ranges = lengths = None
+        is_range = "range" in restriction_dict
+
+    enumeration_dict = None
+    for rtype, rarg in restriction_dict.items():
+        if rtype == "pattern":
+            other_tests.append(match_pattern_check(rarg))
+        elif rtype == "range":
+            intervals = normalise_intervals([build_length_range_tuples(range_spec) for range_spec in rarg])
+            ranges = intervals if ranges is None else intersect_intervals(ranges, intervals)
+        elif rtype == "length":
+            multiplier = 1
+            intervals = normalise_intervals(
+                [build_length_range_tuples(range_spec, length=True, multiplier=multiplier) for range_spec in rarg]
+            )
+            lengths = intervals if lengths is None else intersect_intervals(lengths, intervals)
+        elif rtype == "dict_key":
+            enumeration_dict = rarg if isinstance(rarg, YANGEnumeration) else YANGEnumeration(rarg)
+            other_tests.append(in_dictionary_check(enumeration_dict))
+        else:
+            raise TypeError("unsupported restriction type")
+    other_tests = tuple(other_tests)
+    restriction_tests = other_tests
+    if ranges is not None:
+        restriction_tests += (in_range_check(ranges),)
+    if lengths is not None:
+        restriction_tests += (in_range_check(lengths, length=True),)
+    # a fixed-point decimal64 value that has more fraction digits than are
+    # stored is rounded when it is converted, so the value that it is rounded
+    # from is checked against the range too - such that rounding does not
+    # bring a value that is out of range within it.
+    unrounded_range_check = None
+    if ranges is not None and getattr(root_type, "_pybind_generated_by", None) == "YANGDecimal64":
+        unrounded_range_check = in_range_check(ranges)
+    # the instances of an enumeration that are created directly (rather than
+    # as the base of a YANGDynClass) are interned, keyed by the member name.
+    members = {} if enumeration_dict is not None else None
+
     class RestrictedClass(base_type):
         """
-        A class that restricts the base_type class with a new function that the
-        input value is validated against before being applied. The function is
-        a static method which is assigned to _restricted_test.
+        A class that restricts the base_type class with a set of tests that the
+        input value is validated against before being applied. The tests are
+        stored in _restriction_tests, and must all pass for a value to be
+        accepted.
         """
 
         _pybind_generated_by = "RestrictedClassType"
 
         _restricted_class_base = restricted_class_hint
+        _restricted_base_type = base_type
+        _restricted_root_type = root_type
         _restricted_int_size = int_size
+        _restriction_dict = restriction_dict
+        _restriction_tests = restriction_tests
+        _restriction_other_tests = other_tests
+        _restriction_ranges = ranges
+        _restriction_lengths = lengths
+        _restriction_is_range = is_range
+        if enumeration_dict is not None:
+            _enumeration_dict = enumeration_dict
+            _enumeration_values = enumeration_dict.values
 
         def __init__(self, *args, **kwargs):
             """
-            Overloads the base_class __init__ method to check the input argument
-            against the validation function - returns on instance of the base_type
-            class, which can be manipulated as per a usual Python object.
+            Overloads the base_class __init__ method such that arguments that
+            the base_type does not accept are discarded - the value has already
+            been validated when the instance was created by __new__.
             """
-            try:
-                self.__check(args[0])
-            except IndexError:
-                pass
             try:
                 super(RestrictedClass, self).__init__(*args, **kwargs)
             except TypeError:
                 super(RestrictedClass, self).__init__()
 
         def __new__(self, *args, **kwargs):
-            self._restriction_dict = restriction_dict
-            self._restriction_tests = []
-
             """
-        Create a new class instance, and dynamically define the
-        _restriction_test method so that it can be called by other functions.
-      """
-
-            range_regex = regex.compile(r"(?P<low>\-?[0-9\.]+|min)([ ]+)?\.\.([ ]+)?" + r"(?P<high>(\-?[0-9\.]+|max))")
-            range_single_value_regex = regex.compile(r"(?P<value>\-?[0-9\.]+)")
-
-            def convert_regexp(pattern):
-                # Some patterns include a $ character in them in some IANA modules, this
-                # is not escaped. Do some logic to escape them, whilst leaving one at the
-                # end of the string if it's there.
-                trimmed = False
-                if pattern[-1] == "$":
-                    tmp_pattern = pattern[:-1]
-                    trimmed = True
-                else:
-                    tmp_pattern = pattern
-                tmp_pattern = tmp_pattern.replace("$", r"\$")
-                pattern = tmp_pattern
-                if trimmed:
-                    pattern += "$"
-
-                if not pattern[0] == "^":
-                    pattern = "^%s" % pattern
-                if not pattern[len(pattern) - 1] == "$":
-                    pattern = "%s$" % pattern
-
-                return pattern
-
-            def build_length_range_tuples(range, length=False, multiplier=1):
-                if range_regex.match(range_spec):
-                    low, high = range_regex.sub(r"\g<low>,\g<high>", range_spec).split(",")
-                    if not length:
-                        high = base_type(high) if not high == "max" else None
-                        low = base_type(low) if not low == "min" else None
-                    else:
-                        high = int(high) * multiplier if not high == "max" else None
-                        low = int(low) * multiplier if not low == "min" else None
-                    return (low, high)
-                elif range_single_value_regex.match(range_spec):
-                    eqval = range_single_value_regex.sub(r"\g<value>", range_spec)
-                    if not length:
-                        eqval = base_type(eqval) if eqval not in ["max", "min"] else None
-                    else:
-                        eqval = int(eqval) * multiplier
-                    return (eqval,)
-                else:
-                    raise ValueError("Invalid range or length argument specified")
-
-            def in_range_check(low_high_tuples, length=False):
-                def range_check(value):
-                    if length:
-                        value = len(value)
-                    range_results = []
-                    for check_tuple in low_high_tuples:
-                        chk = True
-                        if len(check_tuple) == 2:
-                            if check_tuple[0] is not None and value < check_tuple[0]:
-                                chk = False
-                            if check_tuple[1] is not None and value > check_tuple[1]:
-                                chk = False
-                        elif len(check_tuple) == 1:
-                            if value != float(check_tuple[0]):
-                                chk = False
-                        else:
-                            raise AttributeError("Invalid check tuple length specified")
-                        range_results.append(chk)
-                    return True in range_results
-
-                return range_check
-
-            def match_pattern_check(regexp):
-                def mp_check(value):
-                    if regex.match(convert_regexp(regexp), str(value)):
-                        return True
-                    return False
-
-                return mp_check
-
-            def in_dictionary_check(dictionary):
-                return lambda i: str(i) in dictionary
-
-            val = False
-            try:
-                val = args[0]
-            except IndexError:
-                pass
-            if self._restriction_dict is None:
-                if restriction_type is not None and restriction_arg is not None:
-                    self._restriction_dict = {restriction_type: restriction_arg}
-                else:
-                    raise ValueError("must specify either a restriction dictionary or" + " a type and argument")
-
-            for rtype, rarg in self._restriction_dict.items():
-                if rtype == "pattern":
-                    self._restriction_tests.append(match_pattern_check(rarg))
-                elif rtype == "range":
-                    ranges = []
-                    for range_spec in rarg:
-                        ranges.append(build_length_range_tuples(range_spec))
-                    self._restriction_tests.append(in_range_check(ranges))
-                    if val:
-                        try:
-                            val = base_type(val)
-                        except Exception:
-                            raise TypeError("must specify a numeric type for a range " + "argument")
-                elif rtype == "length":
-                    multiplier = 1
-                    lengths = []
-                    for range_spec in rarg:
-                        lengths.append(build_length_range_tuples(range_spec, length=True, multiplier=multiplier))
-                    self._restriction_tests.append(in_range_check(lengths, length=True))
-                elif rtype == "dict_key":
-                    new_rarg = copy.deepcopy(rarg)
-                    for k in rarg:
-                        if k.startswith("@"):
-                            new_rarg.pop(k, None)
-                    # populate enum values
-                    used_values = []
-                    for k in new_rarg:
-                        if "value" in new_rarg[k]:
-                            used_values.append(int(new_rarg[k]["value"]))
-                    c = 0
-                    for k in new_rarg:
-                        while c in used_values:
-                            c += 1
-                        if "value" not in new_rarg[k]:
-                            new_rarg[k]["value"] = c
-                        c += 1
-                    self._restriction_tests.append(in_dictionary_check(new_rarg))
-                    self._enumeration_dict = new_rarg
-                else:
-                    raise TypeError("unsupported restriction type")
-
-            if val is not False:
-                for test in self._restriction_tests:
-                    passed = False
-                    if test(val) is not False:
-                        passed = True
-                        break
-                if not passed:
-                    raise ValueError("%s does not match a restricted type" % val)
+            Create a new class instance, checking the input value against the
+            restriction tests for this type. A value that is already an instance
+            of this type has been validated, and is not checked again.
+            """
+            interned = members is not None and self is RestrictedClass and len(args) == 1 and not kwargs
+            if interned:
+                try:
+                    return members[args[0]]
+                except (KeyError, TypeError):
+                    pass
 
+            if args and not isinstance(args[0], RestrictedClass):
+                # a failure is raised as a ValueError, since a TypeError from
+                # __new__ results in the base type's empty value being used.
+                try:
+                    val = root_type(args[0])
+                except ValueError:
+                    raise
+                except Exception:
+                    if is_range:
+                        raise ValueError("must specify a numeric type for a range " + "argument")
+                    raise ValueError("%s is not a valid value for %s" % (args[0], root_type))
+                for test in restriction_tests:
+                    if not test(val):
+                        raise ValueError("%s does not match a restricted type" % args[0])
+                if unrounded_range_check is not None:
+                    unrounded = root_type._unrounded(args[0])
+                    if unrounded is not None and not unrounded_range_check(unrounded):
+                        raise ValueError("%s does not match a restricted type" % args[0])
+                args = (val,) + args[1:]
+
+            # the value has been validated against the restrictions of each
+            # restricted class that this class restricts, so it is created by
+            # the type that the innermost of them restricts.
             try:
-                obj = base_type.__new__(self, *args, **kwargs)
+                obj = root_type.__new__(self, *args, **kwargs)
             except TypeError:
-                obj = base_type.__new__(self)
+                obj = root_type.__new__(self)
+            if interned:
+                members[str(obj)] = obj
             return obj
 
-        def __check(self, v):
-            """
-            Run the _restriction_test static method against the argument v,
-            returning an error if the value does not validate.
-            """
-            v = base_type(v)
-            for chkfn in self._restriction_tests:
-                if not chkfn(v):
-                    raise ValueError("did not match restricted type")
-            return True
-
         def getValue(self, *args, **kwargs):
             """
             For types where there is a dict_key restriction (such as YANG
             enumeration), return the value of the dictionary key.
             """
-            if "dict_key" in self._restriction_dict:
+            if hasattr(self, "_enumeration_values"):
                 value = kwargs.pop("mapped", False)
                 if value:
-                    return self._enumeration_dict[self.__str__()]["value"]
+                    return self._enumeration_values[self.__str__()]
             return self
 
-    return type(RestrictedClass(*args, **kwargs))
+    return RestrictedClass
+
+
+# Strings (once surrounding whitespace is removed) that int() and Decimal()
+# may accept - a string that does not match cannot be converted by them.
+_INTEGER_STRING = regex.compile(r"[+-]?[\d_]+")
+_NUMBER_STRING = regex.compile(r"[\w.+-]+")
+
+# Types of value that cannot be converted to a number.
+_NOT_NUMBERS = frozenset([type(None), list, dict, set, frozenset])
+
+
+def _conversion(member_type):
+    # Return "int" or "decimal" where an instance of member_type is created by
+    # converting the value with int() or Decimal(), or None otherwise.
+    if getattr(member_type, "_pybind_generated_by", None) == "RestrictedClassType":
+        member_type = member_type._restricted_root_type
+    if member_type is int:
+        return "int"
+    if getattr(member_type, "_pybind_generated_by", None) in ["RestrictedPrecisionDecimal", "YANGDecimal64"]:
+        return "decimal"
+    if member_type is Decimal:
+        return "decimal"
+    return None
+
+
+def _string_class(value):
+    s = value.strip()
+    if _INTEGER_STRING.fullmatch(s):
+        return "integer"
+    if _NUMBER_STRING.fullmatch(s):
+        return "number"
+    return "text"
+
+
+def _may_convert(conversion, value_type, string_class):
+    # Return False where a value of value_type (and string_class, where it is
+    # a string) cannot be converted by conversion.
+    if conversion is None:
+        return True
+    if string_class is not None:
+        return string_class == "integer" or (conversion == "decimal" and string_class == "number")
+    return value_type not in _NOT_NUMBERS
+
+
+def _restriction_check(member_type, value):
+    # Return whether an instance of the restricted class member_type can be
+    # created from value, without raising an exception where it cannot. This
+    # is the validation that RestrictedClass.__new__ performs.
+    if isinstance(value, member_type):
+        return True
+    try:
+        val = member_type._restricted_root_type(value)
+        for test in member_type._restriction_tests:
+            if not test(val):
+                return False
+    except Exception:
+        return False
+    return True
+
+
+class UnionPlan(object):
+    """
+    The plan for finding the member type of a union (or leaf-list) that a
+    value is accepted by. The member types are tried in order, as they were
+    specified - but the members that cannot accept a value of the type of the
+    value (e.g., a string that is not a number cannot be an integer) are not
+    tried, and the value is checked against the restrictions of a restricted
+    member rather than creating an instance of it, such that a member that
+    does not accept the value does not raise an exception.
+
+    The members that are tried for each type of value are stored as a route,
+    that is built the first time that a value of the type is resolved.
+    """
+
+    __slots__ = (
+        "_conversions",
+        "_restricted",
+        "_references",
+        "_string_classes",
+        "_routes",
+        "_list_routes",
+        "_refs",
+    )
+
+    def __init__(self, member_types):
+        self._conversions = tuple(_conversion(t) for t in member_types)
+        self._restricted = tuple(
+            getattr(t, "_pybind_generated_by", None) == "RestrictedClassType" for t in member_types
+        )
+        self._references = tuple(
+            getattr(t, "_pybind_generated_by", None) == "ReferencePathType" for t in member_types
+        )
+        self._string_classes = any(c is not None for c in self._conversions)
+        self._routes = {}
+        self._list_routes = {}
+        self._refs = ()
+
+    def _key(self, value):
+        value_type = type(value)
+        if self._string_classes and isinstance(value, str):
+            return (value_type, _string_class(value))
+        return (value_type, None)
+
+    def resolve(self, member_types, value):
+        """
+        Return the first of member_types that an instance can be created from
+        value with, or raise a TypeError where there is none.
+        """
+        key = self._key(value)
+        route = self._routes.get(key)
+        if route is None:
+            route = self._routes[key] = tuple(
+                i for i, conversion in enumerate(self._conversions) if _may_convert(conversion, *key)
+            )
+        for i in route:
+            member_type = member_types[i]
+            if self._restricted[i]:
+                if _restriction_check(member_type, value):
+                    return member_type
+                continue
+            try:
+                member_type(value)
+                return member_type
+            except Exception:
+                pass
+        raise TypeError("did not find a valid type using the argument as a hint")
+
+    def convert(self, member_types, value, reference_kwargs=None):
+        """
+        Return value where it is an instance of one of member_types, or an
+        instance of the first of member_types that it can be converted to -
+        checking the members in order, as TypedList does. Raises a
+        ValueError where there is none. Members that are leafrefs are
+        created with reference_kwargs, where it is supplied.
+        """
+        key = self._key(value)
+        route = self._list_routes.get(key)
+        if route is None:
+            route = self._list_routes[key] = self._list_route(member_types, key)
+        for i in route:
+            member_type = member_types[i]
+            if issubclass(key[0], member_type):
+                return value
+            if self._restricted[i] and not _restriction_check(member_type, value):
+                continue
+            try:
+                if reference_kwargs and self._references[i]:
+                    return member_type(value, **reference_kwargs)
+                return member_type(value)
+            except Exception:
+                # we catch all exceptions because we duck-type as
+                # much as possible and some types - e.g., decimal do
+                # not use builtins.
+                pass
+        raise ValueError("Cannot add %s to TypedList (accepts only %s)" % (value, member_types))
+
+    def _list_route(self, member_types, key):
+        route = []
+        for i, member_type in enumerate(member_types):
+            if issubclass(key[0], member_type):
+                # the value is accepted as it is, later members are not
+                # checked.
+                route.append(i)
+                break
+            generated_by = getattr(member_type, "_pybind_generated_by", None)
+            if generated_by is not None:
+                if generated_by not in [
+                    "RestrictedClassType",
+                    "ReferencePathType",
+                    "RestrictedPrecisionDecimal",
+                    "YANGDecimal64",
+                ]:
+                    continue
+            elif member_type is str:
+                continue
+            if _may_convert(self._conversions[i], *key):
+                route.append(i)
+        return tuple(route)
+
+
+# The plan for each union, keyed by the identities of its member types. A plan
+# does not refer to the member types, and is removed when one of them is
+# released - such that a key is never reused for a different union.
+_union_plans = {}
+
+
+def union_plan(member_types):
+    """
+    Return the UnionPlan for the member types of a union, which is built the
+    first time that the union is used.
+    """
+    key = tuple(map(id, member_types))
+    plan = _union_plans.get(key)
+    if plan is None:
+        plan = UnionPlan(member_types)
+
+        def release(ref, key=key):
+            _union_plans.pop(key, None)
+
+        try:
+            plan._refs = tuple(weakref.ref(t, release) for t in member_types)
+        except TypeError:
+            # a member that cannot be referred to weakly may be released
+            # without the plan being removed, so the plan is not kept.
+            return plan
+        _union_plans[key] = plan
+    return plan
+
+
+# The TypedList classes, keyed by the identities of their allowed types. An
+# entry is removed when the class is released.
+_typed_list_types = weakref.WeakValueDictionary()
 
 
 def TypedListType(*args, **kwargs):
     """
     Return a type that consists of a list object where only
     certain types (specified by allowed_type kwarg to the function)
-    can be added to the list.
+    can be added to the list. The type is built once for each set of
+    allowed types.
     """
     allowed_type = kwargs.pop("allowed_type", str)
     if not isinstance(allowed_type, list):
         allowed_type = [allowed_type]
 
+    cls_key = tuple(map(id, allowed_type))
+    cls = _typed_list_types.get(cls_key)
+    if cls is not None and all(a is b for a, b in zip(cls._allowed_types, allowed_type)):
+        return cls
+
     class TypedList(abc.MutableSequence):
         _pybind_generated_by = "TypedListType"
         _list = list()
+        _allowed_types = tuple(allowed_type)
 
         def __init__(self, *args, **kwargs):
             self._unique = kwargs.pop("unique", False)
             self._allowed_type = allowed_type
             self._list = list()
+            # Members of the list are indexed by value (with a count, since
+            # non-unique lists may hold the same value more than once) so
+            # that membership and uniqueness can be tested without scanning
+            # the list. Values that cannot be hashed are counted, and fall
+            # back to a scan of the list.
+            self._index = dict()
+            self._unhashable = 0
             if len(args):
                 if isinstance(args[0], list):
-                    tmp = []
                     for i in args[0]:
-                        if not self._unique or i not in tmp:
-                            tmp.append(self.check(i))
-                    self._list.extend(tmp)
+                        self._add(i)
                 else:
-                    tmp = self.check(args[0])
-                    self._list.append(tmp)
+                    self._add(args[0], strict=True)
+
+        def _index_add(self, v):
+            try:
+                self._index[v] = self._index.get(v, 0) + 1
+            except TypeError:
+                self._unhashable += 1
+
+        def _index_remove(self, v):
+            try:
+                count = self._index[v]
+            except TypeError:
+                self._unhashable -= 1
+                return
+            if count == 1:
+                del self._index[v]
+            else:
+                self._index[v] = count - 1
+
+        def __contains__(self, v):
+            try:
+                if v in self._index:
+                    return True
+            except TypeError:
+                return any(v == i for i in self._list)
+            if self._unhashable:
+                return any(v == i for i in self._list)
+            return False
+
+        def _add(self, v, strict=False):
+            # Values are checked for uniqueness both as supplied and once
+            # cast to an allowed type, such that "1" and 1 are treated as the
+            # same member of an integer leaf-list. Where strict is not set a
+            # duplicate is ignored rather than raising an error.
+            if self._unique and v in self:
+                if strict:
+                    raise ValueError("Values in this list must be unique.")
+                return
+            val = self.check(v)
+            if self._unique and val is not v and val in self:
+                if strict:
+                    raise ValueError("Values in this list must be unique.")
+                return
+            self._list.append(val)
+            self._index_add(val)
 
         def check(self, v):
             # Short circuit uniqueness check
-            if self._unique and v in self._list:
+            if self._unique and v in self:
                 raise ValueError("Values in this list must be unique.")
 
-            passed = False
-            count = 0
-            for i in self._allowed_type:
-                if isinstance(v, i):
-                    tmp = v
-                    passed = True
-                    break
-                try:
-                    if hasattr(i, "_pybind_generated_by"):
-                        attr = getattr(i, "_pybind_generated_by")
-                        if attr == "RestrictedClassType":
-                            tmp = i(v)
-                            passed = True
-                            break
-                        elif attr == "ReferencePathType":
-                            tmp = i(v)
-                            passed = True
-                            break
-                        elif attr == "RestrictedPrecisionDecimal":
-                            tmp = i(v)
-                            passed = True
-                            break
-                    elif i == str and isinstance(v, (str,)):
-                        tmp = str(v)
-                        passed = True
-                        break
-                    elif i not in (str,):
-                        # for anything other than string we try
-                        # and cast. Using things for string or
-                        # unicode gives us strange results because we get
-                        # class name represetnations
-                        tmp = i(v)
-                        passed = True
-                        break
-                except Exception:
-                    # we catch all exceptions because we duck-type as
-                    # much as possible and some types - e.g., decimal do
-                    # not use builtins.
-                    pass
-                count += 1
-            if not passed:
-                raise ValueError("Cannot add %s to TypedList (accepts only %s)" % (v, self._allowed_type))
-            else:
-                return tmp
+            # a value that is an instance of an allowed type is used as it is,
+            # otherwise it is cast to the first allowed type that accepts it.
+            # Strings are not cast to, since this gives us strange results
+            # for values that are not already strings (class name
+            # representations).
+            return union_plan(self._allowed_type).convert(self._allowed_type, v, self._reference_kwargs())
+
+        def _reference_kwargs(self):
+            # the arguments that a leafref member is created with - the path
+            # helper and path of the leaf-list, where it is wrapped by
+            # YANGDynClass.
+            path_helper = getattr(self, "_path_helper", None)
+            if not path_helper or not getattr(self, "_parent", False):
+                return None
+            return {"path_helper": path_helper, "caller": self._path()}
 
         def __len__(self):
             return len(self._list)
@@ -483,19 +1187,58 @@ def TypedListType(*args, **kwargs):
             return self._list[i]
 
         def __delitem__(self, i):
+            if hasattr(self, "_set"):
+                _unshare(self)
+            removed = self._list[i]
             del self._list[i]
+            if isinstance(i, slice):
+                for v in removed:
+                    self._index_remove(v)
+            else:
+                self._index_remove(removed)
 
         def __setitem__(self, i, v):
             self.insert(i, v)
 
         def insert(self, i, v):
             val = self.check(v)
+            if self._unique and val is not v and val in self:
+                raise ValueError("Values in this list must be unique.")
             self._list.insert(i, val)
+            self._index_add(val)
 
         def append(self, v):
-            if not self._unique or v not in self._list:
-                val = self.check(v)
-                self._list.append(val)
+            self._add(v)
+
+        def _reconcile(self, values):
+            """
+            Make the members of the list the values supplied, retaining
+            the position of members that are already in the list, and
+            appending new members in the order they are supplied.
+            """
+            if hasattr(self, "_set"):
+                _unshare(self)
+            wanted = type(self)(list(values))
+            for v in wanted:
+                if v not in self:
+                    self._add(v)
+            retained = [v for v in self._list if v in wanted]
+            if len(retained) != len(self._list):
+                self._list = list()
+                self._index = dict()
+                self._unhashable = 0
+                for v in retained:
+                    self._list.append(v)
+                    self._index_add(v)
+
+        def __copy__(self):
+            # the members are copied, such that the copy can be changed
+            # without changing the original.
+            new = type(self).__new__(type(self))
+            new.__dict__.update(self.__dict__)
+            new._list = list(self._list)
+            new._index = dict(self._index)
+            return new
 
         def __str__(self):
             return str(self._list)
@@ -511,7 +1254,32 @@ def TypedListType(*args, **kwargs):
         def get(self, filter=False):
             return self._list
 
-    return type(TypedList(*args, **kwargs))
+    _typed_list_types[cls_key] = TypedList
+    return TypedList
+
+
+# The keys of the entries of lists that do not have a key. The keys are
+# unique within the process, rather than within a list, such that the entries
+# of a list and of its forks never share a key.
+_keyless_list_keys = itertools.count(1)
+
+
+# The YANG names of the key leaves of list entries, keyed by the class of the
+# entries, for bindings that do not supply them to YANGListType as yang_keys.
+_list_key_names = weakref.WeakKeyDictionary()
+
+
+def _key_yang_names(listclass, keys):
+    names = _list_key_names.get(listclass)
+    if names is None:
+        entry = YANGDynClass(base=listclass, is_container="container", path_helper=False)
+        names = _list_key_names[listclass] = {kn: getattr(entry, kn).yang_name() for kn in keys}
+    return names
+
+
+# The YANGList classes, keyed by their static signature. An entry is removed
+# when the class is released.
+_yang_list_types = weakref.WeakValueDictionary()
 
 
 def YANGListType(*args, **kwargs):
@@ -527,8 +1295,13 @@ def YANGListType(*args, **kwargs):
     .delete(key) - removes it.
 
     Where a list exists that does not have a key - which can be the
-    case for 'config false' lists - a uuid is generated and used
-    as the key for the list.
+    case for 'config false' lists - an integer is generated and used
+    as the key for the list, see _keyless_list_keys.
+
+    The type is built once for each key, contained class and ordering. The
+    parent, name, path helper and extensions of a list are those of the
+    instance, as YANGDynClass creates it - they are not part of the type, and
+    are ignored where they are supplied here.
     """
     try:
         keyname = args[0]
@@ -536,28 +1309,40 @@ def YANGListType(*args, **kwargs):
     except Exception:
         raise TypeError("A YANGList must be specified with a key value and a " + "contained class")
     is_container = kwargs.pop("is_container", False)
-    parent = kwargs.pop("parent", False)
-    yang_name = kwargs.pop("yang_name", False)
     yang_keys = kwargs.pop("yang_keys", False)
-    user_ordered = kwargs.pop("user_ordered", False)
-    path_helper = kwargs.pop("path_helper", None)
-    extensions = kwargs.pop("extensions", None)
+    user_ordered = True if kwargs.pop("user_ordered", False) else False
+
+    cls_key = (keyname, id(listclass), is_container, yang_keys, user_ordered)
+    cls = _yang_list_types.get(cls_key)
+    if cls is not None and cls._listclass is listclass:
+        return cls
+
+    # the names of the key leaves, in the order of the key, and their YANG
+    # names where they are supplied - otherwise see _key_yang_names().
+    keys = keyname.split(" ") if keyname else []
+    key_names = dict(zip(keys, yang_keys.split(" "))) if yang_keys else None
+    key_setters = [(kn, "_set_%s" % safe_name(kn)) for kn in keys]
+    # the slots of an entry, as YANGDynClass would create it - see __check__.
+    entry_slots = None
+    if isinstance(listclass, type):
+        entry_slots = build_yang_base_class(listclass, is_container=is_container).__slots__
 
     class YANGList(object):
         __slots__ = ("_members", "_keyval", "_contained_class", "_path_helper", "_yang_keys", "_ordered")
         _pybind_generated_by = "YANGListType"
+        _listclass = listclass
 
         def __init__(self, *args, **kwargs):
-            self._ordered = True if user_ordered else False
+            self._ordered = user_ordered
             self._members = collections.OrderedDict()
 
-            self._members._user_ordered = True if user_ordered else False
+            self._members._user_ordered = user_ordered
 
             self._keyval = keyname
             if not type(listclass) == type(int):
                 raise ValueError("contained class of a YANGList must be a class")
             self._contained_class = listclass
-            self._path_helper = path_helper
+            self._path_helper = kwargs.get("path_helper", None)
             self._yang_keys = yang_keys
 
         def __str__(self):
@@ -570,24 +1355,19 @@ def YANGListType(*args, **kwargs):
             if self._contained_class is None:
                 return False
             try:
-                tmp = YANGDynClass(
-                    base=self._contained_class,
-                    parent=parent,
-                    yang_name=yang_name,
-                    is_container=is_container,
-                    path_helper=False,
-                )
-                valid = False
-                if not tmp.__slots__ == v.__slots__:
-                    valid = True
-                elif self._contained_class.__slots__ == v.__slots__:
-                    valid = True
-                if valid is False:
-                    return valid
+                slots = v.__slots__
+                if entry_slots == slots and not self._contained_class.__slots__ == slots:
+                    return False
             except Exception:
                 return False
             return True
 
+        def _key_names(self):
+            # Return the YANG name of each key leaf, keyed by its name.
+            if key_names is not None:
+                return key_names
+            return _key_yang_names(self._contained_class, keys)
+
         def iteritems(self):
             return self._members.items()
 
@@ -619,6 +1399,19 @@ def YANGListType(*args, **kwargs):
             self.__set(_k=k, _v=v)
 
         def __set(self, *args, **kwargs):
+            _unshare(self)
+            journal = self._change_tracker.journal
+            if journal is None:
+                return self.__set_entry(*args, **kwargs)
+            count = len(self._members)
+            absent = journal.absent_ancestor(self)
+            with journal.paused():
+                k = self.__set_entry(*args, **kwargs)
+            # an existing entry that is replaced is recorded as it being set.
+            journal.record("add" if len(self._members) > count else "set", self._members[k], absent=absent)
+            return k
+
+        def __set_entry(self, *args, **kwargs):
             k = kwargs.pop("_k", None)
             v = kwargs.pop("_v", None)
             named_set = kwargs.pop("_named_set", False)
@@ -627,9 +1420,9 @@ def YANGListType(*args, **kwargs):
                 k = args[0]
             elif k is None:
                 # this is a list that does not have a key specified, and hence
-                # we generate a uuid that is used as the key, the method then
-                # returns the uuid for the upstream process to use
-                k = str(uuid.uuid1())
+                # we generate an integer that is used as the key, the method
+                # then returns the key for the upstream process to use
+                k = next(_keyless_list_keys)
 
             update = False
             if v is not None:
@@ -643,17 +1436,7 @@ def YANGListType(*args, **kwargs):
 
             if self._keyval:
                 try:
-                    tmp = YANGDynClass(
-                        base=self._contained_class,
-                        parent=parent,
-                        yang_name=yang_name,
-                        is_container="container",
-                        path_helper=False,
-                    )
-                    keydict = None
-
                     if " " in self._keyval and not named_set:
-                        keys = self._keyval.split(" ")
                         keyparts = k.split(" ")
                         keydict = {}
                         for kp, kv in zip(keys, keyparts):
@@ -670,28 +1453,22 @@ def YANGListType(*args, **kwargs):
                         if k == "":
                             raise KeyError("Cannot set a null key for a list entry!")
                         keydict = {self._keyval: k}
-                        kv_obj = getattr(tmp, self._keyval)
-                        path_keystring = "[%s='%s']" % (kv_obj.yang_name(), k)
-
-                    if keydict is not None:
-                        keys = self._keyval.split(" ")
-                        path_keystring = "["
-                        for kv in keys:
-                            kv_obj = getattr(tmp, kv)
-                            path_keystring += "%s='%s' " % (kv_obj.yang_name(), keydict[kv])
-                        path_keystring = path_keystring[:-1]
-                        path_keystring += "]"
+
+                    names = self._key_names()
+                    path_keystring = "[%s]" % " ".join("%s='%s'" % (names[kv], keydict[kv]) for kv in keys)
 
                     if not update:
                         tmp = YANGDynClass(
                             base=self._contained_class,
-                            parent=parent,
-                            yang_name=yang_name,
+                            parent=self._parent,
+                            yang_name=self._yang_name,
                             is_container="container",
-                            path_helper=path_helper,
+                            path_helper=self._path_helper,
                             register_path=(self._parent._path() + [self._yang_name + path_keystring]),
                             extmethods=self._parent._extmethods,
-                            extensions=extensions,
+                            extensions=self._extensionsd,
+                            namespace=self._namespace,
+                            defining_module=self._defining_module,
                         )
                     else:
                         # hand the value to the init, rather than simply creating an empty
@@ -699,20 +1476,20 @@ def YANGListType(*args, **kwargs):
                         tmp = YANGDynClass(
                             v,
                             base=self._contained_class,
-                            parent=parent,
-                            yang_name=yang_name,
+                            parent=self._parent,
+                            yang_name=self._yang_name,
                             is_container="container",
-                            path_helper=path_helper,
+                            path_helper=self._path_helper,
                             register_path=(self._parent._path() + [self._yang_name + path_keystring]),
                             extmethods=self._parent._extmethods,
                             load=True,
-                            extensions=extensions,
+                            extensions=self._extensionsd,
+                            namespace=self._namespace,
+                            defining_module=self._defining_module,
                         )
 
-                    if keydict is not None:
-                        for kn in keydict:
-                            key = getattr(tmp, "_set_%s" % safe_name(kn))
-                            key(keydict[kn], load=True)
+                    for kn, setter in key_setters:
+                        getattr(tmp, setter)(keydict[kn], load=True)
 
                     if hasattr(k, "_referenced_object") and k._referenced_object is not None:
                         k = k._referenced_object
@@ -721,20 +1498,35 @@ def YANGListType(*args, **kwargs):
 
                 except ValueError as m:
                     raise KeyError("key value %s must be valid, %s" % (self._keyval, m))
+                return k
             else:
                 self._members[k] = YANGDynClass(
                     base=self._contained_class,
-                    parent=parent,
-                    yang_name=yang_name,
+                    parent=self._parent,
+                    yang_name=self._yang_name,
                     is_container=is_container,
-                    path_helper=path_helper,
+                    path_helper=self._path_helper,
                     extmethods=self._parent._extmethods,
-                    extensions=extensions,
+                    extensions=self._extensionsd,
+                    namespace=self._namespace,
+                    defining_module=self._defining_module,
                 )
                 return k
 
         def __delitem__(self, k):
-            del self._members[k]
+            self.__remove(k)
+
+        def __remove(self, k):
+            # remove the entry with key k, recording it where there is a
+            # journal.
+            _unshare(self)
+            journal = self._change_tracker.journal
+            if journal is None:
+                del self._members[k]
+                return
+            position = list(self._members).index(k) if k in self._members else None
+            entry = self._members.pop(k)
+            journal.record("delete", entry, position=position, absent=journal.absent_ancestor(self))
 
         def __len__(self):
             return len(self._members)
@@ -816,6 +1608,147 @@ def YANGListType(*args, **kwargs):
                 k = self.__set()
                 return k
 
+        def add_many(self, keys):
+            """
+            Add an entry to the list for each of keys, returning the new
+            entries in order. Each key is specified as it would be to add() -
+            either as the key value (or a string of the values of each key
+            leaf, separated by spaces), or as a dict keyed by the names of the
+            key leaves. A tuple of the values of the key leaves, in the order
+            that they are specified in the key, may also be used.
+
+            The resulting list is the same as if add() was called for each
+            key, but each entry is validated before any is added to the list -
+            such that the list is unchanged if a key is invalid - and the
+            entries are registered with the path helper in a single pass.
+            """
+            if not self._keyval:
+                raise AttributeError("add_many() requires a list with a key, use extend_from()")
+            return self.__add_entries(self.__entry_key(key) + ({},) for key in keys)
+
+        def extend_from(self, rows):
+            """
+            Add an entry to the list for each of rows, returning the new
+            entries in order. Each row is a dict keyed by the names of the
+            elements of an entry, which must include each key leaf of the list.
+            The key leaves are used as per add_many(), and the remaining
+            elements are set on the new entry.
+            """
+
+            def entries():
+                for row in rows:
+                    row = {safe_name(n): v for n, v in row.items()}
+                    if keys:
+                        (k, keydict) = self.__entry_key({kn: row.pop(kn, None) for kn in keys if kn in row})
+                    else:
+                        (k, keydict) = (next(_keyless_list_keys), None)
+                    yield (k, keydict, row)
+
+            return self.__add_entries(entries())
+
+        def __entry_key(self, key):
+            # Return the key of the entry in _members, and a dict of the value
+            # of each key leaf, for a key supplied to add_many().
+            if isinstance(key, tuple):
+                if not len(key) == len(keys):
+                    raise KeyError("YANGList key must contain all key elements (%s)" % keys)
+                key = dict(zip(keys, key))
+
+            if isinstance(key, dict):
+                if not all(kn in key for kn in keys):
+                    raise KeyError("YANGList key must contain all key elements (%s)" % keys)
+                (k, keydict) = self._generate_key(**key)
+            elif key is None:
+                raise KeyError("a list with a key value must have a key specified")
+            elif len(keys) > 1:
+                keyparts = key.split(" ")
+                if not len(keyparts) == len(keys):
+                    raise KeyError("YANGList key must contain all key elements (%s)" % keys)
+                (k, keydict) = (key, dict(zip(keys, keyparts)))
+            else:
+                if key == "":
+                    raise KeyError("Cannot set a null key for a list entry!")
+                (k, keydict) = (key, {self._keyval: key})
+            return (k, keydict)
+
+        def __add_entries(self, entries):
+            # Create an entry for each (key, key leaf values, other values) in
+            # entries, adding them to the list once all have been created.
+            names = self._key_names() if keys else {}
+            list_path = self._parent._path()
+            extmethods = self._parent._extmethods
+            deferred = getattr(self._path_helper, "deferred_registration", None)
+
+            _unshare(self)
+            journal = self._change_tracker.journal
+            # the list, or its parents, may be absent before the first entry
+            # is added.
+            absent = journal.absent_ancestor(self) if journal is not None else None
+            added = collections.OrderedDict()
+            try:
+                with deferred() if deferred is not None else contextlib.nullcontext(), (
+                    journal.paused() if journal is not None else contextlib.nullcontext()
+                ):
+                    for k, keydict, values in entries:
+                        if k in self._members or k in added:
+                            raise KeyError("%s is already defined as a list entry" % k)
+
+                        if keydict is None:
+                            entry = YANGDynClass(
+                                base=self._contained_class,
+                                parent=self._parent,
+                                yang_name=self._yang_name,
+                                is_container=is_container,
+                                path_helper=self._path_helper,
+                                extmethods=extmethods,
+                                extensions=self._extensionsd,
+                                namespace=self._namespace,
+                                defining_module=self._defining_module,
+                            )
+                        else:
+                            path_keystring = " ".join("%s='%s'" % (names[kn], keydict[kn]) for kn in keys)
+                            entry = YANGDynClass(
+                                base=self._contained_class,
+                                parent=self._parent,
+                                yang_name=self._yang_name,
+                                is_container="container",
+                                path_helper=self._path_helper,
+                                register_path=(list_path + [self._yang_name + "[%s]" % path_keystring]),
+                                extmethods=extmethods,
+                                extensions=self._extensionsd,
+                                namespace=self._namespace,
+                                defining_module=self._defining_module,
+                            )
+                            try:
+                                for kn, setter in key_setters:
+                                    getattr(entry, setter)(keydict[kn], load=True)
+                            except ValueError as m:
+                                raise KeyError("key value %s must be valid, %s" % (self._keyval, m))
+
+                            if hasattr(k, "_referenced_object") and k._referenced_object is not None:
+                                k = k._referenced_object
+
+                        for name, value in values.items():
+                            getattr(entry, "_set_%s" % name)(value)
+                        added[k] = entry
+            except Exception:
+                # entries that were registered before the failure, as a result
+                # of a lookup being made, are removed from the path helper.
+                if self._path_helper:
+                    for entry in added.values():
+                        try:
+                            self._path_helper.unregister(entry._path())
+                        except Exception:
+                            pass
+                raise
+
+            self._members.update(added)
+            if journal is not None:
+                for entry in added.values():
+                    journal.record("add", entry, absent=absent)
+                    absent = None
+            return list(added.values())
+
         def delete(self, *args, **kwargs):
             (k, _) = self._generate_key(*args, **kwargs)
 
@@ -837,7 +1770,7 @@ def YANGListType(*args, **kwargs):
                 obj_path = self._parent._path() + [self._yang_name + key_string]
 
             try:
-                del self._members[k]
+                self.__remove(k)
                 if self._path_helper:
                     self._path_helper.unregister(obj_path)
             except KeyError as m:
@@ -868,7 +1801,10 @@ def YANGListType(*args, **kwargs):
                     d[i] = self._members[i]
             return d
 
-    return type(YANGList(*args, **kwargs))
+    if not type(listclass) == type(int):
+        raise ValueError("contained class of a YANGList must be a class")
+    _yang_list_types[cls_key] = YANGList
+    return YANGList
 
 
 class YANGBool(int):
@@ -899,115 +1835,536 @@ class YANGBool(int):
         return str(self.__repr__())
 
 
-def YANGDynClass(*args, **kwargs):
+# The arguments to YANGDynClass that describe the YANG node that an instance
+# represents, rather than the value of the wrapped base type. These are
+# consumed by YANGBaseClass and never handed to the base type.
+YANG_DYN_CLASS_KWARGS = frozenset(
+    [
+        "default",
+        "yang_name",
+        "parent",
+        "choice",
+        "is_container",
+        "is_leaf",
+        "path_helper",
+        "register_path",
+        "extensions",
+        "extmethods",
+        "is_keyval",
+        "register_paths",
+        "yang_type",
+        "namespace",
+        "defining_module",
+        "load",
+        "is_config",
+        "presence",
+        "schema",
+    ]
+)
+
+
+class YANGSchemaNode(object):
+    """
+    The facts about a YANG schema node that are the same for each instance of
+    the node - its name, type, namespace etc. A single YANGSchemaNode is shared
+    by each instance of a node that is created by YANGDynClass (see
+    yang_schema_node), and should not be modified.
     """
-    Wrap an type - specified in the base_type arugment - with
-    a set of custom attributes that YANG specifies (or are required
-    for serialisation of that object). Particularly:
 
-      - base_type:  the original type - for example, string, int.
-      - default:    the YANG specified default value of the type.
-      - yang_name:  the YANG name of the type (as opposed to a 'safe'
-                    Python version).
-      - parent:     the class which this type is a member of in the
-                    YANG-specified tree.
-      - choice:     The choice branch that this type is a member of.
-      - is_{container,leaf}: whether this element is a container or
-                             a leaf.
-      - path_helper: pyangbind helper class to allow XPATH lookups.
-      - supplied_register_path: an override for the path that this
-                                object should register to. This is
-                                used when an element is a member of
-                                a list to add the key attributes to
-                                the path.
-      - extensions:  The list of extensions that should be stored
-                     with the type.
-      - is_config:   Whether this is a configuration (editable)
-                     node.
-      - presence:    Whether the YANG container that is being
-                     represented has the presence keyword
+    _fields = (
+        "yang_name",
+        "yang_type",
+        "namespace",
+        "defining_module",
+        "is_leaf",
+        "is_container",
+        "is_config",
+        "is_keyval",
+        "register_paths",
+        "choice",
+        "extensions",
+        "presence",
+        "default",
+    )
+    __slots__ = _fields + ("__weakref__",)
+
+    def __init__(self, *args):
+        for field, value in zip(self._fields, args):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("YANGSchemaNode is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return "YANGSchemaNode(%s)" % ", ".join("%s=%r" % (f, getattr(self, f)) for f in self._fields)
+
+
+# Interned schema nodes, keyed on the (hashable) arguments that they were
+# created with. An entry is removed when the last instance that refers to the
+# node is released.
+_yang_schema_nodes = weakref.WeakValueDictionary()
+
+
+def _freeze(value):
+    # Return a hashable representation of value, which may contain dicts or
+    # lists, for use as part of a key.
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def yang_schema_node(
+    yang_name=False,
+    yang_type=None,
+    namespace=None,
+    defining_module=None,
+    is_leaf=False,
+    is_container=False,
+    is_config=True,
+    is_keyval=False,
+    register_paths=True,
+    choice=False,
+    extensions=None,
+    presence=None,
+    default=False,
+):
     """
-    base_type = kwargs.pop("base", False)
-    default = kwargs.pop("default", False)
-    yang_name = kwargs.pop("yang_name", False)
-    parent_instance = kwargs.pop("parent", False)
-    choice_member = kwargs.pop("choice", False)
-    is_container = kwargs.pop("is_container", False)
-    is_leaf = kwargs.pop("is_leaf", False)
-    path_helper = kwargs.pop("path_helper", None)
-    supplied_register_path = kwargs.pop("register_path", None)
-    extensions = kwargs.pop("extensions", None)
-    extmethods = kwargs.pop("extmethods", None)
-    is_keyval = kwargs.pop("is_keyval", False)
-    register_paths = kwargs.pop("register_paths", True)
-    yang_type = kwargs.pop("yang_type", None)
-    namespace = kwargs.pop("namespace", None)
-    defining_module = kwargs.pop("defining_module", None)
-    load = kwargs.pop("load", None)
-    is_config = kwargs.pop("is_config", True)
-    has_presence = kwargs.pop("presence", None)
+    Return the YANGSchemaNode with the specified fields, such that all
+    instances that are created with the same arguments share one node.
+    A node whose default value cannot be hashed is not shared.
+    """
+    key = (
+        yang_name,
+        yang_type,
+        namespace,
+        defining_module,
+        is_leaf,
+        is_container,
+        is_config,
+        is_keyval,
+        register_paths,
+        choice,
+        _freeze(extensions) if extensions else extensions,
+        presence,
+        type(default),
+        default,
+    )
+    try:
+        node = _yang_schema_nodes.get(key)
+    except TypeError:
+        key = None
+        node = None
+    if node is None:
+        node = YANGSchemaNode(
+            yang_name,
+            yang_type,
+            namespace,
+            defining_module,
+            is_leaf,
+            is_container,
+            is_config,
+            is_keyval,
+            register_paths,
+            choice,
+            extensions,
+            presence,
+            default,
+        )
+        if key is not None:
+            _yang_schema_nodes[key] = node
+    return node
 
-    if not base_type:
-        raise TypeError("must have a base type")
 
-    if isinstance(base_type, list):
-        # this is a union, we must infer type
-        if not len(args):
-            # there is no argument to infer the type from
-            # so use the first type (default)
-            base_type = base_type[0]
+class YANGSchemaAttributes(object):
+    """
+    Read-only accessors for the facts about a schema node, which are stored
+    in the YANGSchemaNode that an instance refers to as _schema. This is the
+    first base of each YANGBaseClass, such that the accessors take precedence
+    over the class attributes of a generated container.
+    """
+
+    __slots__ = ()
+
+    _yang_name = property(operator.attrgetter("_schema.yang_name"))
+    _yang_type = property(operator.attrgetter("_schema.yang_type"))
+    _namespace = property(operator.attrgetter("_schema.namespace"))
+    _defining_module = property(operator.attrgetter("_schema.defining_module"))
+    _is_leaf = property(operator.attrgetter("_schema.is_leaf"))
+    _is_container = property(operator.attrgetter("_schema.is_container"))
+    _is_config = property(operator.attrgetter("_schema.is_config"))
+    _is_keyval = property(operator.attrgetter("_schema.is_keyval"))
+    _register_paths = property(operator.attrgetter("_schema.register_paths"))
+    _choice = property(operator.attrgetter("_schema.choice"))
+    _extensionsd = property(operator.attrgetter("_schema.extensions"))
+    _presence = property(operator.attrgetter("_schema.presence"))
+    _default = property(operator.attrgetter("_schema.default"))
+
+    @property
+    def _metadata(self):
+        # the metadata dictionary is only created when it is first used.
+        try:
+            return self._metadatad
+        except AttributeError:
+            self._metadatad = {}
+            return self._metadatad
+
+
+class YANGChangeTracker(object):
+    """
+    The state of the changes made to a tree of YANG objects, which each
+    object in the tree refers to.
+
+    An object that is changed records the epoch in which it was changed, and
+    is only considered to be changed during that epoch - such that starting a
+    new epoch marks every object in the tree as unchanged without visiting
+    them.
+
+    Where a YANGChangeJournal is enabled for the tree, it is stored as the
+    journal of the tracker, such that each object can record its changes.
+
+    Where the tree has been forked, forked is set, such that an object that
+    is changed first copies its current state to the forks that still share
+    it.
+    """
+
+    __slots__ = ("epoch", "journal", "forked")
+
+    def __init__(self, epoch=1):
+        self.epoch = epoch
+        self.journal = None
+        self.forked = False
+
+
+def change_tracker(parent):
+    """
+    Return the YANGChangeTracker of parent, or a new tracker where parent is
+    not part of a tree that has one (e.g., it is a top-level container).
+    """
+    tracker = getattr(parent, "_change_tracker", None)
+    if tracker is None:
+        return YANGChangeTracker()
+    return tracker
+
+
+def _unshare(obj):
+    # Called before obj is changed in place, such that forks of the tree that
+    # still share the container that obj belongs to are given a copy of it.
+    if obj._change_tracker.forked:
+        parent = obj._parent
+        if parent and hasattr(parent, "_pyangbind_unshare"):
+            parent._pyangbind_unshare()
+
+
+def _defer_changes_within(obj, epoch):
+    # Mark the objects within obj that were changed in the current epoch such
+    # that they are still changed, but propagate their next change to their
+    # parent rather than assuming that it is already marked as changed.
+    for element_name in obj._pyangbind_elements:
+        if not obj._pyangbind_materialised(element_name):
+            continue
+        element = getattr(obj, element_name)
+        generated_by = getattr(element, "_pybind_generated_by", None)
+        if generated_by == "YANGListType":
+            for entry in element.itervalues():
+                if entry._mchanged == epoch:
+                    entry._mchanged = -epoch
+                    _defer_changes_within(entry, epoch)
+        elif getattr(element, "_mchanged", False) == epoch:
+            element._mchanged = -epoch
+            if generated_by == "container":
+                _defer_changes_within(element, epoch)
+
+
+def _wire_value(value):
+    # Return the value of a leaf (or leaf-list) as a plain Python value, that
+    # its setter accepts and that can be pickled without its generated class.
+    generated_by = getattr(value, "_pybind_generated_by", None)
+    if generated_by == "ReferencePathType":
+        return _wire_value(value._get())
+    if generated_by == "TypedListType":
+        return [_wire_value(v) for v in value]
+    if isinstance(value, (YANGBits, Decimal, YANGDecimal64)):
+        # bits, and decimal64 values, are parsed exactly from their string.
+        return str(value)
+    if isinstance(value, YANGBool):
+        return bool(value)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, bytes):
+        return bytes(value)
+    return value
+
+
+def _wire_payload(obj, exclude=()):
+    # Return the compact representation of the values within obj that is
+    # pickled - None where obj has no value. A container is represented as
+    # (present, ((element name, payload), ...)) listing the elements that have
+    # a value, a list as ((key, entry payload), ...) and a leaf as its value.
+    generated_by = getattr(obj, "_pybind_generated_by", None)
+    if generated_by == "container":
+        elements = []
+        for element_name in obj._pyangbind_elements:
+            if element_name in exclude or not obj._pyangbind_materialised(element_name):
+                continue
+            payload = _wire_payload(getattr(obj, element_name))
+            if payload is not None:
+                elements.append((element_name, payload))
+        present = getattr(obj, "_cpresent", False) is True
+        if not elements and not present:
+            return None
+        return (present, tuple(elements))
+    if generated_by == "YANGListType":
+        if not len(obj):
+            return None
+        if not obj._keyval:
+            return tuple((None, _wire_payload(entry)) for entry in obj.itervalues())
+        # the key leaves of an entry are set when it is added.
+        keys = tuple(safe_name(k) for k in obj._keyval.split(" "))
+        return tuple((_wire_value(k), _wire_payload(entry, keys)) for k, entry in obj.iteritems())
+    if getattr(obj, "_mchanged", False) is False:
+        return None
+    return _wire_value(obj)
+
+
+def _load_wire_payload(obj, payload):
+    # Set the values within obj from payload, as returned by _wire_payload().
+    generated_by = getattr(obj, "_pybind_generated_by", None)
+    if generated_by == "YANGListType":
+        if obj._keyval:
+            entries = obj.add_many([k for k, _ in payload])
         else:
-            type_test = False
-            for candidate_type in base_type:
-                try:
-                    type_test = candidate_type(args[0])  # does the slipper fit?
-                    break
-                except Exception:
-                    pass  # don't worry, move on, plenty more fish (types) in the sea...
-            if type_test is False:
-                # we're left alone at midnight -- no types fit the arguments
-                raise TypeError("did not find a valid type using the argument as a" + " hint")
-            # otherwise, hop, skip and jump with the last candidate
-            base_type = candidate_type
+            entries = obj.extend_from({} for _ in payload)
+        for entry, (_, entry_payload) in zip(entries, payload):
+            if entry_payload is not None:
+                _load_wire_payload(entry, entry_payload)
+        return
+
+    present, elements = payload
+    if present:
+        obj._set_present()
+    for element_name, element_payload in elements:
+        element = getattr(obj, element_name)
+        if getattr(element, "_pybind_generated_by", None) in ["container", "YANGListType"]:
+            _load_wire_payload(element, element_payload)
+        else:
+            getattr(obj, "_set_%s" % element_name)(element_payload)
+
+
+def _schema_step(parent, child):
+    # Return the step from the container parent to child, one of its
+    # elements (its name) or an entry of one of its lists (its name and key).
+    for element_name in parent._pyangbind_elements:
+        if not parent._pyangbind_materialised(element_name):
+            continue
+        element = getattr(parent, element_name)
+        if element is child:
+            return element_name
+        if getattr(element, "_pybind_generated_by", None) == "YANGListType":
+            for k, entry in element.iteritems():
+                if entry is child:
+                    return (element_name, _wire_value(k) if element._keyval else None)
+    raise ValueError("%s is not an element of %s" % (child, parent))
+
+
+def reduce_node(obj):
+    """
+    Return the value that pickles obj, an object within a tree of generated
+    classes: the generated class of the root of the tree, the path from the
+    root to obj, and the values within obj (see rebuild_node). Neither the
+    classes that are built at runtime, nor the parent, path helper or
+    extension methods of the objects, are pickled.
+    """
+    path = []
+    node = obj
+    while getattr(node, "_parent", None):
+        path.append(_schema_step(node._parent, node))
+        node = node._parent
+
+    if getattr(node, "_pybind_generated_by", None) != "container":
+        raise TypeError("cannot pickle %s, it is not within a generated container" % type(obj).__name__)
+    exclude = ()
+    if path and isinstance(path[0], tuple) and path[0][1] is not None:
+        # the key leaves of a list entry are set when it is added.
+        keyval = getattr(obj._parent, path[0][0])._keyval
+        exclude = tuple(safe_name(k) for k in keyval.split(" "))
+    cls = getattr(type(node), "_base_type", type(node))
+    return (rebuild_node, (cls, tuple(reversed(path)), _wire_payload(obj, exclude)))
+
+
+def rebuild_node(cls, path, payload, **kwargs):
+    """
+    Rebuild an object that was pickled by reduce_node - creating an instance
+    of cls, the object at path within it, and setting the values in payload.
+    The values are set as they would be when loaded, such that they are
+    marked as changed. kwargs are the arguments that cls is created with.
+    """
+    obj = cls(**kwargs)
+    for i, step in enumerate(path):
+        if isinstance(step, tuple):
+            element_name, k = step
+            element = getattr(obj, element_name)
+            obj = element.add(k) if k is not None else element[element.add()]
+            continue
+        element = getattr(obj, step)
+        if i == len(path) - 1 and getattr(element, "_pybind_generated_by", None) not in ["container", "YANGListType"]:
+            # obj is the parent of a leaf, which is set by its setter.
+            if payload is not None:
+                getattr(obj, "_set_%s" % step)(payload)
+            return getattr(obj, step)
+        obj = element
+
+    if payload is not None:
+        _load_wire_payload(obj, payload)
+    return obj
+
+
+def deepcopy_node(obj):
+    """
+    Return a deep copy of obj, an object within a tree of generated classes.
+    The whole tree is copied, as it is when its root is unpickled (see
+    reduce_node), and the object at the same position within the copy is
+    returned. Where the tree has a path helper, the copy is given a new
+    helper of the same type; the extension methods of the tree are shared
+    with the copy. An object that does not belong to a container is copied
+    as copy.copy() copies it.
+    """
+    nodes = []
+    root = obj
+    while getattr(root, "_parent", None):
+        nodes.append(root)
+        root = root._parent
+    if getattr(root, "_pybind_generated_by", None) != "container":
+        return copy.copy(obj)
+    kwargs = {}
+    if getattr(root, "_path_helper", False):
+        kwargs["path_helper"] = type(root._path_helper)()
+    if getattr(root, "_extmethods", False):
+        kwargs["extmethods"] = root._extmethods
+    _, args = reduce_node(root)
+    new = rebuild_node(*args, **kwargs)
+    for node in reversed(nodes):
+        step = _schema_step(node._parent, node)
+        if isinstance(step, tuple):
+            # the entries of the copy of a list are in the same order.
+            entries = getattr(node._parent, step[0]).itervalues()
+            position = next(i for i, entry in enumerate(entries) if entry is node)
+            new = next(itertools.islice(getattr(new, step[0]).itervalues(), position, None))
+        else:
+            new = getattr(new, step)
+    return new
+
+
+class YANGExtMethod(object):
+    """
+    A descriptor that binds an extension method (see --use-extmethods) to
+    the instances of a YANGBaseClass. The method is called with the path of
+    the instance that it is retrieved from (as caller) and its path helper.
+    """
+
+    __slots__ = ("method",)
+
+    def __init__(self, method):
+        self.method = method
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        method = self.method
+
+        def extmethodfn(*args, **kwargs):
+            kwargs["caller"] = obj._register_path()
+            kwargs["path_helper"] = obj._path_helper
+            return method(*args, **kwargs)
+
+        return extmethodfn
+
+
+# The extension methods for each schema path, keyed by the id of the
+# extmethods dict that they were resolved from - which is held with them, such
+# that the id is not reused. Only the most recently used dicts are kept.
+_extmethod_tables = collections.OrderedDict()
+
+
+def extmethod_table(extmethods, parent, yang_name):
+    """
+    Return the extension methods in extmethods for the element yang_name of
+    parent, as a tuple of (attribute name, method) pairs. These are resolved
+    once for each schema path - which is identified by the class of parent and
+    yang_name, such that the path of parent is only built the first time.
+    """
+    entry = _extmethod_tables.get(id(extmethods))
+    if entry is None or entry[0] is not extmethods:
+        entry = _extmethod_tables[id(extmethods)] = (extmethods, {})
+        if len(_extmethod_tables) > 16:
+            _extmethod_tables.popitem(last=False)
+    else:
+        _extmethod_tables.move_to_end(id(extmethods))
+
+    key = (getattr(type(parent), "_base_type", type(parent)), yang_name)
+    table = entry[1].get(key)
+    if table is None:
+        rpath = parent._path() + [yang_name] if parent is not None else []
+        chk_path = "/" + "/".join(remove_path_attributes(rpath))
+        table = ()
+        if chk_path in extmethods:
+            methods = extmethods[chk_path]
+            members = [(name, getattr(methods, name)) for name in dir(methods) if not name.startswith("_")]
+            table = tuple(("_" + name, member) for name, member in members if callable(member))
+        entry[1][key] = table
+    return table
+
+
+# Classes built by build_yang_base_class, keyed on the static part of the
+# signature of YANGDynClass. Neither the key nor the value holds a reference to
+# the base type, such that a base type (and the classes of the bindings that
+# it refers to) is released once nothing else uses it. An entry is removed
+# when the class it refers to is released.
+_yang_base_classes = weakref.WeakValueDictionary()
+
+
+def build_yang_base_class(base_type, yang_type=None, is_container=False, presence=None, extmethod_table=()):
+    """
+    Return the YANGBaseClass wrapper for base_type. Only the static part of
+    the signature of YANGDynClass is used to build the class, such that all
+    instances with the same signature share a single class - the attributes
+    that are specific to an instance (its name, parent, path etc.) are
+    supplied as keyword arguments when the class is instantiated.
+
+    The facts about the schema node are stored in a YANGSchemaNode that each
+    instance refers to, and are read through properties of the class - only
+    the state of the instance itself is stored on it.
+    """
+    cls_key = (id(base_type), yang_type, is_container, presence, extmethod_table)
+    cls = _yang_base_classes.get(cls_key)
+    if cls is not None and cls._base_type is base_type:
+        return cls
 
     clsslots = [
-        "_default",
+        "_schema",
         "_mchanged",
-        "_yang_name",
-        "_choice",
+        "_change_tracker",
         "_parent",
         "_supplied_register_path",
         "_path_helper",
-        "_base_type",
-        "_is_leaf",
-        "_is_container",
-        "_extensionsd",
         "_extmethods",
-        "_is_keyval",
-        "_register_paths",
-        "_namespace",
-        "_yang_type",
-        "_defining_module",
-        "_metadata",
-        "_is_config",
+        "_metadatad",
         "_cpresent",
-        "_presence",
+        "_path_cache",
     ]
 
-    if extmethods:
-        rpath = None
-        if supplied_register_path is not None:
-            rpath = supplied_register_path
-        if parent_instance is not None:
-            rpath = parent_instance._path() + [yang_name]
-        else:
-            rpath = []
-        chk_path = "/" + "/".join(remove_path_attributes(rpath))
-        if chk_path in extmethods:
-            for method in [i for i in dir(extmethods[chk_path]) if not i.startswith("_")]:
-                clsslots.append("_" + method)
-
-    class YANGBaseClass(base_type):
+    class YANGBaseClass(YANGSchemaAttributes, base_type):
         # we only create slots for things that are restricted
         # in adding attributes to them - this means containing
         # data nodes. This means that we can allow
@@ -1019,8 +2376,12 @@ def YANGDynClass(*args, **kwargs):
             __slots__ = tuple(clsslots)
 
         _pybind_base_class = regex.sub("<(type|class) '(?P<class>.*)'>", r"\g<class>", str(base_type))
+        _base_type = base_type
+        _extmethod_table = extmethod_table
 
         def __new__(self, *args, **kwargs):
+            if kwargs:
+                kwargs = {k: v for k, v in kwargs.items() if k not in YANG_DYN_CLASS_KWARGS}
             try:
                 obj = base_type.__new__(self, *args, **kwargs)
             except TypeError:
@@ -1028,42 +2389,41 @@ def YANGDynClass(*args, **kwargs):
             return obj
 
         def __init__(self, *args, **kwargs):
-            self._default = False
+            load = kwargs.pop("load", None)
+            schema = kwargs.pop("schema", None)
+            self._schema = schema or yang_schema_node(
+                yang_name=kwargs.pop("yang_name", False),
+                yang_type=kwargs.pop("yang_type", None),
+                namespace=kwargs.pop("namespace", None),
+                defining_module=kwargs.pop("defining_module", None),
+                is_leaf=kwargs.pop("is_leaf", False),
+                is_container=kwargs.pop("is_container", False),
+                is_config=kwargs.pop("is_config", True),
+                is_keyval=kwargs.pop("is_keyval", False),
+                register_paths=kwargs.pop("register_paths", True),
+                choice=kwargs.pop("choice", False),
+                extensions=kwargs.pop("extensions", None),
+                presence=kwargs.pop("presence", None),
+                default=kwargs.pop("default", False) or False,
+            )
             self._mchanged = False
-            self._yang_name = yang_name
-            self._parent = parent_instance
-            self._choice = choice_member
-            self._path_helper = path_helper
-            self._supplied_register_path = supplied_register_path
-            self._base_type = base_type
-            self._is_leaf = is_leaf
-            self._is_container = is_container
-            self._is_config = is_config
-            self._extensionsd = extensions
-            self._extmethods = extmethods
-            self._is_keyval = is_keyval
-            self._register_paths = register_paths
-            self._namespace = namespace
-            self._yang_type = yang_type
-            self._defining_module = defining_module
-            self._metadata = {}
-            self._presence = has_presence
+            self._parent = kwargs.pop("parent", False)
+            self._change_tracker = change_tracker(self._parent)
+            self._path_helper = kwargs.pop("path_helper", None)
+            self._supplied_register_path = kwargs.pop("register_path", None)
+            self._path_cache = None
+            self._extmethods = kwargs.pop("extmethods", None)
             self._cpresent = False
 
-            if self._extmethods:
-                chk_path = "/" + "/".join(remove_path_attributes(self._register_path()))
-                if chk_path in self._extmethods:
-                    for method in [i for i in dir(self._extmethods[chk_path]) if not i.startswith("_")]:
-                        # Don't allow methods to be overwritten
-                        if hasattr(self, "_" + method):
-                            continue
-                        member = getattr(self._extmethods[chk_path], method)
-                        if hasattr(member, "__call__"):
-                            if not hasattr(self, "_method"):
-                                setattr(self, "_" + method, self.__generate_extmethod(member))
-
-            if default:
-                self._default = default
+            # a container that is created from a value is recorded as a single
+            # change, rather than a change for each of its elements. The
+            # parents that are absent from the encoding of the tree are found
+            # before they are marked as changed.
+            journal = self._change_tracker.journal if len(args) else None
+            absent = None
+            if journal is not None and not self._is_keyval:
+                absent = journal.absent_ancestor(self._parent)
+
             if len(args):
                 self._set()
 
@@ -1083,24 +2443,77 @@ def YANGDynClass(*args, **kwargs):
                 if load is not None:
                     kwargs["load"] = load
 
-            try:
-                super(YANGBaseClass, self).__init__(*args, **kwargs)
-            except TypeError:
-                super(YANGBaseClass, self).__init__()
-            except Exception:
-                raise
+            with journal.paused() if journal is not None else contextlib.nullcontext():
+                try:
+                    super(YANGBaseClass, self).__init__(*args, **kwargs)
+                except TypeError:
+                    super(YANGBaseClass, self).__init__()
+                except Exception:
+                    raise
+
+            if journal is not None and not self._is_keyval:
+                journal.record("set", self, absent=absent)
+
+        def __reduce_ex__(self, protocol):
+            return reduce_node(self)
+
+        def __deepcopy__(self, memo):
+            return deepcopy_node(self)
+
+        if not hasattr(base_type, "__copy__"):
+
+            def __copy__(self):
+                # a copy within the process keeps the state of the object,
+                # rather than rebuilding it from its values as pickling does.
+                cls = type(self)
+                getnewargs = getattr(self, "__getnewargs__", None)
+                new = cls.__new__(cls, *(getnewargs() if getnewargs is not None else ()))
+                for klass in cls.__mro__:
+                    for slot in vars(klass).values():
+                        if isinstance(slot, types.MemberDescriptorType):
+                            try:
+                                slot.__set__(new, slot.__get__(self))
+                            except AttributeError:
+                                # the slot is not set.
+                                pass
+                if hasattr(self, "__dict__"):
+                    new.__dict__.update(self.__dict__)
+                return new
 
         def _changed(self):
-            return self._mchanged
+            # _mchanged is the epoch in which this object was changed, which
+            # is negative where the change must still be propagated.
+            changed = self._mchanged
+            return changed is not False and abs(changed) == self._change_tracker.epoch
+
+        def _mark_clean(self):
+            parent = self._parent
+            if parent and hasattr(parent, "_mark_clean"):
+                parent._mark_clean()
+            else:
+                self._change_tracker.epoch += 1
+
+        def _absent_parent(self):
+            # the outermost parent that is absent from the encoding of the
+            # tree, which is found before an object is changed in place.
+            journal = self._change_tracker.journal
+            return journal.absent_ancestor(self._parent) if journal is not None else None
+
+        def _record_set(self, absent=None):
+            # record a change to the value of a leaf-list or bits object in
+            # place, lists record their own changes.
+            journal = self._change_tracker.journal
+            if journal is not None and not self._is_container == "list":
+                journal.record("set", self, absent=absent)
 
         def _extensions(self):
             return self._extensionsd
 
         def _path(self):
-            return self._register_path()
+            return list(self._path_tuple())
 
         def _yang_path(self):
-            return "/" + "/".join(self._register_path())
+            return "/" + "/".join(self._path_tuple())
 
         def __str__(self):
             return super(YANGBaseClass, self).__str__()
@@ -1109,30 +2522,40 @@ def YANGDynClass(*args, **kwargs):
             return super(YANGBaseClass, self).__repr__()
 
         def _set(self, choice=False):
-            if hasattr(self, "__choices__") and choice:
-                for ch in self.__choices__:
-                    if ch == choice[0]:
-                        for case in self.__choices__[ch]:
-                            if not case == choice[1]:
-                                for elem in self.__choices__[ch][case]:
-                                    method = "_unset_%s" % elem
-                                    if not hasattr(self, method):
-                                        raise AttributeError("unmapped choice!")
-                                    x = getattr(self, method)
-                                    x()
+            if choice:
+                cases = getattr(self, "__choices__", {}).get(choice[0], {})
+                for case in cases:
+                    if not case == choice[1]:
+                        for elem in cases[case]:
+                            if not self._pyangbind_materialised(elem):
+                                continue
+                            method = "_unset_%s" % elem
+                            if not hasattr(self, method):
+                                raise AttributeError("unmapped choice!")
+                            x = getattr(self, method)
+                            x()
 
             if self._choice and not choice:
                 choice = self._choice
 
-            self._mchanged = True
+            self._mchanged = self._change_tracker.epoch
 
             if self._presence:
                 self._cpresent = True
 
-            if self._parent and hasattr(self._parent, "_set"):
-                self._parent._set(choice=choice)
+            parent = self._parent
+            if parent and hasattr(parent, "_set"):
+                # Where the parent has already been changed in this epoch, so
+                # have all of its ancestors - there is no need to propagate
+                # the change further unless the parent must resolve a choice.
+                if parent._mchanged == parent._change_tracker.epoch and (
+                    not choice or choice[0] not in getattr(parent, "__choices__", {})
+                ):
+                    return
+                parent._set(choice=choice)
 
         def _add_metadata(self, k, v):
+            _unshare(self)
             self._metadata[k] = v
 
         def yang_name(self):
@@ -1143,67 +2566,95 @@ def YANGDynClass(*args, **kwargs):
 
         # we need to overload the set methods
         def __setitem__(self, *args, **kwargs):
+            _unshare(self)
+            absent = self._absent_parent()
             self._set()
             super(YANGBaseClass, self).__setitem__(*args, **kwargs)
+            self._record_set(absent)
 
         def append(self, *args, **kwargs):
             if not hasattr(super(YANGBaseClass, self), "append"):
                 raise AttributeError("%s object has no attribute append" % base_type)
+            _unshare(self)
+            absent = self._absent_parent()
             self._set()
             super(YANGBaseClass, self).append(*args, **kwargs)
+            self._record_set(absent)
 
         def pop(self, *args, **kwargs):
             if not hasattr(super(YANGBaseClass, self), "pop"):
                 raise AttributeError("%s object has no attribute pop" % base_type)
+            _unshare(self)
+            absent = self._absent_parent()
             self._set()
             item = super(YANGBaseClass, self).pop(*args, **kwargs)
+            self._record_set(absent)
             return item
 
         def remove(self, *args, **kwargs):
             if not hasattr(super(YANGBaseClass, self), "remove"):
                 raise AttributeError("%s object has no attribute remove" % base_type)
+            _unshare(self)
+            absent = self._absent_parent()
             self._set()
             if self._path_helper:
                 elem_index = super(YANGBaseClass, self).index(*args, **kwargs)
                 super(YANGBaseClass, self).__getitem__(elem_index)
             super(YANGBaseClass, self).remove(*args, **kwargs)
+            self._record_set(absent)
 
         def extend(self, *args, **kwargs):
             if not hasattr(super(YANGBaseClass, self), "extend"):
                 raise AttributeError("%s object has no attribute extend" % base_type)
+            _unshare(self)
+            absent = self._absent_parent()
             self._set()
             super(YANGBaseClass, self).extend(*args, **kwargs)
+            self._record_set(absent)
 
         def insert(self, *args, **kwargs):
             if not hasattr(super(YANGBaseClass, self), "insert"):
                 raise AttributeError("%s object has no attribute insert" % base_type)
+            _unshare(self)
+            absent = self._absent_parent()
             self._set()
             super(YANGBaseClass, self).insert(*args, **kwargs)
+            self._record_set(absent)
 
         def _register_path(self):
-            if self._supplied_register_path is not None:
-                return self._supplied_register_path
-            if self._parent is not None:
-                return self._parent._path() + [self._yang_name]
+            return list(self._path_tuple())
+
+        def _path_tuple(self):
+            # The path is built once, from the path of the parent (or the path
+            # that was supplied when the object was created), and is kept
+            # with the tuple that it was built from - such that it is rebuilt
+            # where the object, or one of its ancestors, has a new parent.
+            supplied = self._supplied_register_path
+            if supplied is not None:
+                source = supplied
+            elif self._parent is not None:
+                source = self._parent._path_tuple()
             else:
-                return []
-
-        def __generate_extmethod(self, methodfn):
-            def extmethodfn(*args, **kwargs):
-                kwargs["caller"] = self._register_path()
-                kwargs["path_helper"] = self._path_helper
-                return methodfn(*args, **kwargs)
-
-            return extmethodfn
+                return ()
+            cached = self._path_cache
+            if cached is not None and cached[0] is source:
+                return cached[1]
+            path = tuple(supplied) if supplied is not None else source + (self._yang_name,)
+            self._path_cache = (source, path)
+            return path
 
         def _set_present(self, present=True):
             if not self._is_container == "container":
                 raise AttributeError("Cannot set presence on a non-container")
+            _unshare(self)
             self._cpresent = present
             if present is True:
                 self._set()
             if present is False:
                 self._mchanged = False
+                # the next change within this container must mark it as
+                # present again.
+                _defer_changes_within(self, self._change_tracker.epoch)
 
         def _present(self):
             if not self._is_container == "container":
@@ -1214,7 +2665,156 @@ def YANGDynClass(*args, **kwargs):
 
             return self._cpresent
 
-    return YANGBaseClass(*args, **kwargs)
+    # extension methods do not replace the attributes of the class.
+    for name, method in extmethod_table:
+        if not hasattr(YANGBaseClass, name):
+            setattr(YANGBaseClass, name, YANGExtMethod(method))
+
+    _yang_base_classes[cls_key] = YANGBaseClass
+    return YANGBaseClass
+
+
+def YANGDynClass(*args, **kwargs):
+    """
+    Wrap an type - specified in the base_type arugment - with
+    a set of custom attributes that YANG specifies (or are required
+    for serialisation of that object). Particularly:
+
+      - base_type:  the original type - for example, string, int.
+      - default:    the YANG specified default value of the type.
+      - yang_name:  the YANG name of the type (as opposed to a 'safe'
+                    Python version).
+      - parent:     the class which this type is a member of in the
+                    YANG-specified tree.
+      - choice:     The choice branch that this type is a member of.
+      - is_{container,leaf}: whether this element is a container or
+                             a leaf.
+      - path_helper: pyangbind helper class to allow XPATH lookups.
+      - supplied_register_path: an override for the path that this
+                                object should register to. This is
+                                used when an element is a member of
+                                a list to add the key attributes to
+                                the path.
+      - extensions:  The list of extensions that should be stored
+                     with the type.
+      - is_config:   Whether this is a configuration (editable)
+                     node.
+      - presence:    Whether the YANG container that is being
+                     represented has the presence keyword
+
+    The wrapper class itself is shared between all instances with the same
+    base type and static signature (see build_yang_base_class), the
+    remaining arguments are stored on the instance.
+    """
+    base_type = kwargs.pop("base", False)
+
+    if not base_type:
+        raise TypeError("must have a base type")
+
+    if isinstance(base_type, list):
+        # this is a union, we must infer type
+        if not len(args):
+            # there is no argument to infer the type from
+            # so use the first type (default)
+            base_type = base_type[0]
+        else:
+            # the first type that accepts the argument is used.
+            base_type = union_plan(base_type).resolve(base_type, args[0])
+
+    methods = ()
+    extmethods = kwargs.get("extmethods", None)
+    if extmethods:
+        methods = extmethod_table(extmethods, kwargs.get("parent", False), kwargs.get("yang_name", False))
+
+    cls = build_yang_base_class(
+        base_type,
+        yang_type=kwargs.get("yang_type", None),
+        is_container=kwargs.get("is_container", False),
+        presence=kwargs.get("presence", None),
+        extmethod_table=methods,
+    )
+    return cls(*args, **kwargs)
+
+
+# The arguments to YANGDynClass that are stored in the YANGSchemaNode of an
+# instance, rather than on the instance itself.
+_SCHEMA_NODE_KWARGS = frozenset(YANGSchemaNode._fields)
+
+
+class YANGLeafClass(object):
+    """
+    A constructor for the instances of a leaf (or leaf-list) of a generated
+    class, which is created once when the bindings are imported - see
+    --static-leaf-classes. It is called with the arguments that are specific
+    to an instance (its value, parent, path helper etc.) and is equivalent to
+    calling YANGDynClass with both these and the static arguments that it was
+    created with. The base type, the schema node and - unless the base type is
+    a union - the wrapper class are resolved once, rather than for each call.
+    """
+
+    __slots__ = ("base", "kwargs", "schema", "_cls", "_base_kwargs")
+
+    def __init__(self, base=False, **kwargs):
+        if not base:
+            raise TypeError("must have a base type")
+        self.base = base
+        self.kwargs = kwargs
+        schema = {k: v for k, v in kwargs.items() if k in _SCHEMA_NODE_KWARGS}
+        schema["default"] = schema.get("default", False) or False
+        self.schema = yang_schema_node(**schema)
+        # the arguments that are handed to the base type.
+        self._base_kwargs = {k: v for k, v in kwargs.items() if k not in YANG_DYN_CLASS_KWARGS}
+        self._cls = None
+        if not isinstance(base, list):
+            self._cls = build_yang_base_class(
+                base,
+                yang_type=kwargs.get("yang_type", None),
+                is_container=kwargs.get("is_container", False),
+                presence=kwargs.get("presence", None),
+            )
+
+    def __call__(self, *args, **kwargs):
+        if self._cls is None or kwargs.get("extmethods"):
+            # the class depends on the value, or the extension methods of the
+            # parent.
+            kwargs.update(self.kwargs)
+            return YANGDynClass(*args, base=self.base, **kwargs)
+        if self._base_kwargs:
+            kwargs.update(self._base_kwargs)
+        return self._cls(*args, schema=self.schema, **kwargs)
+
+
+class YANGReferencedTargets(object):
+    """
+    The objects that a leafref path resolves to, as returned by a path
+    helper's get_referenced() method. The objects are indexed by their
+    string value the first time that a value is looked up in them.
+    """
+
+    __slots__ = ("objects", "_index")
+
+    def __init__(self, objects):
+        self.objects = objects
+        self._index = None
+
+    def find(self, value):
+        # Return the object whose value is value, or None. Where more than
+        # one object has the value, the last is returned.
+        if self._index is None:
+            self._index = {str(obj): obj for obj in self.objects}
+        return self._index.get(str(value))
+
+
+def _referenced_targets(path_helper, path, caller):
+    get_referenced = getattr(path_helper, "get_referenced", None)
+    if get_referenced is None:
+        return YANGReferencedTargets(path_helper.get(path, caller=caller))
+    return get_referenced(path, caller=caller)
+
+
+# The ReferencePathType classes, keyed by their referenced path and whether
+# they require an instance. An entry is removed when the class is released.
+_reference_types = weakref.WeakValueDictionary()
 
 
 def ReferenceType(*args, **kwargs):
@@ -1224,12 +2824,20 @@ def ReferenceType(*args, **kwargs):
     to be a relative (rather than absolute) path. The require_instance
     argument specifies whether errors should be thrown in the case
     that the referenced instance does not exist.
+
+    The type is built once for each referenced path and require_instance.
+    The caller and path helper are supplied to each instance - where the
+    instance is created by YANGDynClass, they are the path and path helper of
+    the leaf - and are ignored where they are supplied here.
     """
     ref_path = kwargs.pop("referenced_path", False)
-    path_helper = kwargs.pop("path_helper", None)
-    caller = kwargs.pop("caller", False)
     require_instance = kwargs.pop("require_instance", False)
 
+    cls_key = (ref_path, require_instance)
+    cls = _reference_types.get(cls_key)
+    if cls is not None:
+        return cls
+
     class ReferencePathType(object):
         __slots__ = (
             "_referenced_path",
@@ -1245,6 +2853,12 @@ def ReferenceType(*args, **kwargs):
         _pybind_generated_by = "ReferencePathType"
 
         def __init__(self, *args, **kwargs):
+            # a leaf that is wrapped by YANGDynClass has its path helper set
+            # before it is initialised.
+            path_helper = kwargs.pop("path_helper", getattr(self, "_path_helper", None))
+            caller = kwargs.pop("caller", False)
+            if path_helper and caller is False and getattr(self, "_parent", False):
+                caller = self._path()
             self._referenced_path = ref_path
             self._path_helper = path_helper
             self._referenced_object = False
@@ -1262,7 +2876,8 @@ def ReferenceType(*args, **kwargs):
                 value = None
 
             if self._path_helper and value is not None:
-                path_chk = self._path_helper.get(self._referenced_path, caller=self._caller)
+                targets = _referenced_targets(self._path_helper, self._referenced_path, self._caller)
+                path_chk = targets.objects
 
                 # if the lookup returns only one leaf, then this means that we have
                 # something that could potentially be a pointer. However, this is not
@@ -1295,9 +2910,9 @@ def ReferenceType(*args, **kwargs):
                         self._referenced_object = None
                     else:
                         found = False
-                        path_chk = self._path_helper.get(self._referenced_path, caller=self._caller)
-
                         if len(path_chk) == 1 and is_yang_leaflist(path_chk[0]):
+                            # the values of a leaf-list change without it
+                            # being registered again, so are not indexed.
                             index = 0
                             for i in path_chk[0]:
                                 if str(i) == str(value):
@@ -1306,11 +2921,10 @@ def ReferenceType(*args, **kwargs):
                                     break
                                 index += 1
                         else:
-                            found = False
-                            for i in path_chk:
-                                if str(i) == str(value):
-                                    found = True
-                                    self._referenced_object = i
+                            target = targets.find(value)
+                            if target is not None:
+                                found = True
+                                self._referenced_object = target
 
                         if not found:
                             raise ValueError(
@@ -1326,7 +2940,7 @@ def ReferenceType(*args, **kwargs):
 
         def _get_ptr(self):
             if self._ptr:
-                ptr = self._path_helper.get(self._referenced_path, caller=self._caller)
+                ptr = _referenced_targets(self._path_helper, self._referenced_path, self._caller).objects
                 if len(ptr) == 1:
                     return ptr[0]
             raise ValueError("Invalid pointer specified")
@@ -1346,7 +2960,8 @@ def ReferenceType(*args, **kwargs):
                 return str(self._referenced_object)
             return str(self._get_ptr())
 
-    return type(ReferencePathType(*args, **kwargs))
+    _reference_types[cls_key] = ReferencePathType
+    return ReferencePathType
 
 
 class YANGBinary(bytes):
@@ -1374,74 +2989,279 @@ class YANGBinary(bytes):
         return str(self, encoding=encoding, errors=errors)
 
 
-def YANGBitsType(allowed_bits):
-    class YANGBits(set):
-        """Map the ``bits`` built-in type of YANG
-
-        From RFC 6020, 9.7:
+# There is a single bits class for each set of bit definitions.
+_bits_types = {}
 
-        > The bits built-in type represents a bit set. That is, a bits value
-        > is a set of flags identified by small integer position numbers
-        > starting at 0. Each bit number has an assigned name.
-        >
-        > ... In the canonical form, the bit values are separated by a single
-        > space character and they appear ordered by their position.
 
-        __init__ parses such a string, and __str__() prints the value as
-        above. In the Python model, the bits that are set are kept as a set
-        of strings.
+def _bits(allowed_bits, value):
+    return YANGBitsType(allowed_bits)(value)
 
-        Override the ``add()``, ``discard()`` and similar methods to set and
-        clear the bits, checking for legal values.
 
-        :param allowed_bits: dictionary of legal bit values and positions; it
-            is set when generating the YANG-Python type mapping, when
-            ``pyangbing.lib.pybing.build_elemtype`` recurses over the YANG model
-        """
+def YANGBitsType(allowed_bits):
+    """
+    Function to return a YANGBits type for the bits that are specified by
+    allowed_bits - a dictionary of the name of each bit to its position.
+    """
+    key = tuple(allowed_bits.items())
+    cls = _bits_types.get(key)
+    if cls is None:
+        cls = _bits_types[key] = type("YANGBits", (YANGBits,), {"__slots__": ()})
+        cls._define_bits(allowed_bits)
+    return cls
+
+
+class YANGBits(abc.MutableSet):
+    """Map the ``bits`` built-in type of YANG
+
+    From RFC 6020, 9.7:
+
+    > The bits built-in type represents a bit set. That is, a bits value
+    > is a set of flags identified by small integer position numbers
+    > starting at 0. Each bit number has an assigned name.
+    >
+    > ... In the canonical form, the bit values are separated by a single
+    > space character and they appear ordered by their position.
+
+    __init__ parses such a string, and __str__() prints the value as above.
+    In the Python model, the value acts as a set of the names of the bits
+    that are set, and is stored as an integer mask - in which each bit is
+    numbered by the order of its position amongst the bits of the type.
+
+    The ``add()``, ``discard()`` and similar methods set and clear the bits,
+    checking for legal values. Operators that do not change the value, such
+    as ``|`` and ``union()``, return a set - as they did when the value was
+    stored as a set.
+
+    The tables that map the name of each bit to its mask are built once for
+    each type, by YANGBitsType.
+    """
 
-        _pybind_generated_by = "YANGBits"
+    __slots__ = ("_mask",)
+
+    _pybind_generated_by = "YANGBits"
+    # the position of each bit, keyed by its name.
+    _allowed_bits = {}
+    # the mask of each bit, keyed by its name, and the names of the bits in
+    # the order of their masks.
+    _bit_masks = {}
+    _bit_names = ()
+    # the canonical string, and the hash, of each mask that has been
+    # printed or hashed.
+    _bit_text = {}
+    _bit_hashes = {}
+
+    @classmethod
+    def _define_bits(cls, allowed_bits):
+        cls._allowed_bits = dict(allowed_bits)
+        names = sorted(cls._allowed_bits, key=lambda bit: int(cls._allowed_bits[bit]))
+        cls._bit_names = tuple(names)
+        cls._bit_masks = {bit: 1 << i for i, bit in enumerate(names)}
+        cls._bit_text = {}
+        cls._bit_hashes = {}
+
+    def __new__(cls, *args, **kwargs):
+        # a YANGBaseClass registers with its path helper - which compares it
+        # with the object that it replaces - before it is initialised.
+        obj = super(YANGBits, cls).__new__(cls)
+        obj._mask = 0
+        return obj
+
+    def __init__(self, *args, **kwargs):
+        mask = 0
+        if args:
+            value = args[0]
+            if getattr(value, "_bit_masks", None) is self._bit_masks:
+                mask = value._mask
+            else:
+                if isinstance(value, str):
+                    value = value.split()
+                for bit in value:
+                    mask |= self._bit_mask(bit)
+        self._mask = mask
+
+    def _bit_mask(self, bit):
+        mask = self._bit_masks.get(bit)
+        if mask is None:
+            raise ValueError(f"Bit value {bit} not valid, expected one of {self._allowed_bits}")
+        return mask
+
+    def _add_bit_definition(self, bit, position):
+        # The type of the value is shared by all values with the same bits,
+        # so the value is moved to the type that has the additional bit -
+        # keeping the bits that are set.
+        allowed_bits = dict(self._allowed_bits)
+        allowed_bits[bit] = position
+        bits_type = YANGBitsType(allowed_bits)
+        names = list(self)
+        if hasattr(self, "__dict__"):
+            # the value is wrapped by YANGDynClass, whose class cannot be
+            # replaced by one with another base - so the value refers to the
+            # tables of the type instead.
+            for table in ["_allowed_bits", "_bit_masks", "_bit_names", "_bit_text", "_bit_hashes"]:
+                setattr(self, table, getattr(bits_type, table))
+        else:
+            self.__class__ = bits_type
+        self._mask = 0
+        for name in names:
+            self._mask |= self._bit_masks[name]
+
+    def _bits_changing(self):
+        # give forks that still share the object a copy of it, where it
+        # has been wrapped by YANGDynClass
+        if hasattr(self, "_set"):
+            _unshare(self)
+
+    def _bits_changed(self):
+        # mark the object as changed where it has been wrapped by
+        # YANGDynClass
+        if hasattr(self, "_set"):
+            absent = self._absent_parent()
+            self._set()
+            self._record_set(absent)
+
+    def _set_mask(self, mask):
+        self._bits_changing()
+        self._mask = mask
+        self._bits_changed()
+
+    def __contains__(self, bit):
+        return self._mask & self._bit_masks.get(bit, 0) != 0
+
+    def __iter__(self):
+        names = self._bit_names
+        mask = self._mask
+        i = 0
+        while mask:
+            if mask & 1:
+                yield names[i]
+            mask >>= 1
+            i += 1
+
+    def __len__(self):
+        return bin(self._mask).count("1")
+
+    def __eq__(self, other):
+        # values of the same type are compared by their masks.
+        if getattr(other, "_bit_masks", None) is self._bit_masks:
+            return self._mask == other._mask
+        if isinstance(other, abc.Set):
+            return set(self) == set(other)
+        return NotImplemented
+
+    def __hash__(self):
+        # values are equal to sets of the same bits, so hash as a frozenset
+        # of them would.
+        mask = self._mask
+        value = self._bit_hashes.get(mask)
+        if value is None:
+            value = hash(frozenset(self))
+            if len(self._bit_hashes) < 4096:
+                self._bit_hashes[mask] = value
+        return value
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)
+
+    # overwrite set methods to 1/ check for legal values and 2/ set the
+    # changed flag
+    def add(self, bit):
+        self._set_mask(self._mask | self._bit_mask(bit))
+
+    def clear(self):
+        self._set_mask(0)
+
+    def discard(self, bit):
+        self._set_mask(self._mask & ~self._bit_mask(bit))
+
+    def pop(self):
+        if not self._mask:
+            raise KeyError("pop from an empty set")
+        bit = next(iter(self))
+        self._set_mask(self._mask & (self._mask - 1))
+        return bit
+
+    def remove(self, bit):
+        mask = self._bit_masks.get(bit, 0)
+        if not self._mask & mask:
+            raise KeyError(bit)
+        self._set_mask(self._mask & ~mask)
+
+    def update(self, *others):
+        mask = self._mask
+        for other in others:
+            for bit in other:
+                mask |= self._bit_mask(bit)
+        self._set_mask(mask)
+
+    def intersection_update(self, *others):
+        mask = self._mask
+        for other in others:
+            mask &= self._masks_of(other)
+        self._set_mask(mask)
+
+    def difference_update(self, *others):
+        mask = self._mask
+        for other in others:
+            mask &= ~self._masks_of(other)
+        self._set_mask(mask)
+
+    def symmetric_difference_update(self, other):
+        mask = 0
+        for bit in set(other):
+            mask |= self._bit_mask(bit)
+        self._set_mask(self._mask ^ mask)
+
+    def _masks_of(self, bits):
+        # the mask of the bits in bits that are defined for this type.
+        masks = self._bit_masks
+        mask = 0
+        for bit in bits:
+            mask |= masks.get(bit, 0)
+        return mask
+
+    def union(self, *others):
+        return set(self).union(*others)
+
+    def intersection(self, *others):
+        return set(self).intersection(*others)
+
+    def difference(self, *others):
+        return set(self).difference(*others)
+
+    def symmetric_difference(self, other):
+        return set(self).symmetric_difference(other)
+
+    def issubset(self, other):
+        return set(self).issubset(other)
+
+    def issuperset(self, other):
+        return set(self).issuperset(other)
+
+    def copy(self):
+        return set(self)
+
+    def __copy__(self):
+        new = type(self).__new__(type(self))
+        new._mask = self._mask
+        try:
+            new.__dict__.update(self.__dict__)
+        except AttributeError:
+            pass
+        return new
+
+    def __reduce__(self):
+        return (_bits, (self._allowed_bits, str(self)))
 
-        def __init__(self, *args, **kwargs):
-            super().__init__()
-            self._allowed_bits = allowed_bits
+    def __repr__(self):
+        return "YANGBits(%r)" % set(self)
 
-            if args:
-                value = args[0]
-                for bit in value.split():
-                    self.add(bit)
-
-        def _add_bit_definition(self, bit, position):
-            self._allowed_bits[bit] = position
-
-        # overwrite set methods to 1/ check for legal values and 2/ set the
-        # changed flag
-        def add(self, bit):
-            if bit not in self._allowed_bits:
-                raise ValueError(f"Bit value {bit} not valid, expected one of {self._allowed_bits}")
-            super().add(bit)
-            self._mchanged = True
-
-        def clear(self):
-            super().clear()
-            self._mchanged = True
-
-        def discard(self, bit):
-            if bit not in self._allowed_bits:
-                raise ValueError(f"Bit value {bit} not valid, expected one of {self._allowed_bits}")
-            super().discard(bit)
-            self._mchanged = True
-
-        def pop(self):
-            super().pop()
-            self._mchanged = True
-
-        def remove(self, bit):
-            super().remove(bit)
-            self._mchanged = True
-
-        def __str__(self, encoding="ascii", errors="replace"):
-            """Return bits as shown in JSON."""
-            sort_key = self._allowed_bits.__getitem__
-            return " ".join(sorted(self, key=sort_key))
-
-    return YANGBits
+    def __str__(self, encoding="ascii", errors="replace"):
+        """Return bits as shown in JSON."""
+        mask = self._mask
+        text = self._bit_text.get(mask)
+        if text is None:
+            text = " ".join(self)
+            if len(self._bit_text) < 4096:
+                self._bit_text[mask] = text
+        return text
@@ -23,13 +23,21 @@ limitations under the License.
 
 from __future__ import unicode_literals
 
+import concurrent.futures
 import copy
 import decimal
+import functools
+import hashlib
+import io
+import json
+import multiprocessing
 import optparse
 import os
+import re
 import sys
 from collections import OrderedDict
 
+import pyang
 from pyang import plugin, statements, util
 
 import pyangbind.helpers.misc as misc_help
@@ -186,6 +194,29 @@ INT_RANGE_TYPES = ["uint8", "uint16", "uint32", "uint64", "int8", "int16", "int3
 # The types that are built-in to YANG
 YANG_BUILTIN_TYPES = list(class_map.keys()) + ["container", "list", "rpc", "notification", "leafref"]
 
+# The attributes of each element of a class that are used when its code is
+# rendered (see render_class).
+RENDERED_ELEMENT_KEYS = ["name", "yang_name", "path", "origtype", "description", "config", "defining_module"]
+
+# The manifest of the bindings that are generated with --split-class-dir,
+# which is written to the top-level package, and the options that change
+# the bindings that are generated (see split_inputs).
+SPLIT_MANIFEST = "_pyangbind_manifest.json"
+OUTPUT_OPTIONS = [
+    "use_xpathhelper",
+    "use_extmethods",
+    "pybind_interested_exts",
+    "build_rpcs",
+    "build_notifications",
+    "generate_presence",
+    "lazy_children",
+    "static_leaf_classes",
+    "fixed_point_decimal64",
+    "features",
+    "exclude_features",
+    "deviations",
+]
+
 
 # Base machinery to support operation as a plugin to pyang.
 def pyang_plugin_init():
@@ -269,6 +300,58 @@ class PyangBindClass(plugin.PyangPlugin):
                                     keyword is used in the generated
                                     code.""",
         ),
+        option_group.add_option(
+            "--lazy-children",
+            dest="lazy_children",
+            action="store_true",
+            help="""Create the child elements of a
+                                  container when they are first
+                                  accessed, rather than when the
+                                  container is created""",
+        ),
+        option_group.add_option(
+            "--static-leaf-classes",
+            dest="static_leaf_classes",
+            action="store_true",
+            help="""Build the class of each leaf once,
+                                  when the bindings are imported,
+                                  rather than each time that the
+                                  leaf is set""",
+        ),
+        option_group.add_option(
+            "--fixed-point-decimal64",
+            dest="fixed_point_decimal64",
+            action="store_true",
+            help="""Store decimal64 values as integers
+                                  scaled by their fraction-digits,
+                                  rather than as Decimal""",
+        ),
+        option_group.add_option(
+            "--sync-output",
+            dest="sync_output",
+            action="store_true",
+            help="""Synchronise the output files to
+                                  disk once they have been
+                                  written""",
+        ),
+        option_group.add_option(
+            "--jobs",
+            metavar="N",
+            dest="pybind_jobs",
+            type=int,
+            help="""Render and write the modules of
+                                  split classes with N processes,
+                                  or one per CPU where N is 0""",
+        ),
+        option_group.add_option(
+            "--force",
+            dest="pybind_force",
+            action="store_true",
+            help="""Regenerate every module of split
+                                  classes, rather than only those
+                                  that have changed since the
+                                  bindings were last generated""",
+        ),
         option_group.add_option(
             "--build-notifications",
             dest="build_notifications",
@@ -303,6 +386,13 @@ def build_pybind(ctx, modules, fd):
                 sys.stderr.write("FATAL: pyangbind cannot build module that pyang" + " has found errors with.\n")
                 sys.exit(127)
 
+    # The options that change the code of each class (see render_class).
+    ctx.pybind_render_options = {
+        "use_xpathhelper": ctx.opts.use_xpathhelper,
+        "use_extmethods": ctx.opts.use_extmethods,
+        "lazy_children": ctx.opts.lazy_children,
+    }
+
     # Build the common set of imports that all pyangbind files needs
     ctx.pybind_common_hdr = "# -*- coding: utf-8 -*-"
     ctx.pybind_common_hdr += "\n"
@@ -312,6 +402,7 @@ def build_pybind(ctx, modules, fd):
 
     yangtypes_imports = [
         "RestrictedPrecisionDecimalType",
+        "YANGDecimal64Type",
         "RestrictedClassType",
         "TypedListType",
         "YANGBool",
@@ -320,7 +411,11 @@ def build_pybind(ctx, modules, fd):
         "ReferenceType",
         "YANGBinary",
         "YANGBitsType",
+        "YANGChangeTracker",
+        "YANGEnumerationRegistry",
     ]
+    if ctx.opts.static_leaf_classes:
+        yangtypes_imports.append("YANGLeafClass")
     for library in yangtypes_imports:
         ctx.pybind_common_hdr += "from pyangbind.lib.yangtypes import {}\n".format(library)
     ctx.pybind_common_hdr += """from pyangbind.lib.base import PybindBase
@@ -336,6 +431,22 @@ long = int
         fd.write(ctx.pybind_common_hdr)
     else:
         ctx.pybind_split_basepath = os.path.abspath(ctx.opts.split_class_dir)
+        # Where the modules, and the options, are those that the bindings in
+        # the directory were generated from, then they are not generated
+        # again.
+        ctx.pybind_split_inputs = split_inputs(ctx, modules)
+        ctx.pybind_split_manifest = read_split_manifest(ctx)
+        if (
+            not ctx.opts.pybind_force
+            and ctx.pybind_split_inputs is not None
+            and ctx.pybind_split_manifest.get("inputs") == ctx.pybind_split_inputs
+            and all(
+                os.path.exists(os.path.join(ctx.pybind_split_basepath, f)) for f in ctx.pybind_split_manifest["files"]
+            )
+        ):
+            return
+        # the content of each module of split classes, keyed by its path.
+        ctx.pybind_split_files = OrderedDict()
         if not os.path.exists(ctx.pybind_split_basepath):
             os.makedirs(ctx.pybind_split_basepath)
 
@@ -396,6 +507,19 @@ long = int
 
     # Build the identities and typedefs (these are added to the class_map which
     # is globally referenced).
+    ctx.pybind_enumerations = OrderedDict()
+    # The leaf classes that are built when the bindings are imported (see
+    # --static-leaf-classes), which are written after the enumerations that
+    # they may refer to where the classes are not split.
+    ctx.pybind_leaf_classes = []
+    # The types that the classes refer to, see type_reference. Built-in types
+    # are named by their YANG type.
+    ctx.pybind_types = OrderedDict()
+    ctx.pybind_types_used = set()
+    ctx.pybind_type_references = {}
+    ctx.pybind_type_names = {}
+    for name, entry in class_map.items():
+        ctx.pybind_type_names.setdefault(entry["native_type"], name)
     build_identities(ctx, defn["identity"])
     build_typedefs(ctx, defn["typedef"])
 
@@ -436,6 +560,146 @@ long = int
                         path="/%s_notification" % (safe_name(module.arg)),
                     )
 
+    # The enumerations and identities are referred to by name from the
+    # classes, so they are written once after all classes have been built.
+    # Each module of split classes imports them.
+    if not ctx.opts.split_class_dir:
+        if ctx.pybind_enumerations:
+            fd.write(build_enumeration_registry(ctx, "_pyangbind_enumerations"))
+        if ctx.pybind_types_used:
+            fd.write(build_type_table(ctx))
+        if ctx.pybind_leaf_classes:
+            fd.write("\n".join(ctx.pybind_leaf_classes) + "\n")
+    else:
+        ctx.pybind_split_files[os.path.join(ctx.pybind_split_basepath, "_enumerations.py")] = [
+            "# -*- coding: utf-8 -*-\n",
+            "from pyangbind.lib.yangtypes import YANGEnumerationRegistry\n",
+            build_enumeration_registry(ctx, "enumerations"),
+        ]
+        ctx.pybind_split_files[os.path.join(ctx.pybind_split_basepath, "_types.py")] = [
+            ctx.pybind_common_hdr,
+            "from ._enumerations import enumerations as _pyangbind_enumerations\n",
+            build_type_table(ctx),
+            "types = _pyangbind_types\n",
+        ]
+        write_split_files(ctx)
+
+    if ctx.opts.sync_output and not ctx.opts.split_class_dir:
+        try:
+            fd.flush()
+            os.fsync(fd.fileno())
+        except OSError:
+            pass
+
+
+def split_inputs(ctx, modules):
+    # Return what the bindings that are generated depend on: the modules
+    # that pyang was asked to build, the source of the generator and of each
+    # YANG module that pyang loaded, and the options that change the
+    # bindings. None is returned where a module was not read from a file.
+    hashes = {}
+    for (name, revision), module in ctx.modules.items():
+        try:
+            with open(module.pos.ref, "rb") as yfd:
+                hashes["%s@%s" % (name, revision)] = hashlib.sha256(yfd.read()).hexdigest()
+        except (IOError, TypeError):
+            return None
+    generator = hashlib.sha256()
+    helpers = os.path.dirname(misc_help.__file__)
+    sources = [__file__] + sorted(os.path.join(helpers, f) for f in os.listdir(helpers) if f.endswith(".py"))
+    for source in sources:
+        with open(source, "rb") as gfd:
+            generator.update(gfd.read())
+    return {
+        "built": sorted(module.arg for module in modules),
+        "generator": generator.hexdigest(),
+        "pyang": pyang.__version__,
+        "options": dict((o, getattr(ctx.opts, o, None)) for o in OUTPUT_OPTIONS),
+        "modules": hashes,
+    }
+
+
+def read_split_manifest(ctx):
+    # Read the manifest of the bindings that were previously generated into
+    # the split class directory - which is empty where there are none, or
+    # where --force was specified.
+    manifest = {"inputs": None, "files": {}}
+    if ctx.opts.pybind_force:
+        return manifest
+    try:
+        with open(os.path.join(ctx.pybind_split_basepath, SPLIT_MANIFEST), encoding="utf-8") as mfd:
+            manifest.update(json.load(mfd))
+    except (IOError, ValueError):
+        pass
+    return manifest
+
+
+def write_split_files(ctx):
+    # Write each of the modules of split classes, which are built in memory
+    # such that each file is written once - replacing any file that was
+    # generated previously. The content of each module is a list of code and
+    # of the models of the classes that it holds, which are independent of
+    # each other - such that, with --jobs, the classes are rendered and the
+    # modules written by a pool of processes. A module is not written where
+    # its code is that which is recorded in the manifest of the directory,
+    # and modules that are no longer generated are removed.
+    basepath = ctx.pybind_split_basepath
+    previous = dict((os.path.join(basepath, f), h) for f, h in ctx.pybind_split_manifest["files"].items())
+    write = functools.partial(write_split_file, ctx.pybind_render_options, ctx.opts.sync_output, previous)
+    files = [(os.path.normpath(fpath), content) for fpath, content in ctx.pybind_split_files.items()]
+    jobs = ctx.opts.pybind_jobs
+    if jobs is not None and jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs is None or jobs == 1 or len(files) == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        # the workers must be forked, since they refer to this module, which
+        # pyang imports from its plugin directories.
+        hashes = list(map(write, files))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("fork")) as pool:
+            hashes = list(pool.map(write, files, chunksize=max(1, len(files) // (jobs * 4))))
+
+    # The directory of a module that is removed is also removed, where no
+    # other module is within it.
+    for fpath in sorted(set(previous) - set(fpath for fpath, _ in files), reverse=True):
+        try:
+            os.remove(fpath)
+            os.rmdir(os.path.dirname(fpath))
+        except OSError:
+            pass
+
+    manifest = {
+        "inputs": ctx.pybind_split_inputs,
+        "files": dict((os.path.relpath(fpath, basepath), h) for (fpath, _), h in zip(files, hashes)),
+    }
+    try:
+        with open(os.path.join(basepath, SPLIT_MANIFEST), "w", encoding="utf-8") as mfd:
+            json.dump(manifest, mfd, indent=2, sort_keys=True)
+            mfd.write("\n")
+            if ctx.opts.sync_output:
+                mfd.flush()
+                os.fsync(mfd.fileno())
+    except IOError as m:
+        raise IOError("could not write pyangbind output file (%s)" % m)
+
+
+def write_split_file(options, sync, previous, split_file):
+    # Write a module of split classes, unless previous records that the
+    # existing file holds the same code, and return the hash of its code.
+    fpath, content = split_file
+    code = "".join(render_class(options, c) if isinstance(c, dict) else c for c in content)
+    code_hash = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    if previous.get(fpath) == code_hash and os.path.exists(fpath):
+        return code_hash
+    try:
+        with open(fpath, "w", encoding="utf-8") as nfd:
+            nfd.write(code)
+            if sync:
+                nfd.flush()
+                os.fsync(nfd.fileno())
+    except IOError as m:
+        raise IOError("could not write pyangbind output file (%s)" % m)
+    return code_hash
+
 
 def build_identities(ctx, defnd):
     # Build a storage object that has all the definitions that we
@@ -470,13 +734,135 @@ def build_identities(ctx, defnd):
         id_type = {
             "native_type": """RestrictedClassType(base_type=str, """
             + """restriction_type="dict_key", """
-            + """restriction_arg=%s,)""" % identity_dict[i],
+            + """restriction_arg=%s,)""" % enumeration_reference(ctx, "identities", identity_dict[i], name=i),
             "restriction_argument": identity_dict[i],
             "restriction_type": "dict_key",
             "parent_type": "string",
             "base_type": False,
         }
         class_map[i] = id_type
+        ctx.pybind_type_names.setdefault(id_type["native_type"], i)
+
+
+def enumeration_reference(ctx, kind, members, name=None):
+    # Add the members of an enumeration (or the identities derived from an
+    # identity, where kind is "identities") to the registry that is written
+    # with the classes, and return the code that refers to them. An
+    # enumeration that has the same members as one that is already in the
+    # registry is an alias of it. Enumerations are numbered in the order that
+    # they are found, since they need not be defined by a typedef - the "#"
+    # cannot be used in the name of an identity.
+    for existing_name, existing in ctx.pybind_enumerations.items():
+        if existing["kind"] == kind and existing["alias"] is None and existing["members"] == members:
+            alias = existing_name
+            break
+    else:
+        alias = None
+    if name is None:
+        if alias is not None:
+            name = alias
+        else:
+            name = "enumeration#%d" % len([e for e in ctx.pybind_enumerations.values() if e["kind"] == kind])
+    if name not in ctx.pybind_enumerations:
+        ctx.pybind_enumerations[name] = {"kind": kind, "members": members, "alias": alias}
+    return "_pyangbind_enumerations[%s]" % repr(name)
+
+
+def build_enumeration_registry(ctx, variable):
+    # Return the code that defines the registry of the enumerations and
+    # identities that the classes refer to.
+    modules = []
+    identities = OrderedDict()
+    enumerations = OrderedDict()
+    aliases = OrderedDict()
+    for name, enumeration in ctx.pybind_enumerations.items():
+        if enumeration["alias"] is not None:
+            aliases[name] = enumeration["alias"]
+        elif enumeration["kind"] == "identities":
+            identities[name] = OrderedDict()
+            for member, d in enumeration["members"].items():
+                module = (d["@module"], d["@namespace"])
+                if module not in modules:
+                    modules.append(module)
+                identities[name][member] = modules.index(module)
+        else:
+            enumerations[name] = enumeration["members"]
+
+    code = "\n%s = YANGEnumerationRegistry(\n" % variable
+    if identities:
+        code += "  modules=[\n"
+        for module in modules:
+            code += "    %s,\n" % repr(module)
+        code += "  ],\n"
+        code += "  identities={\n"
+        for name, members in identities.items():
+            code += "    %s: %s,\n" % (repr(name), repr(dict(members)))
+        code += "  },\n"
+    if enumerations:
+        code += "  enumerations={\n"
+        for name, members in enumerations.items():
+            code += "    %s: %s,\n" % (repr(name), repr(members))
+        code += "  },\n"
+    if aliases:
+        code += "  aliases=%s,\n" % repr(dict(aliases))
+    code += ")\n"
+    return code
+
+
+# The references to the table of types in generated code, see type_reference.
+TYPE_REFERENCE = re.compile(r"_pyangbind_types\['([^']*)'\]")
+
+
+def type_reference(ctx, native_type, name=None):
+    # Add the type that is built by the code native_type to the table of types
+    # that is written with the classes, and return the code that refers to it,
+    # such that each type is built once when the bindings are imported rather
+    # than wherever it is used. A type that is already in the table is
+    # referred to by its existing entry. Types are named by the typedef,
+    # identity or built-in type that they were first found for, otherwise they
+    # are numbered in the order that they are found. Types that are a single
+    # name, or that refer to the instance that uses them, are not added.
+    if not native_type.endswith((")", "]")) or "self." in native_type or TYPE_REFERENCE.fullmatch(native_type):
+        return native_type
+    reference = ctx.pybind_type_references.get(native_type)
+    if reference is None:
+        name = name or ctx.pybind_type_names.get(native_type)
+        if name is None or name in ctx.pybind_types or "'" in name:
+            name = "type#%d" % len(ctx.pybind_types)
+        ctx.pybind_types[name] = native_type
+        reference = ctx.pybind_type_references[native_type] = "_pyangbind_types['%s']" % name
+    return reference
+
+
+def use_types(ctx, code):
+    # Record the types in the table that the generated code refers to - only
+    # these, and the types that they refer to, are written.
+    ctx.pybind_types_used.update(TYPE_REFERENCE.findall(code))
+
+
+def union_reference(ctx, native_types):
+    # Return the code for the list of the member types of a union, which
+    # refers to the types in the table.
+    return "[%s]" % "".join("%s," % type_reference(ctx, t) for t in native_types)
+
+
+def build_type_table(ctx):
+    # Return the code that defines the table of the types that the classes
+    # refer to. A type is added to the table after the types that it refers
+    # to, hence they are written in that order.
+    used = set()
+    to_visit = list(ctx.pybind_types_used)
+    while to_visit:
+        name = to_visit.pop()
+        if name not in used:
+            used.add(name)
+            to_visit.extend(TYPE_REFERENCE.findall(ctx.pybind_types[name]))
+
+    code = "\n_pyangbind_types = {}\n"
+    for name, native_type in ctx.pybind_types.items():
+        if name in used:
+            code += "_pyangbind_types['%s'] = %s\n" % (name, native_type)
+    return code
 
 
 def build_typedefs(ctx, defnd):
@@ -566,7 +952,7 @@ def build_typedefs(ctx, defnd):
         type_name = i_tuple[0]
         # Copy the class_map entry - this is done so that we do not alter the
         # existing instance in memory as we add to it.
-        cls, elemtype = copy.deepcopy(build_elemtype(ctx, item.search_one("type")))
+        cls, elemtype = copy.deepcopy(build_elemtype(ctx, item.search_one("type"), name=type_name))
         known_types = list(class_map.keys())
         # Enumeration is a native type, but is not natively supported
         # in the class_map, and hence we append it here.
@@ -643,6 +1029,11 @@ def build_typedefs(ctx, defnd):
                 class_map[type_name]["quote_default"] = default[1]
 
         class_map[type_name.split(":")[1]] = class_map[type_name]
+        # the type is named by the first typedef that it is found for.
+        native_type = class_map[type_name]["native_type"]
+        if isinstance(native_type, list):
+            native_type = union_reference(ctx, native_type)
+        ctx.pybind_type_names.setdefault(native_type, type_name)
 
 
 def get_children_elements(
@@ -735,17 +1126,16 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
             if not os.path.exists(bpath):
                 os.makedirs(bpath)
             fpath = bpath + "/__init__.py"
-        if not os.path.exists(fpath):
-            try:
-                nfd = open(fpath, "w", encoding="utf-8")
-            except IOError as m:
-                raise IOError("could not open pyangbind output file (%s)" % m)
-            nfd.write(ctx.pybind_common_hdr)
-        else:
-            try:
-                nfd = open(fpath, "a", encoding="utf-8")
-            except IOError as w:
-                raise IOError("could not open pyangbind output file (%s)" % w)
+        nfd = ctx.pybind_split_files.get(fpath)
+        if nfd is None:
+            # the registry of enumerations is a module of the top-level
+            # package, which is len(pparts) levels above this one.
+            depth = len(path.split("/")) if path else 1
+            nfd = ctx.pybind_split_files[fpath] = [
+                ctx.pybind_common_hdr,
+                "from %s_enumerations import enumerations as _pyangbind_enumerations\n" % ("." * depth),
+                "from %s_types import types as _pyangbind_types\n" % ("." * depth),
+            ]
     else:
         # If we weren't asked to split the files, then just use the file handle
         # provided.
@@ -790,21 +1180,19 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
                 if im == parent.arg:
                     im += "_"
                 # Relative import in PY2/PY3 compatible style
-                nfd.write("from . import {}\n".format(safe_name(im)))
+                nfd.append("from . import {}\n".format(safe_name(im)))
 
     # 'container', 'module', 'list' and 'submodule' all have their own classes
     # generated.
     if parent.keyword in ["container", "module", "list", "submodule", "input", "output", "rpc", "notification"]:
-        if ctx.opts.split_class_dir:
-            nfd.write("class %s(PybindBase):\n" % safe_name(parent.arg))
+        if ctx.opts.split_class_dir or path == "":
+            class_name = safe_name(parent.arg)
         else:
-            if not path == "":
-                nfd.write(
-                    "class yc_%s_%s_%s(PybindBase):\n"
-                    % (safe_name(parent.arg), safe_name(module.arg), safe_name(path.replace("/", "_")))
-                )
-            else:
-                nfd.write("class %s(PybindBase):\n" % safe_name(parent.arg))
+            class_name = "yc_%s_%s_%s" % (
+                safe_name(parent.arg),
+                safe_name(module.arg),
+                safe_name(path.replace("/", "_")),
+            )
 
         # If the container is actually a list, then determine what the key value
         # is and store this such that we can give a hint.
@@ -824,52 +1212,24 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
             parent_descr = "\n\n  YANG Description: %s" % parent_descr.arg
         else:
             parent_descr = ""
-
-        # Add more helper text.
-        nfd.write(
-            '''  """
-  This class was auto-generated by the PythonClass plugin for PYANG
-  from YANG module %s - based on the path %s. Each member element of
-  the container is represented as a class variable - with a specific
-  YANG type.%s
-  """\n'''
-            % (module.arg, (path if not path == "" else "/%s" % parent.arg), parent_descr)
-        )
     else:
         raise TypeError("unhandled keyword with children %s at %s" % (parent.keyword, parent.pos))
 
-    elements_str = ""
-    if len(elements) == 0:
-        nfd.write("  _pyangbind_elements = {}")
-    else:
-        # We want to prevent a user from creating new attributes on a class that
-        # are not allowed within the data model - this uses the __slots__ magic
-        # variable of the class to restrict anyone from adding to these classes.
-        # Doing so gives an AttributeError when a user tries to specify something
-        # that was not in the model.
-        elements_str = "_pyangbind_elements = OrderedDict(["
-        slots_str = "  __slots__ = ('_path_helper',"
-        slots_str += " '_extmethods', "
-        for i in elements:
-            slots_str += "'__%s'," % i["name"]
-            elements_str += "('%s', %s), " % (i["name"], i["name"])
-        slots_str += ")\n"
-        elements_str += "])\n"
-        nfd.write(slots_str + "\n")
-        # Store the real name of the element - since we often get values that are
-        # not allowed in python as identifiers, but we need the real-name when
-        # creating instance documents (e.g., peer-group is not valid due to '-').
-        nfd.write("  _yang_name = '%s'\n" % (parent.arg))
-
+    # The classes that are referred to by each element, and the types that
+    # they use, are resolved against the pyang context before the class is
+    # rendered.
+    leaf_classes = []
+    classes = {}
+    namespace = None
+    if len(elements):
         # Store the namespace URI for easier access during XML serialisation
         if module.keyword == "submodule":
             mod_location = next(v for k, v in ctx.modules.items() if k[0] == module.i_modulename)
         else:
             mod_location = module
-        nfd.write("  _yang_namespace = '%s'\n" % (mod_location.search("namespace")[0].arg))
+        namespace = mod_location.search("namespace")[0].arg
 
         choices = {}
-        choice_attrs = []
         classes = {}
         for i in elements:
             # Loop through the elements and build a string that corresponds to the
@@ -890,30 +1250,25 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
                 class_str["type"] = "YANGDynClass"
                 class_str["arg"] = "unique=True, base="
                 if isinstance(i["type"]["native_type"][1], list):
-                    allowed_type = "["
-                    for subtype in i["type"]["native_type"][1]:
-                        allowed_type += "%s," % subtype
-                    allowed_type += "]"
+                    allowed_type = union_reference(ctx, i["type"]["native_type"][1])
                 else:
-                    allowed_type = "%s" % (i["type"]["native_type"][1])
-                class_str["arg"] += "%s(allowed_type=%s)" % (i["type"]["native_type"][0], allowed_type)
+                    allowed_type = type_reference(ctx, "%s" % (i["type"]["native_type"][1]))
+                class_str["arg"] += type_reference(
+                    ctx, "%s(allowed_type=%s)" % (i["type"]["native_type"][0], allowed_type)
+                )
                 if "default" in i and not i["default"] is None:
-                    class_str["arg"] += ", default=%s(%s)" % (i["defaulttype"], default_arg)
+                    class_str["arg"] += ", default=%s(%s)" % (type_reference(ctx, i["defaulttype"]), default_arg)
             elif i["class"] == "list":
                 # Map a list to YANGList class - this is dynamically derived by the
                 # YANGListType function to have the relevant characteristics, such as
-                # whether it is ordered by the user.
+                # whether it is ordered by the user. The parent, path helper and
+                # extensions of the list are those that YANGDynClass is called with.
                 class_str["name"] = "__%s" % (i["name"])
                 class_str["type"] = "YANGDynClass"
                 class_str["arg"] = "base=YANGListType("
                 class_str["arg"] += "%s,%s" % ('"%s"' % i["key"] if i["key"] else False, i["type"])
-                class_str["arg"] += ', yang_name="%s", parent=self' % (i["yang_name"])
                 class_str["arg"] += ", is_container='list', user_ordered=%s" % i["user_ordered"]
-                class_str["arg"] += ", path_helper=self._path_helper"
                 class_str["arg"] += ", yang_keys='%s'" % i["yang_keys"]
-                class_str["arg"] += ", extensions=%s" % i["extensions"]
-                if i["choice"]:
-                    class_str["arg"] += ", choice=%s" % repr(choice)
                 class_str["arg"] += ")"
             elif i["class"] == "union" or i["class"] == "leaf-union":
                 # A special mapped type where there is a union that just includes
@@ -922,53 +1277,57 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
                 # the input can be mapped to the types included in the union.
                 class_str["name"] = "__%s" % (i["name"])
                 class_str["type"] = "YANGDynClass"
-                class_str["arg"] = "base=["
+                union = []
                 for u in i["type"][1]:
                     if isinstance(u[1]["native_type"], list):
-                        for su_native_type in u[1]["native_type"]:
-                            class_str["arg"] += "%s," % su_native_type
+                        union.extend(u[1]["native_type"])
                     else:
-                        class_str["arg"] += "%s," % u[1]["native_type"]
-                class_str["arg"] += "]"
+                        union.append(u[1]["native_type"])
+                class_str["arg"] = "base=%s" % type_reference(ctx, union_reference(ctx, union))
                 if "default" in i and not i["default"] is None:
-                    class_str["arg"] += ", default=%s(%s)" % (i["defaulttype"], default_arg)
+                    class_str["arg"] += ", default=%s(%s)" % (type_reference(ctx, i["defaulttype"]), default_arg)
             elif i["class"] == "leafref":
                 # A leafref, pyangbind uses the special ReferenceType which performs a
-                # lookup against the path_helper class provided.
+                # lookup against the path_helper of the leaf, relative to its path.
                 class_str["name"] = "__%s" % (i["name"])
                 class_str["type"] = "YANGDynClass"
-                class_str["arg"] = "base=%s" % i["type"]
-                class_str["arg"] += "(referenced_path='%s'" % i["referenced_path"]
-                class_str["arg"] += ", caller=self._path() + ['%s'], " % (i["yang_name"])
-                class_str["arg"] += "path_helper=self._path_helper, "
-                class_str["arg"] += "require_instance=%s)" % (i["require_instance"])
+                class_str["arg"] = "base=%s" % type_reference(
+                    ctx,
+                    "%s(referenced_path='%s', require_instance=%s)"
+                    % (i["type"], i["referenced_path"], i["require_instance"]),
+                )
             elif i["class"] == "leafref-list":
-                # Deal with the special case of a list of leafrefs, since the
-                # ReferenceType has different arguments that need to be provided to the
-                # class to properly initialise.
+                # Deal with the special case of a list of leafrefs, whose members
+                # are ReferenceTypes that are created with the path helper and path
+                # of the leaf-list.
                 class_str["name"] = "__%s" % (i["name"])
                 class_str["type"] = "YANGDynClass"
-                class_str["arg"] = "base=%s" % i["type"]["native_type"][0]
-                class_str["arg"] += "(allowed_type=%s(referenced_path='%s'," % (
-                    i["type"]["native_type"][1]["native_type"],
-                    i["type"]["native_type"][1]["referenced_path"],
+                class_str["arg"] = "base=%s" % type_reference(
+                    ctx,
+                    "%s(allowed_type=%s)"
+                    % (
+                        i["type"]["native_type"][0],
+                        type_reference(
+                            ctx,
+                            "%s(referenced_path='%s', require_instance=%s)"
+                            % (
+                                i["type"]["native_type"][1]["native_type"],
+                                i["type"]["native_type"][1]["referenced_path"],
+                                i["type"]["native_type"][1]["require_instance"],
+                            ),
+                        ),
+                    ),
                 )
-                class_str["arg"] += "caller=self._path() + ['%s'], " % i["yang_name"]
-                class_str["arg"] += "path_helper=self._path_helper, "
-                class_str["arg"] += "require_instance=%s))" % (i["type"]["native_type"][1]["require_instance"])
             else:
                 # Generically handle all other classes with the 'standard' mappings.
                 class_str["name"] = "__%s" % (i["name"])
                 class_str["type"] = "YANGDynClass"
                 if isinstance(i["type"], list):
-                    class_str["arg"] = "base=["
-                    for u in i["type"]:
-                        class_str["arg"] += "%s," % u
-                    class_str["arg"] += "]"
+                    class_str["arg"] = "base=%s" % type_reference(ctx, union_reference(ctx, i["type"]))
                 else:
-                    class_str["arg"] = "base=%s" % i["type"]
+                    class_str["arg"] = "base=%s" % type_reference(ctx, i["type"])
                 if "default" in i and not i["default"] is None:
-                    class_str["arg"] += ", default=%s(%s)" % (i["defaulttype"], default_arg)
+                    class_str["arg"] += ", default=%s(%s)" % (type_reference(ctx, i["defaulttype"]), default_arg)
             if i["class"] == "container":
                 class_str["arg"] += ", is_container='container'"
                 if ctx.opts.generate_presence:
@@ -980,11 +1339,13 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
             else:
                 class_str["arg"] += ", is_leaf=True"
             if class_str["arg"]:
-                class_str["arg"] += ', yang_name="%s"' % i["yang_name"]
-                class_str["arg"] += ", parent=self"
+                # the arguments that are the same for each instance of the
+                # element, and those that are specific to the instance.
+                static_arg = class_str["arg"] + ', yang_name="%s"' % i["yang_name"]
+                class_str["arg"] = static_arg + ", parent=self"
                 if i["choice"]:
+                    static_arg += ", choice=%s" % repr(i["choice"])
                     class_str["arg"] += ", choice=%s" % repr(i["choice"])
-                    choice_attrs.append(i["name"])
                     if not i["choice"][0] in choices:
                         choices[i["choice"][0]] = {}
                     if not i["choice"][1] in choices[i["choice"][0]]:
@@ -992,16 +1353,113 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
                     choices[i["choice"][0]][i["choice"][1]].append(i["name"])
                 class_str["arg"] += ", path_helper=self._path_helper"
                 class_str["arg"] += ", extmethods=self._extmethods"
-                class_str["arg"] += ", register_paths=%s" % i["register_paths"]
+                tail = len(static_arg)
+                static_arg += ", register_paths=%s" % i["register_paths"]
                 if "extensions" in i:
-                    class_str["arg"] += ", extensions=%s" % i["extensions"]
+                    static_arg += ", extensions=%s" % i["extensions"]
                 if keyval and i["yang_name"] in keyval:
-                    class_str["arg"] += ", is_keyval=True"
-                class_str["arg"] += ", namespace='%s'" % i["namespace"]
-                class_str["arg"] += ", defining_module='%s'" % i["defining_module"]
-                class_str["arg"] += ", yang_type='%s'" % i["origtype"]
-                class_str["arg"] += ", is_config=%s" % (i["config"] and parent_cfg)
+                    static_arg += ", is_keyval=True"
+                static_arg += ", namespace='%s'" % i["namespace"]
+                static_arg += ", defining_module='%s'" % i["defining_module"]
+                static_arg += ", yang_type='%s'" % i["origtype"]
+                static_arg += ", is_config=%s" % (i["config"] and parent_cfg)
+                class_str["arg"] += static_arg[tail:]
+                # Leaves whose base type does not refer to the instance are
+                # built once, when the bindings are imported - such that they
+                # are created by calling the prebuilt class.
+                class_str["init"] = class_str["set"] = None
+                if (
+                    ctx.opts.static_leaf_classes
+                    and i["class"] not in ["container", "list"]
+                    and "self." not in static_arg
+                ):
+                    leaf_class = "_pyangbind_leaf_%s_%s" % (class_name, i["name"])
+                    leaf_classes.append("%s = YANGLeafClass(%s)" % (leaf_class, static_arg))
+                    instance_arg = "parent=self, path_helper=self._path_helper, extmethods=self._extmethods"
+                    class_str["init"] = "%s(%s)" % (leaf_class, instance_arg)
+                    class_str["set"] = "%s(v, %s)" % (leaf_class, instance_arg)
                 classes[i["name"]] = class_str
+                use_types(ctx, class_str["arg"])
+
+    # The class is rendered from a model that no longer refers to the pyang
+    # context, such that the modules of split classes can be rendered in
+    # parallel once the tree has been walked (see write_split_files).
+    model = {
+        "class_name": class_name,
+        "module": module.arg,
+        "path": path,
+        "yang_name": parent.arg,
+        "description": parent_descr,
+        "is_module": parent.keyword in ["module", "submodule"],
+        "namespace": namespace,
+        "elements": [dict((k, i[k]) for k in RENDERED_ELEMENT_KEYS) for i in elements],
+        "classes": classes,
+        "choices": choices,
+        "keyval": keyval,
+        "parent_cfg": parent_cfg,
+    }
+    if ctx.opts.split_class_dir:
+        nfd.append(model)
+        if leaf_classes:
+            nfd.append("\n".join(leaf_classes) + "\n\n")
+    else:
+        fd.write(render_class(ctx.pybind_render_options, model))
+        ctx.pybind_leaf_classes.extend(leaf_classes)
+
+    return None
+
+
+def render_class(options, model):
+    # Render the code of a class from the model that get_children built for
+    # it. options holds the generator options that affect the code of the
+    # class (see build_pybind).
+    nfd = io.StringIO()
+    class_name, path, elements = model["class_name"], model["path"], model["elements"]
+    classes, choices, keyval, parent_cfg = model["classes"], model["choices"], model["keyval"], model["parent_cfg"]
+
+    nfd.write("class %s(PybindBase):\n" % class_name)
+    nfd.write(
+        '''  """
+  This class was auto-generated by the PythonClass plugin for PYANG
+  from YANG module %s - based on the path %s. Each member element of
+  the container is represented as a class variable - with a specific
+  YANG type.%s
+  """\n'''
+        % (model["module"], (path if not path == "" else "/%s" % model["yang_name"]), model["description"])
+    )
+
+    elements_str = ""
+    if len(elements) == 0:
+        nfd.write("  _pyangbind_elements = {}")
+    else:
+        # We want to prevent a user from creating new attributes on a class that
+        # are not allowed within the data model - this uses the __slots__ magic
+        # variable of the class to restrict anyone from adding to these classes.
+        # Doing so gives an AttributeError when a user tries to specify something
+        # that was not in the model.
+        elements_str = "_pyangbind_elements = OrderedDict(["
+        slots_str = "  __slots__ = ('_path_helper',"
+        slots_str += " '_extmethods', "
+        # a fork of the container refers to the container that it shares its
+        # elements with, which refers to the forks that share them.
+        slots_str += "'__weakref__', '_pyangbind_source', '_pyangbind_forks', "
+        if model["is_module"]:
+            # the class for a module holds the state of changes to the tree
+            # below it, which is otherwise held by its parent.
+            slots_str += "'_change_tracker', "
+        for i in elements:
+            slots_str += "'__%s'," % i["name"]
+            elements_str += "('%s', %s), " % (i["name"], i["name"])
+        slots_str += ")\n"
+        elements_str += "])\n"
+        nfd.write(slots_str + "\n")
+        # Store the real name of the element - since we often get values that are
+        # not allowed in python as identifiers, but we need the real-name when
+        # creating instance documents (e.g., peer-group is not valid due to '-').
+        nfd.write("  _yang_name = '%s'\n" % model["yang_name"])
+
+        # Store the namespace URI for easier access during XML serialisation
+        nfd.write("  _yang_namespace = '%s'\n" % model["namespace"])
 
         # TODO: get and set methods currently have errors that are reported that
         # are a bit ugly. The intention here is to act like an immutable type -
@@ -1015,7 +1473,7 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
 
   def __init__(self, *args, **kwargs):\n"""
         )
-        if ctx.opts.use_xpathhelper:
+        if options["use_xpathhelper"]:
             nfd.write(
                 """
     helper = kwargs.pop("path_helper", None)
@@ -1035,7 +1493,7 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
     self._path_helper = False\n"""
             )
 
-        if ctx.opts.use_extmethods:
+        if options["use_extmethods"]:
             nfd.write(
                 """
     extmethods = kwargs.pop("extmethods", None)
@@ -1055,10 +1513,26 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
     self._extmethods = False\n"""
             )
 
+        if model["is_module"] and len(elements):
+            nfd.write(
+                """
+    self._change_tracker = YANGChangeTracker()\n"""
+            )
+
         # Write out the classes that are stored locally as self.__foo where
-        # foo is the safe YANG name.
-        for c in classes:
-            nfd.write("    self.%s = %s(%s)\n" % (classes[c]["name"], classes[c]["type"], classes[c]["arg"]))
+        # foo is the safe YANG name. When the children are created lazily, they
+        # are only created here if there is a path helper, since each element
+        # must be registered with it to be found by an XPATH lookup.
+        if options["lazy_children"]:
+            nfd.write(
+                """
+    if self._path_helper:
+      for e in self._pyangbind_elements:
+        getattr(self, "_get_%s" % e)()\n"""
+            )
+        else:
+            for c in classes:
+                nfd.write("    self.%s = %s\n" % (classes[c]["name"], class_call(classes[c], "init")))
         # Don't accept arguments to a container/list/submodule class
         nfd.write(
             """
@@ -1096,6 +1570,20 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
             % path.split("/")[1:]
         )
 
+        # Where children are created lazily, allow the serialisers to determine
+        # whether an element has been created, such that elements that have not
+        # been are skipped rather than created when filtering the output.
+        if options["lazy_children"]:
+            nfd.write(
+                """
+  def _pyangbind_materialised(self, element_name):
+    if hasattr(self, "_%s__" + element_name):
+      return True
+    source = getattr(self, "_pyangbind_source", None)
+    return source is not None and source._pyangbind_materialised(element_name)\n"""
+                % class_name.lstrip("_")
+            )
+
         # For each element, write out a getter and setter method - with the doc
         # string of the element within the model.
         for i in elements:
@@ -1108,10 +1596,21 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
   def _get_%s(self):
     """
     Getter method for %s, mapped from YANG variable %s (%s)%s
-    """
-    return self.__%s
-      '''
-                % (i["name"], i["name"], i["path"], i["origtype"], description_str, i["name"])
+    """'''
+                % (i["name"], i["name"], i["path"], i["origtype"], description_str)
+            )
+            # The element may not have been created where children are
+            # created lazily, or where the container is a fork that still
+            # shares its elements.
+            nfd.write(
+                """
+    try:
+      return self.__%s
+    except AttributeError:
+      self._pyangbind_materialise("%s")
+      return self.__%s
+      """
+                % (i["name"], i["name"], i["name"])
             )
 
             nfd.write(
@@ -1142,8 +1641,8 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
             nfd.write(
                 """
     try:
-      t = %s(v,%s)"""
-                % (c_str["type"], c_str["arg"])
+      t = %s"""
+                % class_call(c_str, "set")
             )
             nfd.write(
                 """
@@ -1167,6 +1666,7 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
                     c_str["arg"],
                 )
             )
+            nfd.write("    self._pyangbind_unshare()\n")
             nfd.write("    self.__%s = t\n" % (i["name"]))
             nfd.write("    if hasattr(self, '_set'):\n")
             nfd.write("      self._set()\n")
@@ -1178,8 +1678,10 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
             nfd.write(
                 """
   def _unset_%s(self):
-    self.__%s = %s(%s)\n\n"""
-                % (i["name"], i["name"], c_str["type"], c_str["arg"])
+    self._pyangbind_unshare()
+    self._journal_unset("%s")
+    self.__%s = %s\n\n"""
+                % (i["name"], i["name"], i["name"], class_call(c_str, "init"))
             )
 
         # When an element is read-only, write out the _set and _get methods, but
@@ -1206,22 +1708,23 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
     nfd.write("""\n  %s\n""" % elements_str)
     nfd.write("\n")
 
-    try:
-        nfd.flush()
-        os.fsync(nfd.fileno())
-    except OSError:
-        pass
+    return nfd.getvalue()
 
-    if ctx.opts.split_class_dir:
-        nfd.close()
 
-    return None
+def class_call(class_str, method):
+    # Return the expression that creates an instance of an element, in the
+    # initialiser ("init") or setter ("set") of its container.
+    if class_str.get(method):
+        return class_str[method]
+    if method == "set":
+        return "%s(v,%s)" % (class_str["type"], class_str["arg"])
+    return "%s(%s)" % (class_str["type"], class_str["arg"])
 
 
-def build_elemtype(ctx, et, prefix=False):
+def build_elemtype(ctx, et, prefix=False, name=None):
     # Build a dictionary which defines the type for the element. This is used
-    # both in the case that a typedef needs to be built, as well as on per-list
-    # basis.
+    # both in the case that a typedef needs to be built (where name is the
+    # name of the typedef), as well as on per-list basis.
     cls = None
     pattern_stmt = et.search_one("pattern") if not et.search_one("pattern") is None else False
     range_stmt = et.search_one("range") if not et.search_one("range") is None else False
@@ -1250,11 +1753,19 @@ def build_elemtype(ctx, et, prefix=False):
     # Build RestrictedClassTypes based on the compiled dictionary and the
     # underlying base type.
     if len(restrictions):
+        base_native_type = class_map[et.arg]["native_type"]
+        if et.arg == "decimal64" and ctx.opts.fixed_point_decimal64 and et.search_one("fraction-digits") is not None:
+            base_native_type = "YANGDecimal64Type(fraction_digits=%s)" % et.search_one("fraction-digits").arg
+        base_native_type = type_reference(ctx, base_native_type)
         if "length" in restrictions or "pattern" in restrictions:
             cls = "restricted-%s" % (et.arg)
             elemtype = {
-                "native_type": """RestrictedClassType(base_type=%s, restriction_dict=%s)"""
-                % (class_map[et.arg]["native_type"], repr(restrictions)),
+                "native_type": type_reference(
+                    ctx,
+                    """RestrictedClassType(base_type=%s, restriction_dict=%s)"""
+                    % (base_native_type, repr(restrictions)),
+                    name,
+                ),
                 "restriction_dict": restrictions,
                 "parent_type": et.arg,
                 "base_type": False,
@@ -1262,8 +1773,12 @@ def build_elemtype(ctx, et, prefix=False):
         elif "range" in restrictions:
             cls = "restricted-%s" % et.arg
             elemtype = {
-                "native_type": """RestrictedClassType(base_type=%s, restriction_dict=%s)"""
-                % (class_map[et.arg]["native_type"], repr(restrictions)),
+                "native_type": type_reference(
+                    ctx,
+                    """RestrictedClassType(base_type=%s, restriction_dict=%s)"""
+                    % (base_native_type, repr(restrictions)),
+                    name,
+                ),
                 "restriction_dict": restrictions,
                 "parent_type": et.arg,
                 "base_type": False,
@@ -1282,10 +1797,12 @@ def build_elemtype(ctx, et, prefix=False):
                 if val is not None:
                     enumeration_dict[str(enum.arg)]["value"] = int(val.arg)
             elemtype = {
-                "native_type": """RestrictedClassType(base_type=str, \
-                                    restriction_type="dict_key", \
-                                    restriction_arg=%s,)"""
-                % (enumeration_dict),
+                "native_type": type_reference(
+                    ctx,
+                    """RestrictedClassType(base_type=str, restriction_type="dict_key", restriction_arg=%s,)"""
+                    % enumeration_reference(ctx, "enumerations", enumeration_dict),
+                    name,
+                ),
                 "restriction_argument": enumeration_dict,
                 "restriction_type": "dict_key",
                 "parent_type": "string",
@@ -1298,8 +1815,14 @@ def build_elemtype(ctx, et, prefix=False):
             fd_stmt = et.search_one("fraction-digits")
             if fd_stmt is not None:
                 cls = "restricted-decimal64"
+                if ctx.opts.fixed_point_decimal64:
+                    # decimal64 values are stored as integers scaled by
+                    # 10^fraction-digits.
+                    native_type = "YANGDecimal64Type(fraction_digits=%s)" % fd_stmt.arg
+                else:
+                    native_type = "RestrictedPrecisionDecimalType(precision=%s)" % fd_stmt.arg
                 elemtype = {
-                    "native_type": """RestrictedPrecisionDecimalType(precision=%s)""" % fd_stmt.arg,
+                    "native_type": type_reference(ctx, native_type, name),
                     "base_type": False,
                     "parent_type": "decimal64",
                 }
@@ -1365,7 +1888,7 @@ def build_elemtype(ctx, et, prefix=False):
                 allowed_bits[bit.arg] = pos
             cls = "restricted-bits"
             elemtype = {
-                "native_type": f"YANGBitsType(allowed_bits={allowed_bits})",
+                "native_type": type_reference(ctx, f"YANGBitsType(allowed_bits={allowed_bits})", name),
                 "base_type": True,
                 "parent_type": "bits",
                 "quote_arg": True,
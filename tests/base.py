@@ -49,24 +49,16 @@ class PyangBindTestCase(unittest.TestCase):
                         )
 
     @classmethod
-    def setUpClass(cls):
-        cls._test_path = os.path.dirname(inspect.getfile(cls))
-
-        if cls.remote_yang_files is not None:
-            cls._fetch_remote_yang_files()
-
-        if cls.yang_files is None:
-            raise ValueError("cls.yang_files must be set")
+    def run_pyang(cls, extra_flags=None, yang_files=None):
         pyang_path = distutils.spawn.find_executable("pyang")
         if not pyang_path:
             raise RuntimeError("Could not locate `pyang` executable.")
         base_dir = os.path.dirname(os.path.dirname(__file__))
-        yang_files = [os.path.join(cls._test_path, filename) for filename in cls.yang_files]
+        yang_files = [os.path.join(cls._test_path, filename) for filename in yang_files or cls.yang_files]
         plugin_dir = os.path.join(base_dir, "pyangbind", "plugin")
 
-        flags = cls.pyang_flags or []
+        flags = list(cls.pyang_flags or []) + list(extra_flags or [])
         if cls.split_class_dir is True:
-            cls._pyang_generated_class_dir = os.path.join(cls._test_path, cls.module_name)
             flags.append("--split-class-dir {}".format(cls._pyang_generated_class_dir))
 
         pyang_cmd = "{pyang} --plugindir {plugins} -f pybind -p {test_path} {flags} {yang_files}".format(
@@ -76,9 +68,20 @@ class PyangBindTestCase(unittest.TestCase):
             flags=" ".join(flags),
             yang_files=" ".join(yang_files),
         )
-        bindings_code = subprocess.check_output(
-            pyang_cmd, shell=True, stderr=subprocess.STDOUT, env={"PYTHONPATH": base_dir}
-        )
+        return subprocess.check_output(pyang_cmd, shell=True, stderr=subprocess.STDOUT, env={"PYTHONPATH": base_dir})
+
+    @classmethod
+    def setUpClass(cls):
+        cls._test_path = os.path.dirname(inspect.getfile(cls))
+
+        if cls.remote_yang_files is not None:
+            cls._fetch_remote_yang_files()
+
+        if cls.yang_files is None:
+            raise ValueError("cls.yang_files must be set")
+        if cls.split_class_dir is True:
+            cls._pyang_generated_class_dir = os.path.join(cls._test_path, cls.module_name)
+        bindings_code = cls.run_pyang()
         if not cls.split_class_dir:
             module = types.ModuleType(cls.module_name)
             exec(bindings_code, module.__dict__)
@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 
 import unittest
 
+from pyangbind.lib.yangtypes import YANGBitsType
 from tests.base import PyangBindTestCase
 
 
@@ -59,6 +60,70 @@ class BitsTests(PyangBindTestCase):
     def test_bits_no_position(self):
         self.assertEqual(self.instance.bits3._allowed_bits["position0"], 0)
 
+    def test_bits_types_are_shared(self):
+        self.assertIs(YANGBitsType({"foo": 0, "bar": 1}), YANGBitsType({"foo": 0, "bar": 1}))
+        self.assertIsNot(YANGBitsType({"foo": 0, "bar": 1}), YANGBitsType({"foo": 1, "bar": 0}))
+
+    def test_bits_are_ordered_by_numeric_position(self):
+        bits = YANGBitsType({"ten": "10", "two": "2"})("ten two")
+        self.assertEqual(str(bits), "two ten")
+        self.assertEqual(list(bits), ["two", "ten"])
+
+    def test_bits_equality(self):
+        self.instance.bits2.add("foo")
+        other = self.bindings.bits()
+        other.bits2.add("foo")
+        self.assertEqual(self.instance.bits2, other.bits2)
+        self.assertEqual(self.instance.bits2, {"foo"})
+        self.assertEqual({"foo"}, self.instance.bits2)
+        other.bits2.add("bar")
+        self.assertNotEqual(self.instance.bits2, other.bits2)
+
+    def test_set_operations(self):
+        self.instance.bits2.update(["foo", "baz"])
+        self.assertTrue(self.instance.bits2._changed())
+        self.assertEqual(self.instance.bits2 | {"bar"}, {"foo", "bar", "baz"})
+        self.assertEqual(self.instance.bits2.union({"bar"}), {"foo", "bar", "baz"})
+        self.assertEqual(self.instance.bits2 & {"foo", "bar"}, {"foo"})
+        self.assertTrue(self.instance.bits2.issubset({"foo", "bar", "baz"}))
+        with self.assertRaises(ValueError):
+            self.instance.bits2.update(["unknownflag"])
+        self.assertEqual(self.instance.bits2.pop(), "foo")
+        with self.assertRaises(KeyError):
+            self.instance.bits2.remove("foo")
+        self.instance.bits2.remove("baz")
+        self.assertEqual(len(self.instance.bits2), 0)
+        self.assertEqual(str(self.instance.bits2), "")
+
+    def test_adding_bit_definition_keeps_value(self):
+        bits_type = YANGBitsType({"b": 5, "c": 7})
+        value, other = bits_type("c"), bits_type("b")
+        value._add_bit_definition("a", 1)
+        self.assertEqual(str(value), "c")
+        self.assertEqual(str(other), "b")
+        value.add("a")
+        self.assertEqual(str(value), "a c")
+        with self.assertRaises(ValueError):
+            other.add("a")
+        self.assertEqual(YANGBitsType({"b": 5, "c": 7})._allowed_bits, {"b": 5, "c": 7})
+
+    def test_adding_bit_definition_to_leaf(self):
+        self.instance.bits2.add("baz")
+        self.instance.bits2._add_bit_definition("qux", 100)
+        self.assertEqual(str(self.instance.bits2), "baz")
+        self.instance.bits2.add("qux")
+        self.assertEqual(str(self.instance.bits2), "baz qux")
+        self.assertEqual(self.instance.bits2._yang_name, "bits2")
+        with self.assertRaises(ValueError):
+            self.bindings.bits().bits2.add("qux")
+
+    def test_bits_are_hashable(self):
+        self.instance.bits2.update(["foo", "bar"])
+        self.assertEqual(hash(self.instance.bits2), hash(frozenset(["foo", "bar"])))
+        other = self.bindings.bits()
+        other.bits2.update(["bar", "foo"])
+        self.assertEqual(len({self.instance.bits2, other.bits2}), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,13 @@
 #!/usr/bin/env python
 
 from decimal import Decimal
+import json
+import pickle
 import unittest
 
+from pyangbind.lib import pybindJSON
+from pyangbind.lib.serialise import pybindJSONDecoder
+from pyangbind.lib.yangtypes import YANGDecimal64Type
 from tests.base import PyangBindTestCase
 
 
@@ -71,6 +76,94 @@ class DecimalTests(PyangBindTestCase):
                     "Decimal64 leaf with range was not correctly set (%f -> %s != %s)" % (value[0], allowed, value[1]),
                 )
 
+    def test_values_are_range_checked_before_rounding(self):
+        # the same values are accepted whether or not they are fixed-point.
+        for value, allowed in [
+            ("2.25", True),
+            (2.25, True),
+            ("2.2500000", True),
+            ("-1.4999", True),
+            ("2.2501", False),
+            (2.2500001, False),
+            ("-1.5001", False),
+            (Decimal("2.2504"), False),
+        ]:
+            with self.subTest(value=value):
+                if allowed:
+                    self.decimal_obj.container.dec64Bounded = value
+                else:
+                    with self.assertRaises(ValueError):
+                        self.decimal_obj.container.dec64Bounded = value
+
+
+class FixedPointDecimalTests(DecimalTests):
+
+    pyang_flags = ["--fixed-point-decimal64"]
+
+    def test_values_are_fixed_point(self):
+        self.decimal_obj.container.d1 = "1.5"
+        self.assertEqual(self.decimal_obj.container.d1._pybind_generated_by, "YANGDecimal64")
+        self.assertEqual(self.decimal_obj.container.d1._scaled, 150)
+        self.assertEqual(str(self.decimal_obj.container.d1), "1.50")
+        self.assertEqual(self.decimal_obj.container.d1, Decimal("1.5"))
+        self.assertEqual(self.decimal_obj.container.d1, 1.5)
+
+    def test_strings_are_parsed_exactly(self):
+        self.decimal_obj.container.d2 = "-0.001"
+        self.assertEqual(self.decimal_obj.container.d2._scaled, -1)
+        self.assertEqual(str(self.decimal_obj.container.d2), "-0.001")
+
+    def test_values_outside_int64_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.decimal_obj.container.d1 = "92233720368547758.08"
+        self.decimal_obj.container.d1 = "92233720368547758.07"
+        self.assertEqual(self.decimal_obj.container.d1._scaled, 2**63 - 1)
+
+    def test_value_in_range_is_rounded(self):
+        self.decimal_obj.container.dec64Bounded = "-1.4999"
+        self.assertEqual(str(self.decimal_obj.container.dec64Bounded), "-1.500")
+        self.decimal_obj.container.dec64Bounded = 2.2499999
+        self.assertEqual(str(self.decimal_obj.container.dec64Bounded), "2.250")
+
+    def test_invalid_value(self):
+        with self.assertRaises(ValueError):
+            self.decimal_obj.container.d1 = "one"
+
+    def test_leaf_list(self):
+        self.decimal_obj.container.dlist.append("1.1")
+        self.decimal_obj.container.dlist.append(2)
+        self.assertEqual([str(v) for v in self.decimal_obj.container.dlist], ["1.10", "2.00"])
+
+    def test_serialise_ietf(self):
+        self.decimal_obj.container.d1 = "1.5"
+        self.decimal_obj.container.dlist.append("0.25")
+        self.assertEqual(
+            json.loads(pybindJSON.dumps(self.decimal_obj, mode="ietf")),
+            {"decimal:container": {"d1": "1.50", "dlist": ["0.25"]}},
+        )
+
+    def test_load_ietf(self):
+        instance = pybindJSONDecoder.load_ietf_json(
+            {"decimal:container": {"d1": "0.10", "dlist": ["0.25"], "dec64LeafWithRange": "111.1"}},
+            self.bindings,
+            "decimal",
+        )
+        self.assertEqual(str(instance.container.d1), "0.10")
+        self.assertEqual(str(instance.container.dlist[0]), "0.25")
+        self.assertEqual(str(instance.container.dec64LeafWithRange), "111.100000")
+
+    def test_json_round_trip(self):
+        self.decimal_obj.container.d1 = "0.1"
+        self.decimal_obj.container.d2 = 1
+        instance = pybindJSON.loads(pybindJSON.dumps(self.decimal_obj), self.bindings, "decimal")
+        self.assertEqual(str(instance.container.d1), "0.10")
+        self.assertEqual(str(instance.container.d2), "1.000")
+
+    def test_pickle(self):
+        d3 = YANGDecimal64Type(fraction_digits=1)("-2.5")
+        self.assertEqual(pickle.loads(pickle.dumps(d3)), d3)
+        self.assertEqual(str(pickle.loads(pickle.dumps(d3))), "-2.5")
+
 
 if __name__ == "__main__":
     unittest.main()
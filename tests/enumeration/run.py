@@ -2,6 +2,7 @@
 
 import unittest
 
+from pyangbind.lib.yangtypes import RestrictedClassType
 from tests.base import PyangBindTestCase
 
 
@@ -51,6 +52,25 @@ class EnumerationTests(PyangBindTestCase):
             "Erroneously statically defined value returned (%s)" % self.enum_obj.container.e.getValue(mapped=True),
         )
 
+    def test_enum_values_are_assigned_in_order(self):
+        for value, mapped in [("a", 0), ("c", 2)]:
+            with self.subTest(value=value):
+                self.enum_obj.container.f = value
+                self.assertEqual(self.enum_obj.container.f.getValue(mapped=True), mapped)
+
+    def test_enumerations_are_shared(self):
+        enumeration = self.bindings._pyangbind_enumerations["enumeration#0"]
+        self.assertIs(self.enum_obj.container.e._enumeration_dict, enumeration)
+        self.assertIs(self.bindings.enumeration().container.e._enumeration_dict, enumeration)
+
+    def test_enum_values_are_interned(self):
+        enumeration = self.bindings._pyangbind_enumerations["enumeration#0"]
+        enum_type = RestrictedClassType(base_type=str, restriction_type="dict_key", restriction_arg=enumeration)
+        self.assertIs(enum_type("one"), enum_type("one"))
+        self.assertIs(
+            RestrictedClassType(base_type=str, restriction_type="dict_key", restriction_arg=enumeration), enum_type
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@
 
 import unittest
 
+from pyangbind.lib import yangtypes
 from tests.base import PyangBindTestCase
 
 
@@ -27,7 +28,8 @@ class ExtMethodsTests(PyangBindTestCase):
     pyang_flags = ["--use-extmethods"]
 
     def setUp(self):
-        self.instance = self.bindings.extmethods(extmethods={"/item/one": extmethodcls()})
+        self.extmethods = {"/item/one": extmethodcls(), "/entries/entry/value": extmethodcls()}
+        self.instance = self.bindings.extmethods(extmethods=self.extmethods)
 
     def test_extmethods_get_created_on_leafs(self):
         for method_name, valid in [
@@ -61,6 +63,28 @@ class ExtMethodsTests(PyangBindTestCase):
         with self.assertRaises(AttributeError):
             self.instance.item.two
 
+    def test_extmethods_are_not_instance_attributes(self):
+        self.assertNotIn("_commit", vars(self.instance.item.one))
+        self.assertIsInstance(type(self.instance.item.one).__dict__["_commit"], yangtypes.YANGExtMethod)
+
+    def test_extmethods_are_resolved_once_per_path(self):
+        tables = yangtypes._extmethod_tables[id(self.extmethods)][1]
+        resolved = len(tables)
+        self.bindings.extmethods(extmethods=self.extmethods)
+        self.assertEqual(len(tables), resolved)
+
+    def test_extmethods_on_list_entries_use_their_path(self):
+        self.instance.entries.entry.add("a")
+        self.instance.entries.entry.add("b")
+        self.assertEqual(
+            self.instance.entries.entry["b"].value._echo()["kwargs"]["caller"], ["entries", "entry[name='b']", "value"]
+        )
+        self.assertIsNone(getattr(self.instance.entries.entry["b"].name, "_echo", None))
+
+    def test_extmethods_of_fork(self):
+        fork = self.instance._fork()
+        self.assertEqual(fork.item.one._commit(), "COMMIT_CALLED")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+
+import gc
+import json
+import unittest
+
+from pyangbind.lib import pybindJSON
+from pyangbind.lib.xpathhelper import YANGPathHelper
+from tests.base import PyangBindTestCase
+
+
+class ForkTests(PyangBindTestCase):
+    yang_files = ["fork.yang"]
+
+    def setUp(self):
+        self.instance = self.bindings.fork()
+        eth0 = self.instance.interfaces.interface.add("eth0")
+        eth0.config.mtu = 1500
+        eth0.config.address.append("192.0.2.1")
+        eth0.config.flags.add("up")
+        self.instance.interfaces.interface.add("eth1")
+        self.instance.system.hostname = "router"
+
+    def ietf(self, obj):
+        return json.loads(pybindJSON.dumps(obj, mode="ietf"))
+
+    def test_fork_has_the_same_content(self):
+        fork = self.instance._fork()
+        self.assertEqual(self.ietf(fork), self.ietf(self.instance))
+
+    def test_fork_shares_containers_until_accessed(self):
+        fork = self.instance._fork()
+        self.assertIs(fork._pyangbind_source, self.instance)
+        system = fork.system
+        self.assertIsNone(fork._pyangbind_source)
+        self.assertIsNot(system, self.instance.system)
+        self.assertIs(system._pyangbind_source, self.instance.system)
+        self.assertIs(fork.interfaces._pyangbind_source, self.instance.interfaces)
+        self.assertEqual(system.hostname, "router")
+        self.assertIsNone(system._pyangbind_source)
+        self.assertIs(fork.interfaces._pyangbind_source, self.instance.interfaces)
+
+    def test_changes_to_source_are_not_seen_by_fork(self):
+        fork = self.instance._fork()
+        config = self.instance.interfaces.interface["eth0"].config
+        config.mtu = 9000
+        config.address.append("192.0.2.2")
+        del config.address[0]
+        config.flags.add("running")
+        config._add_metadata("inactive", True)
+        self.instance.interfaces.interface.add("eth2")
+        self.instance.interfaces.interface.delete("eth1")
+        self.instance.system._unset_hostname()
+        self.instance.system.ssh._set_present()
+
+        self.assertEqual(fork.interfaces.interface["eth0"].config.mtu, 1500)
+        self.assertEqual(list(fork.interfaces.interface["eth0"].config.address), ["192.0.2.1"])
+        self.assertEqual(fork.interfaces.interface["eth0"].config.flags, {"up"})
+        self.assertEqual(fork.interfaces.interface["eth0"].config._metadata, {})
+        self.assertEqual(list(fork.interfaces.interface), ["eth0", "eth1"])
+        self.assertEqual(fork.system.hostname, "router")
+        self.assertFalse(fork.system.ssh._present())
+
+    def test_changes_to_fork_are_not_seen_by_source(self):
+        before = self.ietf(self.instance)
+        fork = self.instance._fork()
+        config = fork.interfaces.interface["eth0"].config
+        config.mtu = 9000
+        config.address.append("192.0.2.2")
+        config.flags.remove("up")
+        fork.interfaces.interface.add("eth2")
+        fork.interfaces.interface.delete("eth1")
+        fork.system.hostname = "switch"
+        self.assertEqual(self.ietf(self.instance), before)
+        self.assertEqual(list(fork.interfaces.interface), ["eth0", "eth2"])
+        self.assertEqual(config.mtu, 9000)
+
+    def test_set_on_shared_container(self):
+        fork = self.instance._fork()
+        system = fork.system
+        system.hostname = "switch"
+        self.assertIs(system._pyangbind_source, self.instance.system)
+        self.instance.system.ssh._set_present()
+        self.assertEqual(system.hostname, "switch")
+        self.assertFalse(system.ssh._present())
+        self.assertEqual(self.instance.system.hostname, "router")
+
+    def test_fork_has_its_own_parents(self):
+        fork = self.instance._fork()
+        entry = fork.interfaces.interface["eth0"]
+        self.assertIs(entry._parent, fork.interfaces)
+        self.assertIs(entry.config._parent, entry)
+        self.assertIs(entry.config.mtu._parent, entry.config)
+        self.assertIs(entry.config.address._parent, entry.config)
+        self.assertIs(fork.interfaces._parent, fork)
+        self.assertEqual(entry.config.mtu._path(), self.instance.interfaces.interface["eth0"].config.mtu._path())
+
+    def test_entries_added_to_fork_belong_to_it(self):
+        fork = self.instance._fork()
+        entry = fork.interfaces.interface.add("eth2")
+        self.assertIs(entry._parent, fork.interfaces)
+        entry.config.mtu = 1500
+        self.assertTrue(fork.interfaces._changed())
+
+    def test_changes_are_kept(self):
+        self.instance._mark_clean()
+        self.instance.system.hostname = "switch"
+        fork = self.instance._fork()
+        self.assertEqual(fork.get(filter=True), self.instance.get(filter=True))
+        self.assertTrue(fork.system._changed())
+        self.assertTrue(fork.system.hostname._changed())
+        self.assertFalse(fork.interfaces.interface["eth0"].config.mtu._changed())
+
+    def test_mark_clean_is_independent(self):
+        fork = self.instance._fork()
+        self.instance._mark_clean()
+        self.assertTrue(fork.system._changed())
+        fork._mark_clean()
+        self.instance.system.hostname = "switch"
+        self.assertFalse(fork.system._changed())
+        self.assertTrue(self.instance.system._changed())
+
+    def test_journal_is_not_shared(self):
+        journal = self.instance._enable_journal()
+        fork = self.instance._fork()
+        fork.system.hostname = "switch"
+        self.assertEqual(len(journal), 0)
+        fork_journal = fork._enable_journal()
+        self.assertIsNot(fork_journal, journal)
+        fork.interfaces.interface["eth0"].config.mtu = 9000
+        self.assertEqual([e.value for e in fork_journal], [9000])
+
+    def test_fork_of_fork(self):
+        fork = self.instance._fork()
+        fork.system.hostname = "switch"
+        second = fork._fork()
+        fork.system.hostname = "other"
+        fork.interfaces.interface["eth0"].config.mtu = 9000
+        self.assertEqual(second.system.hostname, "switch")
+        self.assertEqual(second.interfaces.interface["eth0"].config.mtu, 1500)
+        self.assertEqual(self.instance.system.hostname, "router")
+
+    def test_fork_within_tree(self):
+        config = self.instance.interfaces.interface["eth0"].config
+        fork = config._fork()
+        self.assertIsNot(fork, config)
+        self.assertEqual(fork._path(), config._path())
+        self.assertIs(fork._parent._parent._parent.interfaces.interface["eth0"].config, fork)
+        fork.mtu = 9000
+        self.assertEqual(config.mtu, 1500)
+
+    def test_unused_fork_is_released(self):
+        fork = self.instance._fork()
+        fork.interfaces.interface["eth0"].config
+        del fork
+        gc.collect()
+        self.assertEqual([ref() for ref in self.instance.interfaces.interface["eth0"]._pyangbind_forks], [None])
+
+
+class ForkPathHelperTests(PyangBindTestCase):
+    yang_files = ["fork.yang"]
+    pyang_flags = ["--use-xpathhelper"]
+
+    def setUp(self):
+        self.path_helper = YANGPathHelper()
+        self.instance = self.bindings.fork(path_helper=self.path_helper)
+        self.instance.interfaces.interface.add("eth0").config.mtu = 1500
+        self.instance.system.domains.domain.add("example.com")
+        self.instance.system.domain = "example.com"
+
+    def test_fork_is_registered_with_its_path_helper(self):
+        path_helper = YANGPathHelper()
+        fork = self.instance._fork(path_helper=path_helper)
+        mtu = path_helper.get("/interfaces/interface[name='eth0']/config/mtu")
+        self.assertEqual(len(mtu), 1)
+        self.assertIs(mtu[0], fork.interfaces.interface["eth0"].config.mtu)
+        self.assertIs(self.path_helper.get("/system")[0], self.instance.system)
+
+    def test_changes_to_fork_use_its_path_helper(self):
+        path_helper = YANGPathHelper()
+        fork = self.instance._fork(path_helper=path_helper)
+        fork.system.domains.domain.add("example.net")
+        fork.system.domain = "example.net"
+        self.assertEqual(len(path_helper.get("/system/domains/domain")), 2)
+        self.assertEqual(len(self.path_helper.get("/system/domains/domain")), 1)
+        with self.assertRaises(ValueError):
+            self.instance.system.domain = "example.net"
+
+    def test_fork_without_path_helper_is_not_registered(self):
+        fork = self.instance._fork()
+        fork.interfaces.interface.add("eth1")
+        self.assertEqual(len(self.path_helper.get("/interfaces/interface")), 1)
+
+
+class ForkLazyChildrenTests(PyangBindTestCase):
+    yang_files = ["fork.yang"]
+    pyang_flags = ["--lazy-children"]
+
+    def setUp(self):
+        self.instance = self.bindings.fork()
+        self.instance.system.hostname = "router"
+
+    def test_elements_that_are_not_created_are_not_copied(self):
+        fork = self.instance._fork()
+        self.assertTrue(fork._pyangbind_materialised("system"))
+        self.assertFalse(fork._pyangbind_materialised("interfaces"))
+        self.assertFalse(fork.system._pyangbind_materialised("ssh"))
+        self.assertEqual(fork.system.hostname, "router")
+        self.assertFalse(fork.system._pyangbind_materialised("ssh"))
+        self.assertEqual(fork.get(filter=True), {"system": {"hostname": "router"}})
+
+    def test_elements_are_created_in_fork(self):
+        fork = self.instance._fork()
+        fork.interfaces.interface.add("eth0")
+        self.assertFalse(self.instance._pyangbind_materialised("interfaces"))
+        self.assertIs(fork.interfaces.interface["eth0"]._parent, fork.interfaces)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,21 @@ class IdentityRefTests(PyangBindTestCase):
             with self.subTest(leaf=leaf):
                 self.assertEqual(getattr(self.instance.test_container, leaf), "")
 
+    def test_identities_are_referred_to_by_name(self):
+        enumerations = self.bindings._pyangbind_enumerations
+        self.assertIs(enumerations["base-identity"], enumerations["identityref:base-identity"])
+        self.assertIs(enumerations["foo:base-identity"], enumerations["identityref:base-identity"])
+        self.assertEqual(
+            enumerations["defn:remote-base"]["remote:remote-one"],
+            {"@module": "remote", "@namespace": "http://rob.sh/yang/test/typedef/remote", "value": 1},
+        )
+
+    def test_prefixed_and_unprefixed_identities_are_accepted(self):
+        for identity in ["option-one", "foo:option-one", "identityref:option-one"]:
+            with self.subTest(identity=identity):
+                self.instance.test_container.id_base = identity
+                self.assertEqual(self.instance.test_container.id_base, identity)
+
     def test_identityref_accepts_valid_identity_values(self):
         for identity in ["option-one", "option-two"]:
             with self.subTest(identity=identity):
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.base import PyangBindTestCase
+
+
+class IncrementalTests(PyangBindTestCase):
+    yang_files = ["incremental.yang"]
+    split_class_dir = True
+
+    def setUp(self):
+        self.yang_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.yang_dir)
+        # Restore the bindings that the other tests expect.
+        self.run_pyang(["--force"])
+
+    def generate_changed(self, old, new):
+        with open(os.path.join(self._test_path, "incremental.yang")) as fhandle:
+            source = fhandle.read()
+        self.assertIn(old, source)
+        changed = os.path.join(self.yang_dir, "incremental.yang")
+        with open(changed, "w") as fhandle:
+            fhandle.write(source.replace(old, new))
+        self.run_pyang(yang_files=[changed])
+
+    def generated_files(self):
+        files = {}
+        for path, _, names in os.walk(self._pyang_generated_class_dir):
+            for name in names:
+                fpath = os.path.join(path, name)
+                with open(fpath) as fhandle:
+                    files[os.path.relpath(fpath, self._pyang_generated_class_dir)] = (
+                        os.stat(fpath).st_mtime_ns,
+                        fhandle.read(),
+                    )
+        return files
+
+    def read_manifest(self):
+        with open(os.path.join(self._pyang_generated_class_dir, "_pyangbind_manifest.json")) as fhandle:
+            return json.load(fhandle)
+
+    def test_manifest_records_each_module(self):
+        manifest = self.read_manifest()
+        self.assertEqual(
+            sorted(manifest["files"]),
+            [
+                "__init__.py",
+                "_enumerations.py",
+                "_types.py",
+                "first/__init__.py",
+                "second/__init__.py",
+                "third/__init__.py",
+                "third/inner/__init__.py",
+            ],
+        )
+        self.assertEqual(list(manifest["inputs"]["modules"]), ["incremental@2014-01-01"])
+
+    def test_only_changed_modules_are_rewritten(self):
+        before = self.generated_files()
+        self.generate_changed(
+            "leaf description {\n            type string;", "leaf description {\n            type int8;"
+        )
+        after = self.generated_files()
+        changed = sorted(f for f in before if before[f] != after[f])
+        self.assertEqual(changed, ["_pyangbind_manifest.json", "_types.py", "second/__init__.py"])
+
+    def test_changed_typedef_rewrites_type_table(self):
+        before = self.generated_files()
+        self.generate_changed('range "0..100";', 'range "0..50";')
+        after = self.generated_files()
+        self.assertNotEqual(before["_types.py"], after["_types.py"])
+        self.assertIn("0..50", after["_types.py"][1])
+        self.assertEqual(before["first/__init__.py"], after["first/__init__.py"])
+
+    def test_removed_container_is_removed(self):
+        self.generate_changed("container inner {", "container renamed {")
+        files = self.generated_files()
+        self.assertNotIn("third/inner/__init__.py", files)
+        self.assertFalse(os.path.exists(os.path.join(self._pyang_generated_class_dir, "third", "inner")))
+        self.assertIn("third/renamed/__init__.py", files)
+        self.assertIn("third/renamed/__init__.py", self.read_manifest()["files"])
+
+    def test_unchanged_bindings_are_not_regenerated(self):
+        fpath = os.path.join(self._pyang_generated_class_dir, "first", "__init__.py")
+        with open(fpath, "a") as fhandle:
+            fhandle.write("# edited\n")
+        self.run_pyang()
+        with open(fpath) as fhandle:
+            self.assertTrue(fhandle.read().endswith("# edited\n"))
+        self.run_pyang(["--force"])
+        with open(fpath) as fhandle:
+            self.assertFalse(fhandle.read().endswith("# edited\n"))
+
+    def test_module_that_is_no_longer_built_is_removed(self):
+        self.run_pyang(yang_files=["incremental.yang", "incremental-other.yang"])
+        self.assertIn("first/__init__.py", self.generated_files())
+        self.assertEqual(self.read_manifest()["inputs"]["built"], ["incremental", "incremental-other"])
+        # the same modules are loaded, since incremental-other imports
+        # incremental, but only one of them is built.
+        self.run_pyang(yang_files=["incremental-other.yang"])
+        files = self.generated_files()
+        self.assertNotIn("first/__init__.py", files)
+        self.assertIn("other/__init__.py", files)
+        self.assertEqual(self.read_manifest()["inputs"]["built"], ["incremental-other"])
+
+    def test_changed_options_regenerate_bindings(self):
+        before = self.generated_files()
+        self.run_pyang(["--use-xpathhelper"])
+        after = self.generated_files()
+        self.assertNotEqual(before["first/__init__.py"], after["first/__init__.py"])
+        self.assertTrue(self.read_manifest()["inputs"]["options"]["use_xpathhelper"])
+
+    def test_bindings_are_usable(self):
+        instance = self.bindings.incremental()
+        instance.first.value = 10
+        with self.assertRaises(ValueError):
+            instance.first.value = 101
+        instance.third.inner.value = "x"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import json
+import unittest
+
+import pyangbind.lib.pybindJSON as pbJ
+from pyangbind.lib.serialise import WithDefaults
+from pyangbind.lib.xpathhelper import YANGPathHelper
+from tests.base import PyangBindTestCase
+
+
+class LazyChildrenTests(PyangBindTestCase):
+    yang_files = ["lazy.yang"]
+    pyang_flags = ["--lazy-children", "--use-xpathhelper"]
+
+    def setUp(self):
+        self.instance = self.bindings.lazy()
+
+    def test_children_are_not_created_with_container(self):
+        for element in ["a_leaf", "default_leaf", "subcontainer", "item", "tcp_port", "udp_port"]:
+            with self.subTest(element=element):
+                self.assertFalse(self.instance.container._pyangbind_materialised(element))
+
+    def test_child_is_created_on_access(self):
+        subcontainer = self.instance.container.subcontainer
+        self.assertTrue(self.instance.container._pyangbind_materialised("subcontainer"))
+        self.assertIs(self.instance.container.subcontainer, subcontainer)
+        self.assertIs(subcontainer._parent, self.instance.container)
+        self.assertFalse(self.instance.container._pyangbind_materialised("a_leaf"))
+
+    def test_created_child_has_path_and_default(self):
+        self.assertEqual(self.instance.container.subcontainer._path(), ["container", "subcontainer"])
+        self.assertEqual(self.instance.container.default_leaf._default, 42)
+        self.assertFalse(self.instance.container.default_leaf._changed())
+
+    def test_set_marks_parents_changed(self):
+        self.instance.container.subcontainer.b_leaf = 4
+        self.assertTrue(self.instance.container.subcontainer._changed())
+        self.assertTrue(self.instance.container._changed())
+
+    def test_filtered_get_does_not_create_children(self):
+        self.instance.container.a_leaf = "value"
+        self.assertEqual(self.instance.get(filter=True), {"container": {"a-leaf": "value"}})
+        for element in ["default_leaf", "subcontainer", "item"]:
+            with self.subTest(element=element):
+                self.assertFalse(self.instance.container._pyangbind_materialised(element))
+
+    def test_unfiltered_get_includes_all_children(self):
+        self.assertEqual(
+            self.instance.container.get(),
+            {
+                "a-leaf": "",
+                "default-leaf": 42,
+                "subcontainer": {"b-leaf": 0},
+                "item": {},
+                "tcp-port": 0,
+                "udp-port": 0,
+            },
+        )
+
+    def test_serialise_ietf_does_not_create_children(self):
+        self.instance.container.item.add("one")
+        self.assertEqual(
+            json.loads(pbJ.dumps(self.instance, mode="ietf")), {"lazy:container": {"item": [{"name": "one"}]}}
+        )
+        self.assertFalse(self.instance.container._pyangbind_materialised("subcontainer"))
+        self.assertFalse(self.instance.container.item["one"]._pyangbind_materialised("state"))
+
+    def test_serialise_ietf_with_defaults(self):
+        self.instance.container.subcontainer.b_leaf = 0
+        self.assertEqual(
+            json.loads(pbJ.dumps(self.instance, mode="ietf", with_defaults=WithDefaults.IF_SET)),
+            {"lazy:container": {"subcontainer": {"b-leaf": 0}, "tcp-port": 0, "udp-port": 0}},
+        )
+
+    def test_load_json_into_lazy_instance(self):
+        loaded = pbJ.loads({"container": {"a-leaf": "x", "item": {"one": {"name": "one"}}}}, self.bindings, "lazy")
+        self.assertEqual(loaded.container.a_leaf, "x")
+        self.assertEqual(list(loaded.container.item.keys()), ["one"])
+        self.assertFalse(loaded.container._pyangbind_materialised("subcontainer"))
+
+    def test_choice_unset_other_case(self):
+        self.instance.container.tcp_port = 80
+        self.instance.container.udp_port = 53
+        self.assertFalse(self.instance.container.tcp_port._changed())
+        self.assertEqual(self.instance.container.udp_port, 53)
+
+    def test_choice_without_other_case_created(self):
+        self.instance.container.udp_port = 53
+        self.assertFalse(self.instance.container._pyangbind_materialised("tcp_port"))
+
+    def test_path_helper_creates_children(self):
+        path_helper = YANGPathHelper()
+        instance = self.bindings.lazy(path_helper=path_helper)
+        self.assertTrue(instance.container._pyangbind_materialised("subcontainer"))
+        self.assertEqual(len(path_helper.get("/container/subcontainer/b-leaf")), 1)
+        instance.container.item.add("one")
+        instance.reference.item_ref = "one"
+        with self.assertRaises(ValueError):
+            instance.reference.item_ref = "two"
+
+
+if __name__ == "__main__":
+    unittest.main()
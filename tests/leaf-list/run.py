@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 from __future__ import unicode_literals
 
+from pyangbind.lib.yangtypes import TypedListType
 from tests.base import PyangBindTestCase
 
 import unittest
@@ -127,6 +128,37 @@ class LeafListTests(PyangBindTestCase):
         with self.assertRaises(ValueError):
             self.leaflist_obj.container.leaflist[2] = "foo"
 
+    def test_leaflist_membership(self):
+        self.leaflist_obj.container.leaflist.append("itemOne")
+        self.assertIn("itemOne", self.leaflist_obj.container.leaflist)
+        self.assertNotIn("itemTwo", self.leaflist_obj.container.leaflist)
+
+    def test_leaf_lists_are_unique_after_delete(self):
+        self.leaflist_obj.container.leaflist = ["foo", "bar"]
+        del self.leaflist_obj.container.leaflist[0]
+        self.assertNotIn("foo", self.leaflist_obj.container.leaflist)
+        self.leaflist_obj.container.leaflist.append("foo")
+        self.leaflist_obj.container.leaflist.append("foo")
+        self.assertEqual(self.leaflist_obj.container.leaflist, ["bar", "foo"])
+
+    def test_leaf_lists_are_unique_after_cast(self):
+        int_list = TypedListType(allowed_type=int)(unique=True)
+        int_list.append(1)
+        int_list.append("1")
+        int_list.append("2")
+        int_list.append(2)
+        self.assertEqual(int_list, [1, 2])
+        with self.assertRaises(ValueError):
+            int_list.insert(0, "1")
+
+    def test_leaf_lists_are_unique_with_unhashable_values(self):
+        list_list = TypedListType(allowed_type=list)(unique=True)
+        list_list.append([1])
+        list_list.append([1])
+        list_list.append([2])
+        self.assertIn([2], list_list)
+        self.assertEqual(list_list, [[1], [2]])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -141,6 +141,31 @@ class ListTests(PyangBindTestCase):
         self.instance.list_container.list_six[leaf]._set_val(10)
         self.assertEqual(self.instance.list_container.list_six[leaf].val, 10)
 
+    def test_add_creates_a_single_entry(self):
+        for lst, key in [(self.instance.list_container.list_five, 1), (self.instance.list_container.list_six, None)]:
+            with self.subTest(list=lst._yang_name):
+                created = []
+                entry_class = lst._contained_class
+                init = entry_class.__init__
+
+                def counted(obj, *args, **kwargs):
+                    created.append(obj)
+                    init(obj, *args, **kwargs)
+
+                entry_class.__init__ = counted
+                try:
+                    lst.add() if key is None else lst.add(key)
+                finally:
+                    entry_class.__init__ = init
+                self.assertEqual(len(created), 1)
+
+    def test_keys_of_list_with_no_key_increase(self):
+        first = self.instance.list_container.list_six.add()
+        second = self.instance.list_container.list_six.add()
+        self.assertIsInstance(first, int)
+        self.assertGreater(second, first)
+        self.assertEqual(list(self.instance.list_container.list_six.keys()), [first, second])
+
     def test_retrieve_compound_key_with_spaces(self):
         self.instance.list_container.list_eight.add(val="value one", additional="value two")
         self.assertEqual(self.instance.list_container.list_eight["value one value two"].val, "value one")
@@ -269,6 +294,68 @@ class ListTests(PyangBindTestCase):
         self.instance.list_eleven.append(item)
         self.assertEqual(self.instance.list_eleven[1].number, "")
 
+    def test_add_many_is_same_as_add(self):
+        added = self.instance.list_container.list_element.add_many([3, 1, 2])
+        other = self.bindings.list_()
+        for key in [3, 1, 2]:
+            other.list_container.list_element.add(key)
+        self.assertEqual(list(self.instance.list_container.list_element.keys()), [3, 1, 2])
+        self.assertEqual(self.instance.get(), other.get())
+        self.assertEqual([entry.keyval for entry in added], [3, 1, 2])
+        self.assertEqual(
+            self.instance.list_container.list_element[1]._path(), other.list_container.list_element[1]._path()
+        )
+
+    def test_add_many_with_compound_keys(self):
+        self.instance.list_container.list_four.add_many(
+            ["aardvark 1", ("bear", 2), {"valone": "antelope", "valtwo": 3}]
+        )
+        self.assertEqual(list(self.instance.list_container.list_four.keys()), ["aardvark 1", "bear 2", "antelope 3"])
+        self.assertEqual(self.instance.list_container.list_four["bear 2"].valtwo, 2)
+
+    def test_add_many_with_invalid_key_does_not_change_list(self):
+        self.instance.list_container.list_two.add("aardvark")
+        for keys in [["alpaca", "badger"], ["alpaca", "aardvark"], ["alpaca", "alpaca"], ["alpaca", ""]]:
+            with self.subTest(keys=keys):
+                with self.assertRaises(KeyError):
+                    self.instance.list_container.list_two.add_many(keys)
+                self.assertEqual(list(self.instance.list_container.list_two.keys()), ["aardvark"])
+
+    def test_add_many_with_missing_key_in_dict(self):
+        self.instance.list_container.list_four.add("aardvark 1")
+        for keys in [[{"bad": "1"}], [{"valone": "bear", "valtwo": 2}, {"valone": "cat"}]]:
+            with self.subTest(keys=keys):
+                with self.assertRaises(KeyError):
+                    self.instance.list_container.list_four.add_many(keys)
+                self.assertEqual(list(self.instance.list_container.list_four.keys()), ["aardvark 1"])
+
+    def test_extend_from_sets_values(self):
+        self.instance.list_container.list_eight.extend_from(
+            [{"val": "one", "additional": "two", "numeric": 3}, {"val": "four", "additional": "five"}]
+        )
+        self.assertEqual(list(self.instance.list_container.list_eight.keys()), ["one two", "four five"])
+        self.assertEqual(self.instance.list_container.list_eight["one two"].numeric, 3)
+        self.assertFalse(self.instance.list_container.list_eight["four five"].numeric._changed())
+
+    def test_extend_from_with_yang_names(self):
+        self.instance.list_container.list_element.extend_from([{"keyval": 1, "another-value": "one"}])
+        self.assertEqual(self.instance.list_container.list_element["1"].another_value, "one")
+
+    def test_extend_from_with_invalid_value_does_not_change_list(self):
+        with self.assertRaises(ValueError):
+            self.instance.list_container.list_eight.extend_from(
+                [{"val": "one", "additional": "two"}, {"val": "three", "additional": "four", "numeric": "five"}]
+            )
+        self.assertEqual(len(self.instance.list_container.list_eight), 0)
+
+    def test_extend_from_list_with_no_key(self):
+        self.instance.list_container.list_six.extend_from([{"val": 1}, {"val": 2}])
+        self.assertEqual(sorted(entry.val for entry in self.instance.list_container.list_six.values()), [1, 2])
+
+    def test_cant_add_many_to_list_with_no_key(self):
+        with self.assertRaises(AttributeError):
+            self.instance.list_container.list_six.add_many([1])
+
     def test_cant_set_nonexistent_item(self):
         item = self.instance.list_eleven._new_item()
         item.kv = 1
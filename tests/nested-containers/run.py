@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
+import gc
 import unittest
+import weakref
 
 from tests.base import PyangBindTestCase
 
@@ -31,12 +33,90 @@ class NestedContainerTests(PyangBindTestCase):
         self.nested_obj.container.subcontainer.a_leaf = 1
         self.assertEqual(self.nested_obj.container.get(), {"subcontainer": {"a-leaf": 1}}, "container get not correct")
 
+    def test_instances_share_wrapper_class(self):
+        other = self.bindings.nested()
+        self.assertIs(type(self.nested_obj.container), type(other.container))
+        self.assertIs(type(self.nested_obj.container.subcontainer), type(other.container.subcontainer))
+        self.assertIsNot(self.nested_obj.container, other.container)
+
+    def test_shared_wrapper_class_keeps_instance_attributes(self):
+        other = self.bindings.nested()
+        other.container.subcontainer.a_leaf = 1
+        self.assertIs(self.nested_obj.container.subcontainer._parent, self.nested_obj.container)
+        self.assertIs(other.container.subcontainer._parent, other.container)
+        self.assertFalse(self.nested_obj.container.subcontainer._changed())
+        self.assertTrue(other.container.subcontainer._changed())
+
+    def test_instances_share_schema_node(self):
+        other = self.bindings.nested()
+        other.container.subcontainer.a_leaf = 1
+        self.assertIs(self.nested_obj.container.subcontainer._schema, other.container.subcontainer._schema)
+        self.assertIs(
+            self.nested_obj.container.subcontainer.a_leaf._schema, other.container.subcontainer.a_leaf._schema
+        )
+        self.assertEqual(other.container.subcontainer.a_leaf._yang_name, "a-leaf")
+        self.assertEqual(other.container.subcontainer.a_leaf._yang_type, "uint8")
+
+    def test_schema_node_is_released_with_its_instances(self):
+        del self.nested_obj
+        instance = self.bindings.nested()
+        node = weakref.ref(instance.container.subcontainer._schema)
+        self.assertIsNotNone(node())
+        del instance
+        gc.collect()
+        self.assertIsNone(node())
+
+    def test_metadata_is_created_when_used(self):
+        leaf = self.nested_obj.container.subcontainer.a_leaf
+        self.assertNotIn("_metadatad", leaf.__dict__)
+        leaf._add_metadata("key", "value")
+        self.assertEqual(leaf._metadata, {"key": "value"})
+        self.assertEqual(self.bindings.nested().container.subcontainer.a_leaf._metadata, {})
+
+    def test_mark_clean(self):
+        self.nested_obj.container.subcontainer.a_leaf = 1
+        self.nested_obj._mark_clean()
+        self.assertFalse(self.nested_obj.container._changed())
+        self.assertFalse(self.nested_obj.container.subcontainer._changed())
+        self.assertFalse(self.nested_obj.container.subcontainer.a_leaf._changed())
+        self.assertEqual(self.nested_obj.get(filter=True), {})
+        self.assertEqual(self.nested_obj.container.subcontainer.a_leaf, 1)
+
+    def test_mark_clean_from_within_tree(self):
+        self.nested_obj.container.subcontainer.a_leaf = 1
+        self.nested_obj.container.subcontainer._mark_clean()
+        self.assertFalse(self.nested_obj.container._changed())
+        self.assertEqual(self.nested_obj.get(filter=True), {})
+
+    def test_change_after_mark_clean(self):
+        self.nested_obj.container.subcontainer.a_leaf = 1
+        self.nested_obj._mark_clean()
+        self.nested_obj.container.subcontainer.a_leaf = 2
+        self.assertTrue(self.nested_obj.container._changed())
+        self.assertTrue(self.nested_obj.container.subcontainer._changed())
+        self.assertEqual(self.nested_obj.get(filter=True), {"container": {"subcontainer": {"a-leaf": 2}}})
+
     def test_full_get(self):
         self.nested_obj.container.subcontainer.a_leaf = 1
         self.assertEqual(
             self.nested_obj.get(), {"container": {"subcontainer": {"a-leaf": 1}}}, "instance get not correct"
         )
 
+    def test_path_is_cached(self):
+        leaf = self.nested_obj.container.subcontainer.a_leaf
+        self.assertEqual(leaf._path(), ["container", "subcontainer", "a-leaf"])
+        self.assertIs(leaf._path_tuple(), leaf._path_tuple())
+        # the path is built from the path of the parent.
+        self.assertIs(leaf._path_cache[0], self.nested_obj.container.subcontainer._path_tuple())
+
+    def test_path_is_rebuilt_when_ancestor_is_reparented(self):
+        leaf = self.nested_obj.container.subcontainer.a_leaf
+        self.assertEqual(leaf._path(), ["container", "subcontainer", "a-leaf"])
+        other = self.bindings.nested()
+        other.container.subcontainer._path_tuple()
+        self.nested_obj.container.subcontainer._parent = other.container.subcontainer
+        self.assertEqual(leaf._path(), ["container", "subcontainer", "subcontainer", "a-leaf"])
+
 
 if __name__ == "__main__":
     unittest.main()
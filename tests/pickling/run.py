@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+import copy
+import json
+import multiprocessing
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from pyangbind.lib import pybindJSON
+from pyangbind.lib.xpathhelper import YANGPathHelper
+from tests.base import PyangBindTestCase
+
+
+def ietf(obj):
+    return json.loads(pybindJSON.dumps(obj, mode="ietf"))
+
+
+def add_route(routes):
+    # run in a worker process, which is given and returns a list.
+    routes.add(prefix="192.0.2.0/24", next_hop="198.51.100.1").metric = 10
+    return routes
+
+
+class PicklingTests(PyangBindTestCase):
+    yang_files = ["pickling.yang"]
+    pyang_flags = ["--use-xpathhelper"]
+    split_class_dir = True
+    module_name = "pickling_bindings"
+
+    def setUp(self):
+        self.instance = self.pickling_bindings.pickling()
+        eth0 = self.instance.interfaces.interface.add("eth0")
+        eth0.config.mtu = 1500
+        eth0.config.enabled = True
+        eth0.config.loopback = True
+        eth0.config.power = "-3.50"
+        eth0.config.state = "UP"
+        eth0.config.type = "DERIVED"
+        eth0.config.vlan = 100
+        eth0.config.key = "Zm9v"
+        eth0.config.address.append("192.0.2.1")
+        eth0.config.address.append("192.0.2.2")
+        eth0.config.flags.add("running")
+        self.instance.interfaces.interface.add("eth1").config.vlan = "native"
+        self.instance.routes.route.add(prefix="0.0.0.0/0", next_hop="192.0.2.254").metric = 1
+        self.instance.samples.sample[self.instance.samples.sample.add()]._set_value(7)
+
+    def round_trip(self, obj):
+        return pickle.loads(pickle.dumps(obj))
+
+    def test_root_round_trip(self):
+        new = self.round_trip(self.instance)
+        self.assertIsInstance(new, self.pickling_bindings.pickling)
+        self.assertEqual(ietf(new), ietf(self.instance))
+
+    def test_values_keep_their_types(self):
+        config = self.round_trip(self.instance).interfaces.interface["eth0"].config
+        self.assertEqual(config.mtu, 1500)
+        self.assertIs(bool(config.enabled), True)
+        self.assertEqual(str(config.power), "-3.50")
+        self.assertEqual(config.vlan, 100)
+        self.assertEqual(config.key, b"foo")
+        self.assertEqual(list(config.address), ["192.0.2.1", "192.0.2.2"])
+        self.assertEqual(config.flags, {"running"})
+        self.assertEqual(self.round_trip(self.instance).interfaces.interface["eth1"].config.vlan, "native")
+
+    def test_container_keeps_its_path(self):
+        config = self.round_trip(self.instance.interfaces.interface["eth0"].config)
+        self.assertEqual(config._path(), ["interfaces", "interface[name='eth0']", "config"])
+        self.assertEqual(ietf(config), ietf(self.instance.interfaces.interface["eth0"].config))
+        self.assertEqual(list(config._parent._parent._parent.interfaces.interface), ["eth0"])
+
+    def test_list_entry(self):
+        route = self.round_trip(self.instance.routes.route["0.0.0.0/0 192.0.2.254"])
+        self.assertEqual(route.prefix, "0.0.0.0/0")
+        self.assertEqual(route.next_hop, "192.0.2.254")
+        self.assertEqual(route.metric, 1)
+
+    def test_list(self):
+        interfaces = self.round_trip(self.instance.interfaces.interface)
+        self.assertEqual(list(interfaces), ["eth0", "eth1"])
+        self.assertEqual(interfaces["eth0"].config.mtu, 1500)
+        samples = self.round_trip(self.instance.samples.sample)
+        self.assertEqual([s.value for s in samples.itervalues()], [7])
+
+    def test_leaf(self):
+        mtu = self.round_trip(self.instance.interfaces.interface["eth0"].config.mtu)
+        self.assertEqual(mtu, 1500)
+        self.assertEqual(mtu._path(), ["interfaces", "interface[name='eth0']", "config", "mtu"])
+        self.assertTrue(mtu._changed())
+
+    def test_unset_leaf(self):
+        port = self.round_trip(self.instance.ssh.port)
+        self.assertEqual(port._default, 22)
+        self.assertFalse(port._changed())
+
+    def test_presence(self):
+        self.assertFalse(self.round_trip(self.instance).ssh._present())
+        self.instance.ssh._set_present()
+        self.assertTrue(self.round_trip(self.instance).ssh._present())
+
+    def test_copy_is_shallow(self):
+        mtu = self.instance.interfaces.interface["eth0"].config.mtu
+        self.assertIs(copy.copy(mtu)._parent, mtu._parent)
+
+    def test_copy_keeps_state(self):
+        mtu = self.instance.interfaces.interface["eth0"].config.mtu
+        mtu._add_metadata("key", "value")
+        new = copy.copy(mtu)
+        self.assertIs(type(new), type(mtu))
+        self.assertEqual(new, 1500)
+        self.assertEqual(new._path(), mtu._path())
+        self.assertTrue(new._changed())
+        self.assertEqual(new._metadata, {"key": "value"})
+        config = self.instance.interfaces.interface["eth0"].config
+        self.assertIs(copy.copy(config).mtu, config.mtu)
+
+    def test_deepcopy_copies_tree(self):
+        new = copy.deepcopy(self.instance)
+        self.assertEqual(ietf(new), ietf(self.instance))
+        new.interfaces.interface["eth0"].config.mtu = 9000
+        self.assertEqual(self.instance.interfaces.interface["eth0"].config.mtu, 1500)
+
+    def test_deepcopy_of_leaf_is_within_copy_of_tree(self):
+        mtu = self.instance.interfaces.interface["eth0"].config.mtu
+        new = copy.deepcopy(mtu)
+        self.assertEqual(new, 1500)
+        self.assertEqual(new._path(), mtu._path())
+        self.assertIsNot(new._parent, mtu._parent)
+        root = new._parent._parent._parent._parent
+        self.assertIsInstance(root, self.pickling_bindings.pickling)
+        self.assertEqual(ietf(root), ietf(self.instance))
+
+    def test_deepcopy_has_new_path_helper(self):
+        helper = YANGPathHelper()
+        instance = self.pickling_bindings.pickling(path_helper=helper)
+        instance.interfaces.interface.add("eth0").config.mtu = 1500
+        new = copy.deepcopy(instance)
+        self.assertIsInstance(new._path_helper, YANGPathHelper)
+        self.assertIsNot(new._path_helper, helper)
+        path = "/interfaces/interface[name='eth0']/config/mtu"
+        self.assertEqual(new._path_helper.get(path), [new.interfaces.interface["eth0"].config.mtu])
+        self.assertEqual(helper.get(path), [instance.interfaces.interface["eth0"].config.mtu])
+
+    def test_deepcopy_of_leaf_outside_container(self):
+        from pyangbind.lib.yangtypes import YANGDynClass
+
+        leaf = YANGDynClass(1, base=int, yang_name="standalone")
+        new = copy.deepcopy(leaf)
+        self.assertEqual(new, 1)
+        self.assertEqual(new._yang_name, "standalone")
+
+    def test_leaf_outside_container(self):
+        from pyangbind.lib.yangtypes import YANGDynClass
+
+        with self.assertRaises(TypeError):
+            pickle.dumps(YANGDynClass(1, base=int, yang_name="standalone"))
+
+    def test_worker_process(self):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as executor:
+            routes = executor.submit(add_route, self.instance.routes.route).result()
+        self.assertEqual(list(routes), ["0.0.0.0/0 192.0.2.254", "192.0.2.0/24 198.51.100.1"])
+        self.assertEqual(routes["192.0.2.0/24 198.51.100.1"].metric, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
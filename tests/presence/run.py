@@ -85,6 +85,16 @@ class PresenceTests(PyangBindTestCase):
         self.instance.parent.child._set_present(present=False)
         self.assertIs(self.instance.parent.child._present(), False)
 
+    def test_008_set_present_after_nested_change(self):
+        self.instance.p_container.inner.s = "teststring"
+        self.assertIs(self.instance.p_container._present(), True)
+        self.instance.p_container._set_present(False)
+        self.assertIs(self.instance.p_container._present(), False)
+        self.assertIs(self.instance.p_container.inner.s._changed(), True)
+        self.instance.p_container.inner.s = "anotherstring"
+        self.assertIs(self.instance.p_container._present(), True)
+        self.assertIs(self.instance.p_container._changed(), True)
+
     def test_009_presence_get(self):
         self.instance.parent.child._set_present(True)
         self.assertIs(self.instance.empty_container._present(), False)
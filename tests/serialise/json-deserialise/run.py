@@ -130,6 +130,13 @@ class JSONDeserialiseTests(PyangBindTestCase):
             allowed = False
         self.assertFalse(allowed, "Skipping keys that did not exist was not successfully handled.")
 
+    def test_load_leaflist_into_existing_object(self):
+        for union_list in [[16, "chicken", "egg"], ["fish", "16", "chicken"]]:
+            pybindJSONDecoder.load_json(
+                {"c1": {"l1": {"1": {"k1": 1, "union-list": union_list}}}}, None, None, obj=self.deserialise_obj
+            )
+        self.assertEqual(self.deserialise_obj.get(filter=True)["c1"]["l1"]["1"]["union-list"], [16, "chicken", "fish"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+
+import json
+import subprocess
+import sys
+import unittest
+
+from pyangbind.lib import pybindJSON
+from pyangbind.lib.journal import YANGJournalOverflowError
+from pyangbind.lib.serialise import pybindIETFPatchEncoder, pybindJSONDecoder
+from tests.base import PyangBindTestCase
+
+
+def apply_json_patch(document, operations):
+    # A minimal RFC 6902 implementation of the operations that are emitted by
+    # pybindIETFPatchEncoder.
+    for operation in operations:
+        parts = [p.replace("~1", "/").replace("~0", "~") for p in operation["path"].split("/")[1:]]
+        target = document
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        last = parts[-1]
+        if isinstance(target, list) and not last == "-":
+            last = int(last)
+            # an element may be added after the last element of a list.
+            if last > len(target) or (last == len(target) and not operation["op"] == "add"):
+                raise IndexError("%s does not exist" % operation["path"])
+        elif isinstance(target, dict) and last not in target and not operation["op"] == "add":
+            raise KeyError("%s does not exist" % operation["path"])
+        if operation["op"] == "remove":
+            del target[last]
+        elif isinstance(target, list):
+            if last == "-":
+                target.append(operation["value"])
+            elif operation["op"] == "replace":
+                target[last] = operation["value"]
+            else:
+                target.insert(last, operation["value"])
+        else:
+            target[last] = operation["value"]
+    return document
+
+
+class JournalTests(PyangBindTestCase):
+    yang_files = ["patch.yang"]
+    pyang_flags = ["--presence"]
+    maxDiff = None
+
+    def setUp(self):
+        self.instance = self.bindings.patch()
+        self.instance.interfaces.interface.add("eth0")
+        self.instance.interfaces.interface.add("eth1")
+
+    def ietf(self):
+        return json.loads(pybindJSON.dumps(self.instance, mode="ietf"))
+
+    def test_changes_are_not_recorded_by_default(self):
+        journal = self.instance._enable_journal()
+        self.assertEqual(len(journal), 0)
+        self.instance._disable_journal()
+        self.instance.interfaces.interface["eth0"].config.mtu = 1500
+        self.assertEqual(len(journal), 0)
+
+    def test_enable_journal_returns_existing_journal(self):
+        journal = self.instance._enable_journal()
+        self.assertIs(self.instance.interfaces._enable_journal(), journal)
+
+    def test_records_changes(self):
+        journal = self.instance._enable_journal()
+        eth0 = self.instance.interfaces.interface["eth0"]
+        eth0.config.mtu = 1500
+        entry = self.instance.interfaces.interface.add("eth2")
+        self.instance.interfaces.interface.delete("eth0")
+        entry.config._unset_mtu()
+        entry.config.mtu = 9000
+        entry.config._unset_mtu()
+        self.assertEqual(
+            [(e.sequence, e.operation, e.value, e.position) for e in journal],
+            [
+                (1, "set", 1500, None),
+                (2, "add", {"name": "eth2"}, None),
+                (3, "delete", None, 0),
+                (4, "set", 9000, None),
+                (5, "unset", None, None),
+            ],
+        )
+        self.assertIs(journal.since(1)[0].obj._parent, eth0.config)
+
+    def test_values_are_not_changed_by_later_changes(self):
+        journal = self.instance._enable_journal()
+        config = self.instance.interfaces.interface["eth0"].config
+        config.address.append("192.0.2.1")
+        config.address.append("192.0.2.2")
+        config.address.remove("192.0.2.1")
+        self.assertEqual([e.value for e in journal], [["192.0.2.1"], ["192.0.2.1", "192.0.2.2"], ["192.0.2.2"]])
+
+    def test_container_set_from_value_is_one_change(self):
+        journal = self.instance._enable_journal()
+        other = self.bindings.patch()
+        other.interfaces.interface.add("eth0")
+        other.interfaces.interface["eth0"].config.mtu = 1500
+        other.interfaces.interface["eth0"].config.enabled = True
+        self.instance.interfaces.interface["eth0"].config = other.interfaces.interface["eth0"].config
+        self.assertEqual([(e.operation, e.value) for e in journal], [("set", {"mtu": 1500, "enabled": True})])
+
+    def test_add_many_records_each_entry(self):
+        journal = self.instance._enable_journal()
+        self.instance.pairs.pair.add_many([("x", 1), ("y", 2)])
+        self.instance.pairs.pair.extend_from([{"a": "z", "b": 3, "value": "v"}])
+        self.assertEqual(
+            [(e.operation, e.value) for e in journal],
+            [("add", {"a": "x", "b": 1}), ("add", {"a": "y", "b": 2}), ("add", {"a": "z", "b": 3, "value": "v"})],
+        )
+
+    def test_checkpoints(self):
+        journal = self.instance._enable_journal()
+        config = self.instance.interfaces.interface["eth0"].config
+        config.mtu = 1500
+        checkpoint = journal.checkpoint()
+        self.assertEqual(journal.since(checkpoint), [])
+        config.mtu = 9000
+        self.assertEqual([e.value for e in journal.since(checkpoint)], [9000])
+        self.assertEqual([e.value for e in journal.since(1)], [1500, 9000])
+
+    def test_trim(self):
+        journal = self.instance._enable_journal()
+        config = self.instance.interfaces.interface["eth0"].config
+        config.mtu = 1500
+        checkpoint = journal.checkpoint()
+        config.mtu = 9000
+        journal.trim(checkpoint)
+        self.assertEqual([e.value for e in journal], [9000])
+        self.assertEqual([e.value for e in journal.since(checkpoint)], [9000])
+        with self.assertRaises(YANGJournalOverflowError):
+            journal.since(1)
+
+    def test_journal_is_bounded(self):
+        journal = self.instance._enable_journal(maxlen=2)
+        config = self.instance.interfaces.interface["eth0"].config
+        for mtu in [1500, 1600, 1700]:
+            config.mtu = mtu
+        self.assertEqual([e.value for e in journal], [1600, 1700])
+        self.assertEqual([e.value for e in journal.since(2)], [1600, 1700])
+        with self.assertRaises(YANGJournalOverflowError):
+            journal.since(1)
+
+    def test_paused(self):
+        journal = self.instance._enable_journal()
+        with journal.paused():
+            self.instance.interfaces.interface["eth0"].config.mtu = 1500
+        self.assertEqual(len(journal), 0)
+
+    def test_load_json_is_recorded(self):
+        journal = self.instance._enable_journal()
+        pybindJSONDecoder.load_json(
+            {"interfaces": {"interface": {"eth0": {"name": "eth0", "config": {"mtu": 1500}}}}},
+            None,
+            None,
+            obj=self.instance,
+        )
+        self.assertIn(("set", 1500), [(e.operation, e.value) for e in journal])
+
+    def test_mark_clean_with_journal(self):
+        journal = self.instance._enable_journal()
+        self.instance.interfaces.interface["eth0"].config.mtu = 1500
+        self.instance._mark_clean()
+        self.assertFalse(self.instance.interfaces._changed())
+        self.assertEqual(len(journal), 1)
+
+    def test_yang_patch(self):
+        journal = self.instance._enable_journal()
+        self.instance.interfaces.interface["eth0"].config.mtu = 1500
+        self.instance.interfaces.interface["eth0"].config.counter = 2**40
+        self.instance.interfaces.interface["eth0"].config.address.append("192.0.2.1")
+        self.instance.interfaces.interface.add("eth2")
+        self.instance.interfaces.interface.delete("eth1")
+        self.instance.interfaces.interface["eth0"].config._unset_mtu()
+        self.assertEqual(
+            json.loads(pybindJSON.dumps_patch(journal.since(1), patch_id="p1")),
+            {
+                "ietf-yang-patch:yang-patch": {
+                    "patch-id": "p1",
+                    "edit": [
+                        {
+                            "edit-id": "1",
+                            "operation": "merge",
+                            "target": "/patch:interfaces/interface=eth0/config/mtu",
+                            "value": {"patch:mtu": 1500},
+                        },
+                        {
+                            "edit-id": "2",
+                            "operation": "merge",
+                            "target": "/patch:interfaces/interface=eth0/config/counter",
+                            "value": {"patch:counter": "1099511627776"},
+                        },
+                        {
+                            "edit-id": "3",
+                            "operation": "replace",
+                            "target": "/patch:interfaces/interface=eth0/config/address",
+                            "value": {"patch:address": ["192.0.2.1"]},
+                        },
+                        {
+                            "edit-id": "4",
+                            "operation": "merge",
+                            "target": "/patch:interfaces/interface=eth2",
+                            "value": {"patch:interface": [{"name": "eth2"}]},
+                        },
+                        {"edit-id": "5", "operation": "remove", "target": "/patch:interfaces/interface=eth1"},
+                        {
+                            "edit-id": "6",
+                            "operation": "remove",
+                            "target": "/patch:interfaces/interface=eth0/config/mtu",
+                        },
+                    ],
+                }
+            },
+        )
+
+    def test_yang_patch_default_patch_id(self):
+        journal = self.instance._enable_journal()
+        self.instance.interfaces.interface["eth0"].config.mtu = 1500
+        patch = pybindIETFPatchEncoder.yang_patch(journal.since(1))
+        self.assertEqual(patch["ietf-yang-patch:yang-patch"]["patch-id"], "pyangbind-1")
+
+    def test_yang_patch_keys_are_encoded(self):
+        journal = self.instance._enable_journal()
+        self.instance.pairs.pair.add(a="x/y,z", b=-1)
+        patch = pybindIETFPatchEncoder.yang_patch(journal.since(1))
+        self.assertEqual(patch["ietf-yang-patch:yang-patch"]["edit"][0]["target"], "/patch:pairs/pair=x%2Fy%2Cz,-1")
+
+    def test_json_patch(self):
+        journal = self.instance._enable_journal()
+        self.instance.interfaces.interface["eth1"].config.mtu = 1500
+        self.instance.interfaces.interface.add("eth2")
+        self.assertEqual(
+            json.loads(pybindJSON.dumps_patch(journal.since(1), mode="json-patch")),
+            [
+                {"op": "add", "path": "/patch:interfaces/interface/1/config", "value": {"mtu": 1500}},
+                {"op": "add", "path": "/patch:interfaces/interface/-", "value": {"name": "eth2"}},
+            ],
+        )
+
+    def test_json_patch_applies_to_previous_document(self):
+        self.instance.interfaces.interface["eth0"].config.mtu = 1000
+        self.instance.interfaces.interface["eth1"].config.mtu = 1000
+        before = self.ietf()
+        journal = self.instance._enable_journal()
+        interfaces = self.instance.interfaces.interface
+        interfaces["eth1"].config.mtu = 1500
+        interfaces.add("eth2").config.mtu = 9000
+        interfaces.delete("eth0")
+        interfaces["eth2"].config.address.append("192.0.2.1")
+        interfaces.add("eth3")
+        interfaces.delete("eth1")
+        interfaces["eth3"].config.enabled = False
+        interfaces["eth2"].config._unset_mtu()
+        self.assertEqual(apply_json_patch(before, pybindIETFPatchEncoder.json_patch(journal.since(1))), self.ietf())
+
+    def test_json_patch_after_list_is_unset(self):
+        self.instance.interfaces.interface["eth1"].config.mtu = 1000
+        before = self.ietf()
+        journal = self.instance._enable_journal()
+        self.instance.interfaces.interface["eth1"].config.mtu = 1500
+        self.instance.interfaces._unset_interface()
+        self.instance.interfaces.interface.add("eth9")
+        operations = pybindIETFPatchEncoder.json_patch(journal.since(1))
+        self.assertEqual(operations[0]["path"], "/patch:interfaces/interface/1/config/mtu")
+        self.assertEqual(apply_json_patch(before, operations), self.ietf())
+
+    def test_json_patch_creates_absent_parents(self):
+        instance = self.bindings.patch()
+        before = json.loads(pybindJSON.dumps(instance, mode="ietf"))
+        self.assertEqual(before, {})
+        journal = instance._enable_journal()
+        instance.interfaces.interface.add("eth0").config.mtu = 1500
+        instance.interfaces.interface["eth0"].config.address.append("192.0.2.1")
+        instance.pairs.pair.add_many([("x", 1), ("y", 2)])
+        instance.ssh.port = 22
+        operations = pybindIETFPatchEncoder.json_patch(journal.since(1))
+        self.assertEqual(
+            [(o["op"], o["path"]) for o in operations],
+            [
+                ("add", "/patch:interfaces"),
+                ("add", "/patch:interfaces/interface/0/config"),
+                ("add", "/patch:interfaces/interface/0/config/address"),
+                ("add", "/patch:pairs"),
+                ("add", "/patch:pairs/pair/-"),
+                ("add", "/patch:ssh"),
+            ],
+        )
+        self.assertEqual(operations[0]["value"], {"interface": [{"name": "eth0"}]})
+        self.assertEqual(apply_json_patch(before, operations), json.loads(pybindJSON.dumps(instance, mode="ietf")))
+
+    def test_json_patch_to_empty_containers(self):
+        before = self.ietf()
+        self.assertEqual(before, {"patch:interfaces": {"interface": [{"name": "eth0"}, {"name": "eth1"}]}})
+        journal = self.instance._enable_journal()
+        config = self.instance.interfaces.interface["eth0"].config
+        config.mtu = 1500
+        config.enabled = True
+        self.instance.interfaces.interface["eth1"].config.address.append("192.0.2.1")
+        self.instance.pairs.pair.add(a="x", b=1).value = "v"
+        operations = pybindIETFPatchEncoder.json_patch(journal.since(1))
+        self.assertEqual(operations[0]["path"], "/patch:interfaces/interface/0/config")
+        self.assertEqual(operations[1]["path"], "/patch:interfaces/interface/0/config/enabled")
+        self.assertEqual(apply_json_patch(before, operations), self.ietf())
+
+    def test_json_patch_removes_parents_left_empty(self):
+        self.instance.interfaces.interface["eth0"].config.mtu = 1500
+        self.instance.ssh.port = 22
+        before = self.ietf()
+        journal = self.instance._enable_journal()
+        self.instance.interfaces.interface["eth0"].config._unset_mtu()
+        self.instance.ssh._unset_port()
+        self.instance.interfaces.interface.delete("eth0")
+        self.instance.interfaces.interface.delete("eth1")
+        operations = pybindIETFPatchEncoder.json_patch(journal.since(1))
+        self.assertEqual(
+            [(o["op"], o["path"]) for o in operations],
+            [
+                ("remove", "/patch:interfaces/interface/0/config"),
+                ("remove", "/patch:ssh/port"),
+                ("remove", "/patch:interfaces/interface/0"),
+                ("remove", "/patch:interfaces"),
+            ],
+        )
+        self.assertEqual(apply_json_patch(before, operations), self.ietf())
+        self.assertEqual(self.ietf(), {"patch:ssh": {}})
+
+    def test_json_patch_recreates_removed_parents(self):
+        before = self.ietf()
+        journal = self.instance._enable_journal()
+        interfaces = self.instance.interfaces.interface
+        interfaces["eth1"].config.mtu = 1500
+        interfaces["eth1"].config._unset_mtu()
+        interfaces["eth1"].config.enabled = False
+        interfaces.delete("eth0")
+        interfaces.delete("eth1")
+        interfaces.add("eth2").config.address.append("192.0.2.1")
+        self.instance.interfaces._unset_interface()
+        interfaces = self.instance.interfaces.interface
+        interfaces.add("eth3").config.mtu = 9000
+        self.assertEqual(apply_json_patch(before, pybindIETFPatchEncoder.json_patch(journal.since(1))), self.ietf())
+
+    def test_streamed_patches(self):
+        self.instance.interfaces.interface["eth0"].config.mtu = 1000
+        journal = self.instance._enable_journal()
+        document = self.ietf()
+        for mtu in [1500, 9000]:
+            checkpoint = journal.checkpoint()
+            self.instance.interfaces.interface["eth0"].config.mtu = mtu
+            self.instance.interfaces.interface.add("eth%d" % mtu)
+            document = apply_json_patch(document, pybindIETFPatchEncoder.json_patch(journal.since(checkpoint)))
+            journal.trim(journal.checkpoint())
+            self.assertEqual(document, self.ietf())
+        self.assertEqual(len(journal), 0)
+
+    def test_unknown_patch_mode(self):
+        with self.assertRaises(ValueError):
+            pybindJSON.dumps_patch([], mode="xml-patch")
+
+    def test_bindings_do_not_import_serialisers(self):
+        # the journal imports the serialisers when it first records a change.
+        imported = subprocess.check_output(
+            [sys.executable, "-c", "import sys, pyangbind.lib.base; print('pyangbind.lib.serialise' in sys.modules)"]
+        )
+        self.assertEqual(imported.strip(), b"False")
+
+
+if __name__ == "__main__":
+    unittest.main()
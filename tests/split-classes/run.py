@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import os
 import unittest
 
 from tests.base import PyangBindTestCase
@@ -20,6 +21,13 @@ class SplitClassesTests(PyangBindTestCase):
             allowed = False
         self.assertTrue(allowed)
 
+    def test_enumerations_are_shared_by_modules(self):
+        self.instance.split_classes.state = "up"
+        self.instance.split_classes.option = "remote:option-one"
+        self.assertEqual(self.instance.split_classes.state.getValue(mapped=True), 0)
+        with self.assertRaises(ValueError):
+            self.instance.split_classes.option = "option-two"
+
     def test_hierarchy_with_repeating_name(self):
         allowed = True
         try:
@@ -42,6 +50,25 @@ class SplitClassesTests(PyangBindTestCase):
         self.instance.choices.case_two_container.user.add("second")
         self.assertEqual(list(self.instance.choices.case_one_container.user.keys()), [])
 
+    def read_generated_files(self):
+        contents = {}
+        for path, _, files in os.walk(self._pyang_generated_class_dir):
+            for name in files:
+                if name.endswith(".py"):
+                    with open(os.path.join(path, name)) as fhandle:
+                        contents[os.path.join(path, name)] = fhandle.read()
+        return contents
+
+    def test_regenerating_replaces_modules(self):
+        before = self.read_generated_files()
+        self.run_pyang(["--force", "--sync-output"])
+        self.assertEqual(self.read_generated_files(), before)
+
+    def test_modules_written_in_parallel_are_identical(self):
+        before = self.read_generated_files()
+        self.run_pyang(["--force", "--jobs 2"])
+        self.assertEqual(self.read_generated_files(), before)
+
 
 if __name__ == "__main__":
     unittest.main()
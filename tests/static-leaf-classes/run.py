@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+import unittest
+
+import pyangbind.lib.pybindJSON as pbJ
+from pyangbind.lib.serialise import pybindIETFXMLEncoder
+from pyangbind.lib.xpathhelper import YANGPathHelper
+from tests.base import PyangBindTestCase
+
+
+class DynamicLeafClasses(PyangBindTestCase):
+    # The bindings that the static leaf classes are compared with.
+    yang_files = ["static-leaf-classes.yang"]
+    pyang_flags = ["--use-xpathhelper"]
+    module_name = "dynamic"
+
+
+class StaticLeafClassesTests(PyangBindTestCase):
+    yang_files = ["static-leaf-classes.yang"]
+    pyang_flags = ["--use-xpathhelper", "--static-leaf-classes"]
+
+    @classmethod
+    def setUpClass(cls):
+        super(StaticLeafClassesTests, cls).setUpClass()
+        DynamicLeafClasses.setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        DynamicLeafClasses.tearDownClass()
+        super(StaticLeafClassesTests, cls).tearDownClass()
+
+    def populate(self, bindings):
+        instance = bindings.static_leaf_classes(path_helper=YANGPathHelper())
+        for container in [instance.values, instance.state]:
+            container._set_string("abc")
+            container._set_percentage(42)
+            container._set_enumeration("DOWN")
+            container._set_identityref("slc:TWO")
+            container._set_union("text")
+            container._set_bits("A B")
+            container._set_decimal_("2.25")
+            container._set_boolean(True)
+            container._set_strings(["one", "two"])
+        instance.values.tcp_port = 80
+        instance.values.udp_port = 53
+        instance.entry.add("first").value = 10
+        instance.reference = "first"
+        return instance
+
+    def test_serialisation_is_identical(self):
+        static = self.populate(self.bindings)
+        dynamic = self.populate(DynamicLeafClasses.dynamic)
+        for mode in ["default", "ietf"]:
+            with self.subTest(mode=mode):
+                self.assertEqual(pbJ.dumps(static, mode=mode), pbJ.dumps(dynamic, mode=mode))
+        self.assertEqual(pybindIETFXMLEncoder.serialise(static), pybindIETFXMLEncoder.serialise(dynamic))
+
+    def test_unfiltered_get_is_identical(self):
+        static = self.bindings.static_leaf_classes()
+        dynamic = DynamicLeafClasses.dynamic.static_leaf_classes()
+        for container in ["values", "state"]:
+            with self.subTest(container=container):
+                self.assertEqual(getattr(static, container).get(), getattr(dynamic, container).get())
+
+    def test_leaves_are_created_by_prebuilt_classes(self):
+        leaf_class = self.bindings._pyangbind_leaf_yc_values_static_leaf_classes__values_percentage
+        instance = self.bindings.static_leaf_classes()
+        instance.values.percentage = 10
+        self.assertIs(type(instance.values.percentage), leaf_class._cls)
+        self.assertIs(instance.values.percentage._schema, leaf_class.schema)
+
+    def test_leaf_attributes_are_identical(self):
+        static = self.populate(self.bindings)
+        dynamic = self.populate(DynamicLeafClasses.dynamic)
+        for name in ["string", "percentage", "union", "bits", "decimal_", "strings", "tcp_port"]:
+            with self.subTest(name=name):
+                static_leaf, dynamic_leaf = getattr(static.values, name), getattr(dynamic.values, name)
+                for attribute in ["_yang_name", "_yang_type", "_default", "_choice", "_is_config"]:
+                    self.assertEqual(getattr(static_leaf, attribute), getattr(dynamic_leaf, attribute))
+                self.assertEqual(static_leaf._path(), dynamic_leaf._path())
+        self.assertIs(static.values.percentage._parent, static.values)
+        self.assertFalse(static.state.percentage._is_config)
+        self.assertTrue(static.entry["first"].name._is_keyval)
+
+    def test_invalid_value_error_is_identical(self):
+        errors = []
+        for bindings in [self.bindings, DynamicLeafClasses.dynamic]:
+            with self.assertRaises(ValueError) as context:
+                bindings.static_leaf_classes().values.percentage = 101
+            errors.append(context.exception.args[0])
+        self.assertEqual(errors[0], errors[1])
+
+    def test_union_member_is_chosen_by_value(self):
+        instance = self.bindings.static_leaf_classes()
+        instance.values.union = 10
+        self.assertEqual(instance.values.union, 10)
+        instance.values.union = "ten"
+        self.assertEqual(instance.values.union, "ten")
+
+    def test_choice_is_enforced(self):
+        instance = self.bindings.static_leaf_classes()
+        instance.values.tcp_port = 80
+        instance.values.udp_port = 53
+        self.assertEqual(instance.values.tcp_port, 0)
+        self.assertFalse(instance.values.tcp_port._changed())
+
+    def test_leafref_is_resolved_against_instance(self):
+        instance = self.bindings.static_leaf_classes(path_helper=YANGPathHelper())
+        instance.entry.add("first")
+        instance.reference = "first"
+        with self.assertRaises(ValueError):
+            instance.reference = "second"
+
+
+class StaticLeafClassesSplitTests(PyangBindTestCase):
+    yang_files = ["static-leaf-classes.yang"]
+    pyang_flags = ["--static-leaf-classes"]
+    split_class_dir = True
+    module_name = "split"
+
+    def test_leaves_of_split_classes(self):
+        instance = self.split.static_leaf_classes()
+        instance.values.identityref = "TWO"
+        instance.values.enumeration = "UP"
+        self.assertEqual(instance.values.percentage._default, 50)
+        with self.assertRaises(ValueError):
+            instance.values.percentage = 101
+        self.assertEqual(
+            instance.get(filter=True),
+            {"values": {"identityref": "TWO", "enumeration": "UP"}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
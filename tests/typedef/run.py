@@ -104,6 +104,19 @@ class TypedefTests(PyangBindTestCase):
                     "inherited range was not correctly followed for %s (%s != %s)" % (item[0], item[1], wset),
                 )
 
+    def test_inherited_range_does_not_change_base_type(self):
+        restricted = type(self.typedef.container.int_inheritance)
+        bases = [c for c in restricted.__mro__ if "_restricted_class_base" in c.__dict__]
+        self.assertEqual([len(c._restricted_class_base) for c in bases], [3, 2, 1])
+        self.bindings.typedef()
+        self.assertEqual([len(c._restricted_class_base) for c in bases], [3, 2, 1])
+
+    def test_restricted_types_are_shared_between_instances(self):
+        other = self.bindings.typedef()
+        other.container.int_inheritance = 2
+        self.assertIs(type(self.typedef.container.int_inheritance), type(other.container.int_inheritance))
+        self.assertIs(type(self.typedef.container.inheritance), type(other.container.inheritance))
+
     def test_stacked_union(self):
         for item in [("aardvark", True), ("bear", True), ("chicken", False), ("deer", False), ("zebra", True)]:
             with self.subTest(item=item):
@@ -194,6 +207,12 @@ class TypedefTests(PyangBindTestCase):
             "scoped typedef leaf within a container not set correctly",
         )
 
+    def test_typedef_is_built_once_for_each_use(self):
+        restricted = self.bindings._pyangbind_types["foo:restricted-integer-type"]
+        for element in ["integer", "integerdefault"]:
+            with self.subTest(element=element):
+                self.assertIs(getattr(self.typedef.container, element)._base_type, restricted)
+
 
 if __name__ == "__main__":
     unittest.main()
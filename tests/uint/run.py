@@ -78,6 +78,36 @@ class UIntTests(PyangBindTestCase):
                     allowed = False
                 self.assertEqual(allowed, valid)
 
+    def test_uint64_single_values_are_exact(self):
+        for value, valid in [
+            (1, True),
+            (15, True),
+            (21, False),
+            (18446744073709551614, True),
+            (18446744073709551615, False),
+        ]:
+            with self.subTest(value=value, valid=valid):
+                allowed = True
+                try:
+                    self.instance.uint_container.sixtyfourvalues = value
+                except ValueError:
+                    allowed = False
+                self.assertEqual(allowed, valid)
+
+    def test_typedef_range_restricted_further(self):
+        for value, valid in [(99, False), (100, True), (200, True), (3000, False), (4094, True), (4095, False)]:
+            with self.subTest(value=value, valid=valid):
+                allowed = True
+                try:
+                    self.instance.uint_container.vlanrestricted = value
+                except ValueError:
+                    allowed = False
+                self.assertEqual(allowed, valid)
+
+    def test_typedef_ranges_are_intersected(self):
+        self.instance.uint_container.vlanrestricted = 100
+        self.assertEqual(self.instance.uint_container.vlanrestricted._restriction_ranges, ((100, 200), (4000, 4094)))
+
     def test_additional_uint32_range(self):
         for value, valid in [(0, True), (10, True), (2**32 - 1, True), (2**64, False)]:
             with self.subTest(value=value, valid=valid):
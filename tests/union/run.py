@@ -3,7 +3,9 @@
 from __future__ import unicode_literals
 
 import unittest
+from decimal import Decimal
 
+from pyangbind.lib.yangtypes import RestrictedClassType, RestrictedPrecisionDecimalType, YANGBool, union_plan
 from tests.base import PyangBindTestCase
 
 
@@ -108,6 +110,75 @@ class UnionTests(PyangBindTestCase):
                     allowed = False
                 self.assertEqual(allowed, valid)
 
+    def test_union_of_patterns_uses_first_matching_member(self):
+        for value, pattern in [("192.0.2.1", "[0-9]+\\.[0-9]+\\.[0-9]+\\.[0-9]+"), ("2001:db8::1", "[0-9a-fA-F:]+")]:
+            with self.subTest(value=value):
+                self.instance.container.u14 = value
+                self.assertEqual(self.instance.container.u14._restriction_dict["pattern"], pattern)
+        with self.assertRaises(ValueError):
+            self.instance.container.u14 = "example.com"
+
+    def test_union_member_is_chosen_by_value(self):
+        for value, expected, expected_type in [
+            (42, 42, int),
+            ("42", 42, int),
+            (" 42 ", 42, int),
+            ("4.25", Decimal("4.25"), Decimal),
+            ("1e2", Decimal("100"), Decimal),
+            (-1, Decimal("-1"), Decimal),
+            ("auto", "auto", str),
+            ("other", "other", str),
+        ]:
+            with self.subTest(value=value):
+                self.instance.container.u15 = value
+                self.assertEqual(self.instance.container.u15, expected)
+                self.assertIsInstance(self.instance.container.u15, expected_type)
+
+    def test_leaf_list_union_member_is_chosen_by_value(self):
+        self.instance.container.u16.extend([1, "2", "2.5", 300, "three", "1e2"])
+        self.assertEqual(list(self.instance.container.u16), [1, 2, Decimal("2.5"), 300, "three", 100])
+        for value, expected_type in zip(self.instance.container.u16, [int, int, Decimal, Decimal, str, Decimal]):
+            self.assertIsInstance(value, expected_type)
+        with self.assertRaises(ValueError):
+            self.instance.container.u16.append(None)
+
+
+class UnionPlanTests(unittest.TestCase):
+    def ordered_trial(self, member_types, value):
+        for member_type in member_types:
+            try:
+                member_type(value)
+                return member_type
+            except Exception:
+                pass
+        return None
+
+    def test_plan_chooses_the_same_member_as_ordered_trial(self):
+        members = [
+            RestrictedClassType(base_type=int, restriction_dict={"range": ["0..255"]}, int_size=8),
+            RestrictedPrecisionDecimalType(precision=2),
+            RestrictedClassType(base_type=str, restriction_dict={"dict_key": {"auto": {}}}),
+            RestrictedClassType(base_type=str, restriction_dict={"pattern": "[0-9.]+"}),
+            YANGBool,
+            str,
+        ]
+        values = [0, 255, 256, -1, "12", "+12", "1_0", "0x10", "1.5", "1.", ".5", "nan", "1e3", "auto", "true"]
+        values += ["1.2.3.4", "", " ", True, False, 1.5, None, [], Decimal("2.50"), b"12"]
+        for order in [members, members[::-1], members[1:] + members[:1]]:
+            plan = union_plan(order)
+            for value in values:
+                with self.subTest(order=order, value=value):
+                    expected = self.ordered_trial(order, value)
+                    if expected is None:
+                        with self.assertRaises(TypeError):
+                            plan.resolve(order, value)
+                    else:
+                        self.assertIs(plan.resolve(order, value), expected)
+
+    def test_plan_is_reused(self):
+        members = [int, str]
+        self.assertIs(union_plan(members), union_plan(list(members)))
+
 
 if __name__ == "__main__":
     unittest.main()
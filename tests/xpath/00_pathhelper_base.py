@@ -92,6 +92,15 @@ class PathHelperBaseTests(unittest.TestCase):
                 obj = self.tree.get("/container/foo[id={0}42{0}]".format(style))[0]
                 self.assertEqual(obj.name(), "bar42")
 
+    def test_replacing_object_gives_it_a_new_identifier(self):
+        self.tree.register(["node0"], TestObject(0))
+        first = self.tree._root[0].get("obj_ptr")
+        self.tree.register(["node0"], TestObject(1))
+        second = self.tree._root[0].get("obj_ptr")
+        self.assertNotEqual(first, second)
+        self.assertNotIn(first, self.tree._library)
+        self.assertEqual(self.tree.get("/node0")[0].name(), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
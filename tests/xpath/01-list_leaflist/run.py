@@ -106,6 +106,26 @@ class XPathListLeaflistTests(PyangBindTestCase):
                 retr = self.path_helper.get("/container/t4[keyval=%s]" % beer)
                 self.assertEqual(len(retr), exists)
 
+    def test_get_list_items_added_with_add_many(self):
+        self.instance.container.t4.add_many(["steam", "liberty", "porter"])
+        for beer, exists in [("steam", 1), ("porter", 1), ("pygmy-owl", 0)]:
+            with self.subTest(beer=beer, exists=exists):
+                retr = self.path_helper.get("/container/t4[keyval=%s]" % beer)
+                self.assertEqual(len(retr), exists)
+        self.assertEqual(len(self.path_helper.get("/container/t4/keyval")), 3)
+
+    def test_list_leafref_to_items_added_with_add_many(self):
+        self.instance.container.t2.add_many(["kangaroo", "wallaby"])
+        self.instance.reference.t2_ptr = "wallaby"
+        with self.assertRaises(ValueError):
+            self.instance.reference.t2_ptr = "wombat"
+
+    def test_add_many_with_invalid_key_does_not_register_items(self):
+        self.instance.standalone.l.add(1)
+        with self.assertRaises(KeyError):
+            self.instance.standalone.l.add_many([2, 3, 1])
+        self.assertEqual(len(self.path_helper.get("/standalone/l")), 1)
+
     def test_remove_elements_from_list(self):
         for beer in ["steam", "liberty", "california-lager", "porter", "ipa", "foghorn"]:
             self.instance.container.t4.add(beer)
@@ -189,6 +209,63 @@ class XPathListLeaflistTests(PyangBindTestCase):
         self.instance.standalone.ref = 1
         self.assertEqual(self.instance.standalone.ref._referenced_object, 1)
 
+    def test_leafref_targets_are_cached_until_registration(self):
+        self.instance.container.t2.add("kangaroo")
+        targets = self.path_helper.get_referenced("/container/t2/keyval")
+        self.assertIs(self.path_helper.get_referenced("/container/t2/keyval"), targets)
+        self.instance.standalone.l.add(1)
+        self.assertIs(self.path_helper.get_referenced("/container/t2/keyval"), targets)
+        self.instance.container.t2.add("wallaby")
+        self.assertIsNot(self.path_helper.get_referenced("/container/t2/keyval"), targets)
+
+    def test_list_leafref_sees_entries_added_and_deleted_after_lookup(self):
+        self.instance.container.t2.add("kangaroo")
+        self.instance.reference.t2_ptr = "kangaroo"
+        with self.assertRaises(ValueError):
+            self.instance.reference.t2_ptr = "wombat"
+        self.instance.container.t2.add("wombat")
+        self.instance.reference.t2_ptr = "wombat"
+        self.instance.container.t2.delete("wombat")
+        with self.assertRaises(ValueError):
+            self.instance.reference.t2_ptr = "wombat"
+
+    def test_leaflist_leafref_sees_values_appended_after_lookup(self):
+        self.instance.container.t1.append("mackerel")
+        self.instance.reference.t1_ptr = "mackerel"
+        self.instance.container.t1.append("trout")
+        self.instance.reference.t1_ptr = "trout"
+        self.assertEqual(str(self.instance.reference.t1_ptr), "trout")
+
+    def test_relative_leafref_sees_entries_added_after_lookup(self):
+        self.instance.standalone.l.add(1)
+        self.instance.standalone.ref = 1
+        with self.assertRaises(ValueError):
+            self.instance.standalone.ref = 2
+        self.instance.standalone.l.add(2)
+        self.instance.standalone.ref = 2
+        self.assertEqual(self.instance.standalone.ref._referenced_object, 2)
+
+    def test_types_are_shared_between_instances(self):
+        other = self.bindings.list_tc01(path_helper=YANGPathHelper())
+        for name, container in [("t2", "container"), ("t2_ptr", "reference"), ("t7_ptr", "reference")]:
+            with self.subTest(name=name):
+                self.assertIs(
+                    type(getattr(getattr(self.instance, container), name)),
+                    type(getattr(getattr(other, container), name)),
+                )
+
+    def test_shared_leafref_types_look_up_their_own_tree(self):
+        other = self.bindings.list_tc01(path_helper=YANGPathHelper())
+        self.instance.container.t2.add("kangaroo")
+        self.instance.container.t7.append("snapshot")
+        self.instance.reference.t2_ptr = "kangaroo"
+        self.instance.reference.t7_ptr.append("snapshot")
+        with self.assertRaises(ValueError):
+            other.reference.t2_ptr = "kangaroo"
+        with self.assertRaises(ValueError):
+            other.reference.t7_ptr.append("snapshot")
+        self.assertEqual(self.instance.reference.t7_ptr[0]._caller, ["reference", "t7-ptr"])
+
     def test_get_list_retrieves_correct_attribute(self):
         self.assertEqual(self.path_helper.get_list("/standalone/l")._yang_name, "l")
 